@@ -20,3 +20,25 @@ CART_URL = "https://pay.ssg.com/cart/dmsShpp.ssg?gnb=cart"
 MAX_ITERATIONS = 10
 TEMPERATURE = 0.7
 MAX_TOKENS = 1000
+
+# 운영용 엔드포인트(/routing/nodes, /tool_model 변경) 인증 토큰. X-Admin-Token 헤더로 전달, 빈 값이면 해당 엔드포인트 비활성화
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# 여러 유튜브 링크 동시 처리 설정
+MAX_VIDEO_URLS_PER_REQUEST = int(os.getenv("MAX_VIDEO_URLS_PER_REQUEST", "5"))  # 한 요청에서 처리할 최대 영상 수
+MAX_CONCURRENT_VIDEOS = int(os.getenv("MAX_CONCURRENT_VIDEOS", "3"))            # 요청당 동시에 추출할 영상 수
+VIDEO_REQUEST_TIMEOUT = float(os.getenv("VIDEO_REQUEST_TIMEOUT", "900"))         # 영상 하나당 최대 대기 시간(초)
+
+# 도구 선택 로컬 모델 (문자 n-gram + 선형 모델, TOOL_LOG_PATH 기록으로 학습)
+# 학습: python -m text_service.agent.local_model tool_samples.jsonl tool_model.npz
+# off | shadow(LLM과 비교만) | ab(TOOL_MODEL_AB_RATIO 비율만 모델 사용) | primary(모델이 확실하면 LLM 생략)
+TOOL_MODEL_MODE = os.getenv("TOOL_MODEL_MODE", "off")
+TOOL_MODEL_PATH = os.getenv("TOOL_MODEL_PATH", "tool_model.npz")
+TOOL_MODEL_AB_RATIO = float(os.getenv("TOOL_MODEL_AB_RATIO", "0.1"))
+TOOL_MODEL_MIN_CONFIDENCE = float(os.getenv("TOOL_MODEL_MIN_CONFIDENCE", "0.8"))
+TOOL_MODEL_PROMOTE_ACCURACY = float(os.getenv("TOOL_MODEL_PROMOTE_ACCURACY", "0.95"))
+TOOL_MODEL_PROMOTE_MIN_SAMPLES = int(os.getenv("TOOL_MODEL_PROMOTE_MIN_SAMPLES", "200"))
+TOOL_MODEL_AUTO_PROMOTE = os.getenv("TOOL_MODEL_AUTO_PROMOTE", "false").lower() == "true"
+# (최신 요청, LLM이 고른 도구) 학습 기록. 사용자 메시지 원문이 쌓이므로 기본은 기록 안 함(빈 값).
+# 켤 때는 cwd가 아닌 전용 경로를 지정하고, 학습에 필요한 기간만 보관한 뒤 logrotate 등으로 지움 (파일 크기 제한 없음)
+TOOL_LOG_PATH = os.getenv("TOOL_LOG_PATH", "")
@@ -14,6 +14,9 @@ from dotenv import load_dotenv
 import json
 import re
 import logging
+import threading
+import time
+import uuid
 
 
 # 로깅 설정
@@ -34,13 +37,24 @@ project_root = os.path.dirname(current_dir)
 sys.path.append(project_root)
 
 # 위에서 수정한 파일들로부터 '도구'들을 가져옵니다.
-from text_service.agent import text_based_cooking_assistant
+from text_service.agent import bind_session, text_based_cooking_assistant
 from video_service.core.extractor import extract_recipe_from_youtube
 from ingredient_service.tools import (
     search_ingredient_by_text,
     # search_ingredient_by_image,
     # search_ingredient_multimodal
 )
+from text_service.agent.local_model import LocalModelGate
+from intent_service.config import (
+    TOOL_LOG_PATH,
+    TOOL_MODEL_AB_RATIO,
+    TOOL_MODEL_AUTO_PROMOTE,
+    TOOL_MODEL_MIN_CONFIDENCE,
+    TOOL_MODEL_MODE,
+    TOOL_MODEL_PATH,
+    TOOL_MODEL_PROMOTE_ACCURACY,
+    TOOL_MODEL_PROMOTE_MIN_SAMPLES,
+)
 
 # 1. 사용할 도구(Tools) 정의
 tools = [
@@ -235,11 +249,77 @@ def select_tool(state):
         input_text = messages[-1].content
         logger.info("--- [LangGraph] 단일 메시지 처리 ---")
     
+    # 로컬 모델이 최신 요청만으로 도구를 확실히 고르면 도구 선택 LLM 호출을 생략
+    latest_request = messages[-1].content
+    model_tool, prob, _ = tool_model.predict(latest_request)
+    if tool_model.should_serve(model_tool, prob):
+        local_call = _local_tool_call(model_tool, latest_request)
+        if local_call is not None:
+            tool_model.record_served()
+            logger.info(f"--- [LangGraph] 로컬 모델 도구 선택: {model_tool} (확률 {prob:.2f}) ---")
+            return {"messages": [local_call]}
+
+    started = time.perf_counter()
     response = agent.invoke({"input": input_text, "intermediate_steps": []})
     logger.info(f"--- [LangGraph] 도구 선택 결과: {response} ---")
+    llm_tool = _tool_label(response)
+    tool_model.record_llm(model_tool, llm_tool, (time.perf_counter() - started) * 1000)
+    _log_tool_sample(latest_request, llm_tool)
     return {"messages": response[0].message_log}
 
 
+# --- 도구 선택 로컬 모델 ---
+tool_model = LocalModelGate(
+    "tool",
+    TOOL_MODEL_PATH,
+    mode=TOOL_MODEL_MODE,
+    ab_ratio=TOOL_MODEL_AB_RATIO,
+    min_confidence=TOOL_MODEL_MIN_CONFIDENCE,
+    promote_accuracy=TOOL_MODEL_PROMOTE_ACCURACY,
+    promote_min_samples=TOOL_MODEL_PROMOTE_MIN_SAMPLES,
+    auto_promote=TOOL_MODEL_AUTO_PROMOTE,
+)
+_tool_log_lock = threading.Lock()
+_YOUTUBE_URL_RE = re.compile(r"https?://(?:www\.|m\.)?(?:youtube\.com|youtu\.be)/\S+", re.IGNORECASE)
+
+
+def _tool_label(response) -> str:
+    """LLM의 도구 선택 결과를 학습 라벨로 변환 (도구 여러 번 호출은 multi, 도구 없이 답하면 none)"""
+    if not isinstance(response, list) or not response:
+        return "none"
+    if len(response) > 1:
+        return "multi"
+    return response[0].tool
+
+
+def _local_tool_call(tool_name: str, latest_request: str):
+    """
+    모델이 고른 도구를 LLM이 만들었을 것과 같은 형태의 tool_calls 메시지로 구성. 인자를 만들 수 없으면 None.
+    도구 설명대로 사용자의 최신 요청을 그대로 넘김 (이전 대화 맥락을 붙이면 규칙/요리명 추출/캐시 키가 달라짐)
+    """
+    if tool_name in ("text_based_cooking_assistant", "search_ingredient_by_text"):
+        args = {"query": latest_request}
+    elif tool_name == "extract_recipe_from_youtube":
+        match = _YOUTUBE_URL_RE.search(latest_request)
+        if not match:
+            return None
+        args = {"youtube_url": match.group(0)}
+    else:
+        # multi / none은 요리별 분할이나 직접 답변이 필요하므로 LLM에 맡김
+        return None
+    return AIMessage(content="", tool_calls=[{"name": tool_name, "args": args, "id": f"local_{uuid.uuid4().hex[:12]}"}])
+
+
+def _log_tool_sample(message: str, tool_name: str) -> None:
+    if not TOOL_LOG_PATH or not message:
+        return
+    try:
+        with _tool_log_lock, open(TOOL_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"message": message, "label": tool_name}, ensure_ascii=False) + "\n")
+    except OSError as e:
+        logger.warning(f"도구 선택 학습 데이터 기록 실패: {e}")
+
+
 # 2. Tool 노드: 미리 만들어진 ToolNode를 사용합니다.
 tool_node = ToolNode(tools)
 
@@ -335,7 +415,7 @@ app = workflow.compile()
 async def run_agent(input_data: dict):
     """
     사용자 입력을 받아 에이전트를 실행하고 결과를 반환합니다.
-    input_data: {"message": str} 또는 {"chat_history": list} 형태
+    input_data: {"message": str} 또는 {"chat_history": list} 형태 (선택: "session_id")
     """
     logger.info("--- [STEP 0] Agent Start ---")
     
@@ -361,7 +441,9 @@ async def run_agent(input_data: dict):
         # LangGraph 실행
         logger.info("--- [STEP 2] app.ainvoke 호출 중... ---")
         inputs = {"messages": messages}
-        result_state = await app.ainvoke(inputs)
+        # text_service 도구가 같은 대화의 세션 상태를 이어 쓰도록 세션 ID를 바인딩
+        with bind_session(input_data.get("session_id")):
+            result_state = await app.ainvoke(inputs)
         logger.info("--- [STEP 3] app.ainvoke가 정상적으로 완료되었습니다. ---")
 
         # 결과에서 최종 AI 응답 메시지를 추출합니다.
@@ -3,10 +3,24 @@ from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import logging
 from fastapi.responses import JSONResponse
-from planning_agent import run_agent
+import hmac
+import os
+import sys
 import uuid
 import time
 import re
+import asyncio
+import aiohttp
+
+# 경로 설정을 먼저 수행해 text_service 등 프로젝트 패키지를 절대 임포트할 수 있도록 함
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from planning_agent import run_agent, tool_model
+from text_service.agent.routing import get_router
+import config
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -28,6 +42,14 @@ VIDEO_SERVICE_URL = "http://localhost:8003"
 # TextAgent Service URL
 TEXT_SERVICE_URL = "http://localhost:8002"
 
+def require_admin(request: Request) -> None:
+    """운영용 엔드포인트 인증. ADMIN_TOKEN이 비어 있으면 누구도 호출할 수 없음"""
+    token = request.headers.get("X-Admin-Token", "")
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="ADMIN_TOKEN이 설정되지 않아 사용할 수 없는 엔드포인트입니다.")
+    if not hmac.compare_digest(token.encode("utf-8"), config.ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=401, detail="관리자 토큰이 올바르지 않습니다.")
+
 # 간단 상태 저장소 (세션 관리 미구현 환경에서 최근 결과를 보관)
 recent_results = {
     "text": None,
@@ -175,14 +197,23 @@ def is_youtube_url_request(message: str) -> bool:
 
 
 
+# 메시지에 포함된 유튜브 URL 목록 (같은 영상은 한 번만, 등장 순서 유지)
+# watch?v=, shorts/, youtu.be/ 링크를 모두 인식하며 개수 세기와 추출이 같은 패턴을 사용
+YOUTUBE_URL_PATTERN = re.compile(
+    r"(?:https?://)?(?:www\.|m\.)?(?:youtube\.com/(?:watch\?v=|shorts/)|youtu\.be/)([0-9A-Za-z_-]{11})[^\s]*"
+)
+
+
+def extract_youtube_urls(message: str) -> list:
+    urls = {}
+    for match in YOUTUBE_URL_PATTERN.finditer(message or ""):
+        urls.setdefault(match.group(1), match.group(0))
+    return list(urls.values())
+
+
 def count_youtube_urls(message: str) -> int:
-    """메시지에 포함된 유튜브 URL의 개수를 반환합니다."""
-    if not message:
-        return 0
-    # youtube.com/watch?v= 또는 youtu.be/ 패턴을 찾습니다.
-    # re.findall은 모든 일치 항목을 리스트로 반환합니다.
-    youtube_patterns = re.findall(r"(youtube\.com/watch\?v=|youtu\.be/)", message)
-    return len(youtube_patterns)
+    """메시지에 포함된 (서로 다른) 유튜브 영상 URL의 개수를 반환합니다."""
+    return len(extract_youtube_urls(message))
 
 
 # 작업 상태와 결과를 저장할 인메모리 딕셔너리
@@ -207,11 +238,72 @@ async def run_agent_and_store_result(job_id: str, input_data: dict):
 
 
 
+# 영상 하나를 video_service로 보내 레시피를 추출
+async def fetch_video_recipe(session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, youtube_url: str) -> dict:
+    async with semaphore:
+        logger.info(f"=== 🤍VideoAgent Service로 요청 전송: {youtube_url}")
+        payload = {"youtube_url": youtube_url, "message": youtube_url}
+        async with session.post(f"{VIDEO_SERVICE_URL}/process", json=payload) as response:
+            if response.status != 200:
+                raise RuntimeError(f"VideoAgent Service 오류 (상태: {response.status}): {await response.text()}")
+            return await response.json()
+
+
+async def run_multi_video_job(job_id: str, youtube_urls: list):
+    """
+    여러 유튜브 영상을 요청당 동시 처리 한도 안에서 병렬로 추출합니다.
+    영상이 하나 끝날 때마다 jobs[job_id]["result"]["recipes"]에 추가하므로 /status에서 부분 결과를 바로 볼 수 있습니다.
+    """
+    logger.info(f"=== 🤍Background-Task-{job_id}: 영상 {len(youtube_urls)}개 동시 추출 시작. ===")
+    result = {"chatType": "chat", "answer": "", "recipes": []}
+    job = {
+        "status": "processing",
+        "start_time": time.time(),
+        "progress": {"total": len(youtube_urls), "completed": 0, "failed": []},
+        "result": result,
+    }
+    jobs[job_id] = job
+
+    semaphore = asyncio.Semaphore(config.MAX_CONCURRENT_VIDEOS)
+    timeout = aiohttp.ClientTimeout(total=config.VIDEO_REQUEST_TIMEOUT)
+
+    async def _one(url: str):
+        try:
+            return url, await fetch_video_recipe(session, semaphore, url), None
+        except Exception as e:
+            return url, None, e
+
+    try:
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            tasks = [asyncio.create_task(_one(url)) for url in youtube_urls]
+            for finished in asyncio.as_completed(tasks):
+                url, response, error = await finished
+                job["progress"]["completed"] += 1
+                recipes = [r for r in (response or {}).get("recipes", []) if r.get("recipe")]
+                if error is not None or not recipes:
+                    reason = str(error) if error is not None else (response or {}).get("content", "레시피를 추출할 수 없습니다.")
+                    logger.warning(f"영상 추출 실패: {url} - {reason}")
+                    job["progress"]["failed"].append({"youtube_url": url, "reason": reason})
+                    continue
+                for recipe in recipes:
+                    result["recipes"].append({**recipe, "youtube_url": url})
+                logger.info(f"영상 추출 완료 ({job['progress']['completed']}/{len(youtube_urls)}): {url}")
+
+        succeeded = len(youtube_urls) - len(job["progress"]["failed"])
+        result["answer"] = f"유튜브 영상 {len(youtube_urls)}개 중 {succeeded}개에서 레시피를 추출했습니다."
+        job["status"] = "completed"
+        logger.info(f"=== 🤍Background-Task-{job_id}: 작업 완료 ({time.time() - job['start_time']:.1f}초). ===")
+    except Exception as e:
+        logger.error(f"=== 🤍Background-Task-{job_id}: 작업 중 에러 발생: {e}", exc_info=True)
+        job["status"] = "failed"
+        job["error"] = str(e)
+
+
 # 즉시 job_id를 반환.
 @app.post("/chat")
 async def chat_with_agent(request: Request, background_tasks: BackgroundTasks):
     """
-    사용자 요청을 받아 작업을 백그라운드에 등록하고 즉시 작업 ID를 반환합니다.
+    사용자 요청을 받아 작업을 백그라운드에 등록하고 즉시 작업 ID와 대화 ID(session_id)를 반환합니다.
     """
     try:
         print(request)
@@ -223,39 +315,43 @@ async def chat_with_agent(request: Request, background_tasks: BackgroundTasks):
         # 채팅 히스토리 또는 단일 메시지 처리
         user_message = body.get("message")
         chat_history = body.get("chat_history", [])
+        # 대화 ID가 없으면 새로 발급해 응답으로 돌려줌 (클라이언트는 다음 요청부터 같은 값을 보내 대화를 이어감)
+        session_id = body.get("session_id") or str(uuid.uuid4())
         
         # 채팅 히스토리가 있으면 우선 사용, 없으면 단일 메시지 사용
         if chat_history:
             logger.info(f"=== 🤍채팅 히스토리 수신: {len(chat_history)}개 메시지")
             # 최신 메시지 추출 (유튜브 링크 검증용)
             latest_message = chat_history[-1].get("content", "") if chat_history else ""
-            input_data = {"chat_history": chat_history}
+            input_data = {"chat_history": chat_history, "session_id": session_id}
         else:
             logger.info(f"=== 🤍단일 사용자 메시지: {user_message}")
             if not user_message:
                 raise HTTPException(status_code=400, detail="message 또는 chat_history가 필요합니다.")
             latest_message = user_message
-            input_data = {"message": user_message}
+            input_data = {"message": user_message, "session_id": session_id}
 
 
-        # --- 👇 여기가 바로 추가된 유튜브 링크 개수 검사 로직 👇 ---
-        if count_youtube_urls(latest_message) > 1:
-            logger.warning(f"요청 거부: 메시지에 유튜브 링크가 2개 이상 포함됨 - {latest_message}")
-            # 400 Bad Request 에러를 발생시켜 사용자에게 알립니다.
+        # 유튜브 링크가 여러 개면 도구 선택 없이 영상별로 동시에 추출 (전체 대기 시간 = 가장 느린 영상)
+        youtube_urls = extract_youtube_urls(latest_message)
+        if len(youtube_urls) > config.MAX_VIDEO_URLS_PER_REQUEST:
+            logger.warning(f"요청 거부: 유튜브 링크 {len(youtube_urls)}개 - {latest_message}")
             raise HTTPException(
                 status_code=400,
-                detail="죄송합니다, 한 번에 하나의 유튜브 링크만 분석할 수 있습니다."
+                detail=f"죄송합니다, 한 번에 최대 {config.MAX_VIDEO_URLS_PER_REQUEST}개의 유튜브 링크만 분석할 수 있습니다."
             )
-        # --- 👆 여기까지가 추가된 부분 👆 ---
-
 
         job_id = str(uuid.uuid4()) # 고유한 작업 ID 생성
+
+        if len(youtube_urls) > 1:
+            background_tasks.add_task(run_multi_video_job, job_id, youtube_urls)
+            return JSONResponse(status_code=202, content={"job_id": job_id, "session_id": session_id})
         
         # 백그라운드에서 run_agent_and_store_result 함수를 실행하도록 등록
         background_tasks.add_task(run_agent_and_store_result, job_id, input_data)
         
-        # 클라이언트에게는 작업 ID를 즉시 반환
-        return JSONResponse(status_code=202, content={"job_id": job_id})
+        # 클라이언트에게는 작업 ID와 대화 ID를 즉시 반환
+        return JSONResponse(status_code=202, content={"job_id": job_id, "session_id": session_id})
         
     except HTTPException as http_exc:
         # 1. 우리가 직접 발생시킨 HTTPException은 그대로 클라이언트에 전달합니다.
@@ -286,5 +382,46 @@ async def health_check():
     """서버 상태 확인"""
     return {"status": "healthy", "service": "Intent LLM Server"}
 
+@app.get("/routing")
+async def routing_status():
+    """text_service 복제본 라우팅 상태 (복제본별 요청/오류 수, 제외 여부)"""
+    return {"status": "success", "routing": get_router().stats()}
+
+@app.put("/routing/nodes")
+async def update_routing_nodes(request: Request):
+    """
+    text_service 복제본 목록 교체 (복제본 추가/제거 시 호출, X-Admin-Token 헤더 필요).
+    바디: {"nodes": ["http://host1:8002", "http://host2:8002"]}
+    """
+    require_admin(request)
+    body = await request.json()
+    nodes = body.get("nodes")
+    if not isinstance(nodes, list) or not nodes:
+        raise HTTPException(status_code=400, detail="nodes 목록이 필요합니다.")
+    changes = get_router().set_nodes(nodes)
+    return {"status": "success", **changes, "routing": get_router().stats()}
+
+@app.get("/tool_model")
+async def tool_model_status():
+    """도구 선택 로컬 모델 상태 (LLM 일치율, 절약된 LLM 호출, 평균 지연)"""
+    return {"status": "success", "tool_model": tool_model.stats()}
+
+@app.put("/tool_model")
+async def update_tool_model(request: Request):
+    """
+    도구 선택 로컬 모델 모드 변경/다시 불러오기 (shadow에서 검증한 뒤 primary로 승격할 때 호출, X-Admin-Token 헤더 필요).
+    바디: {"mode": "primary", "reload": true}
+    """
+    require_admin(request)
+    body = await request.json()
+    if body.get("reload") and not tool_model.reload():
+        raise HTTPException(status_code=400, detail=f"모델을 불러오지 못했습니다: {tool_model.path}")
+    if body.get("mode"):
+        try:
+            tool_model.set_mode(body["mode"])
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "success", "tool_model": tool_model.stats()}
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8001) 
\ No newline at end of file
@@ -1,6 +1,6 @@
 from .core import TextAgent
-from .tools import text_based_cooking_assistant
+from .tools import bind_session, text_based_cooking_assistant
 
-__all__ = ["TextAgent", "text_based_cooking_assistant"]
+__all__ = ["TextAgent", "bind_session", "text_based_cooking_assistant"]
 
 
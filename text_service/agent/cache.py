@@ -0,0 +1,193 @@
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from ..config import (
+    RECIPE_CACHE_BACKEND,
+    RECIPE_CACHE_MAX_ENTRIES,
+    RECIPE_CACHE_MEMORY_ENTRIES,
+    RECIPE_CACHE_PATH,
+    RECIPE_CACHE_TTL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def canonical_dish(dish: str) -> str:
+    """캐시 키용 요리명 정규화 ("김치 찌개 ", "김치찌개!" → "김치찌개")"""
+    s = (dish or "").lower().strip()
+    s = re.sub(r"[\s·ㆍ・/|()-]+", "", s)
+    return re.sub(r"[^0-9a-z가-힣]", "", s)
+
+
+def prompt_version(prompt_template: str) -> str:
+    """프롬프트가 바뀌면 이전 캐시 항목을 쓰지 않도록 키에 넣는 짧은 해시"""
+    return hashlib.sha1(prompt_template.encode("utf-8")).hexdigest()[:10]
+
+
+class RecipeCache:
+    """
+    요리별 LLM 응답 캐시. 메모리 LRU를 앞에 두고 SQLite(선택)에 영구 보관합니다.
+    키는 (종류, 정규화된 요리명, 프롬프트 버전, 모델명)이며 TTL이 지난 항목은 미스로 처리합니다.
+    """
+
+    def __init__(self, path: Optional[str] = RECIPE_CACHE_PATH, ttl_seconds: int = RECIPE_CACHE_TTL_SECONDS,
+                 max_entries: int = RECIPE_CACHE_MAX_ENTRIES, memory_entries: int = RECIPE_CACHE_MEMORY_ENTRIES) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.memory_entries = max(1, min(memory_entries, self.max_entries))
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits_memory": 0, "hits_sqlite": 0, "misses": 0, "puts": 0, "evictions": 0}
+        if self.path:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS recipe_cache ("
+                    "key TEXT PRIMARY KEY, kind TEXT NOT NULL, dish TEXT NOT NULL, value TEXT NOT NULL, "
+                    "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS recipe_cache_by_access ON recipe_cache (accessed_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def key(kind: str, dish: str, version: str, model: str) -> str:
+        return f"{kind}:{canonical_dish(dish)}:{version}:{model}"
+
+    def _remember(self, key: str, created_at: float, value: str) -> None:
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _get_memory(self, key: str, now: float) -> Optional[Any]:
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None and now - item[0] <= self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self._stats["hits_memory"] += 1
+                # 호출 측이 결과를 수정해도 캐시가 바뀌지 않도록 매번 새로 역직렬화
+                return json.loads(item[1])
+            self._memory.pop(key, None)
+        return None
+
+    def _get_sqlite(self, key: str, now: float) -> Optional[Any]:
+        if self.path:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT value, created_at FROM recipe_cache WHERE key = ? AND created_at >= ?",
+                    (key, now - self.ttl_seconds),
+                ).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE recipe_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            if row is not None:
+                with self._lock:
+                    self._remember(key, row[1], row[0])
+                    self._stats["hits_sqlite"] += 1
+                return json.loads(row[0])
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        data = self._get_memory(key, now)
+        if data is not None:
+            return data
+        return self._get_sqlite(key, now)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """get의 비동기 버전. 메모리 LRU는 이벤트 루프에서 바로 보고, SQLite 조회만 스레드에서 수행"""
+        now = time.time()
+        data = self._get_memory(key, now)
+        if data is not None:
+            return data
+        return await asyncio.to_thread(self._get_sqlite, key, now)
+
+    def _put_memory(self, key: str, now: float, text: str) -> None:
+        with self._lock:
+            self._remember(key, now, text)
+            self._stats["puts"] += 1
+
+    def _put_sqlite(self, key: str, now: float, text: str) -> None:
+        if not self.path:
+            return
+        kind, dish = key.split(":", 2)[:2]
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO recipe_cache (key, kind, dish, value, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, kind, dish, text, now, now),
+            )
+            # 만료 항목 삭제 후 최대 개수를 넘으면 가장 오래 쓰지 않은 항목부터 제거 (LRU)
+            expired = conn.execute("DELETE FROM recipe_cache WHERE created_at < ?", (now - self.ttl_seconds,)).rowcount
+            overflow = conn.execute(
+                "DELETE FROM recipe_cache WHERE key IN ("
+                "SELECT key FROM recipe_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+        if expired or overflow:
+            with self._lock:
+                self._stats["evictions"] += expired + overflow
+
+    def put(self, key: str, value: Any) -> None:
+        now = time.time()
+        text = json.dumps(value, ensure_ascii=False)
+        self._put_memory(key, now, text)
+        self._put_sqlite(key, now, text)
+
+    async def aput(self, key: str, value: Any) -> None:
+        """put의 비동기 버전. 메모리 LRU에 바로 넣고 SQLite 쓰기는 스레드에서 수행"""
+        now = time.time()
+        text = json.dumps(value, ensure_ascii=False)
+        self._put_memory(key, now, text)
+        if self.path:
+            try:
+                await asyncio.to_thread(self._put_sqlite, key, now, text)
+            except sqlite3.Error as e:
+                # 영구 저장에 실패해도 응답은 이미 만들어졌으므로 메모리 캐시만으로 계속 진행
+                logger.warning(f"레시피 캐시 저장 실패({key}): {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["hits_memory"] + stats["hits_sqlite"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits_memory"] + stats["hits_sqlite"]) / lookups, 4) if lookups else 0.0
+        stats["backend"] = "sqlite" if self.path else "memory"
+        if self.path:
+            with self._connect() as conn:
+                stats["entries"] = conn.execute("SELECT COUNT(*) FROM recipe_cache").fetchone()[0]
+        return stats
+
+
+_cache: Optional[RecipeCache] = None
+_cache_created = False
+_cache_lock = threading.Lock()
+
+
+def get_recipe_cache() -> Optional[RecipeCache]:
+    """설정에 따른 프로세스 공용 캐시 (RECIPE_CACHE_BACKEND=off면 None)"""
+    global _cache, _cache_created
+    with _cache_lock:
+        if not _cache_created:
+            _cache_created = True
+            if RECIPE_CACHE_BACKEND == "off":
+                _cache = None
+            elif RECIPE_CACHE_BACKEND == "memory":
+                _cache = RecipeCache(path=None)
+            else:
+                if RECIPE_CACHE_BACKEND != "sqlite":
+                    logger.warning(f"알 수 없는 RECIPE_CACHE_BACKEND '{RECIPE_CACHE_BACKEND}' - SQLite를 사용합니다.")
+                _cache = RecipeCache()
+                logger.info(f"레시피 캐시: SQLite ({RECIPE_CACHE_PATH})")
+        return _cache
@@ -36,6 +36,9 @@ EXPLICIT_NEW_INTENT_KEYWORDS = [
     "랜덤", "무작위", "다른 걸", "다른 요리", "새 추천"
 ]
 
+# Placeholder dish name when none could be extracted (never cached)
+UNKNOWN_DISH = "알 수 없는 요리"
+
 # Default cache TTLs
 CACHE_TTL_SECONDS = 300
 
@@ -1,10 +1,11 @@
+import asyncio
 import logging
 import time
 from typing import Any, Dict, List, Optional
 
 import aiohttp
 
-from ..config import GEMINI_API_KEY
+from ..config import GEMINI_API_KEY, INTENT_STRUCTURED_PARSE
 import google.generativeai as genai
 
 from .constants import (
@@ -14,14 +15,17 @@ from .constants import (
     NON_STYLE_HINTS,
     OTHER_REQUEST_KEYWORDS,
     STYLE_KEYWORDS,
+    UNKNOWN_DISH,
 )
 from .llm import LLMClient
-from .intent import IntentClassifier
+from .intent import SLOT_INTENTS, FastDecision, IntentClassifier, ParsedMessage
 from .recommenders import Recommenders
 from .recipes import Recipes
 from .substitutions import Substitutions
+from .session import ConversationState, create_session_store
 from .extractors import (
     find_dish_by_pattern,
+    is_plausible_dish,
     match_ingredient_from_inventory,
     map_to_inventory,
     PRONOUNS,
@@ -32,7 +36,7 @@ logger = logging.getLogger(__name__)
 
 
 class TextAgent:
-    def __init__(self) -> None:
+    def __init__(self, session_store=None) -> None:
         genai.configure(api_key=GEMINI_API_KEY)
         self.llm = LLMClient()
         self.intent_classifier = IntentClassifier(self.llm)
@@ -40,19 +44,9 @@ class TextAgent:
         self.recipes = Recipes(self.llm)
         self.substitutions = Substitutions(self.llm)
 
-        self.conversation_history: List[Dict[str, str]] = []
-        self.last_dish: Optional[str] = None
-        self.last_ingredients: List[str] = []
-        self.last_intent: Optional[str] = None
-        self.last_suggested_dishes: List[str] = []
-        self.last_ingredients_ts: float = 0.0
-        self.last_suggested_ts: float = 0.0
-        self.last_suggested_turn: int = 0
         self.cache_ttl_sec: int = CACHE_TTL_SECONDS
-        self.turn_idx: int = 0
-        self.last_ingredients_turn: int = 0
-        self.last_style: str = ""
-        self.last_style_ts: float = 0.0
+        # 대화 상태는 세션별로 저장소에 두고, 에이전트 자체는 요청 간 상태를 갖지 않음
+        self.sessions = session_store or create_session_store()
 
     def _add_assistant_response(self, content: str):
         # 히스토리 비활성화: 서버는 대화 로그를 저장하지 않음
@@ -71,11 +65,11 @@ class TextAgent:
         text = (message or "").lower()
         return any(k in text for k in EXPLICIT_NEW_INTENT_KEYWORDS)
 
-    def _is_other_in_same_style(self, message: str) -> bool:
+    def _is_other_in_same_style(self, message: str, state: ConversationState) -> bool:
         text = (message or "").lower().strip()
         if not text:
             return False
-        return any(k in text for k in OTHER_REQUEST_KEYWORDS) and bool(self.last_style) and self._is_fresh(self.last_style_ts)
+        return any(k in text for k in OTHER_REQUEST_KEYWORDS) and bool(state.last_style) and self._is_fresh(state.last_style_ts)
 
     def _is_other_request(self, message: str) -> bool:
         """사용자가 '다른 거' 계열을 요청했는지 여부(스타일 보유 여부 무관)."""
@@ -84,68 +78,79 @@ class TextAgent:
             return False
         return any(k in text for k in OTHER_REQUEST_KEYWORDS)
 
-    def _is_cache_valid(self) -> bool:
-        time_ok = self._is_fresh(self.last_ingredients_ts)
-        turn_ok = (self.turn_idx - self.last_ingredients_turn) <= 3 if self.last_ingredients_turn else False
-        return time_ok and turn_ok and bool(self.last_ingredients)
+    def _is_cache_valid(self, state: ConversationState) -> bool:
+        time_ok = self._is_fresh(state.last_ingredients_ts)
+        turn_ok = (state.turn_idx - state.last_ingredients_turn) <= 3 if state.last_ingredients_turn else False
+        return time_ok and turn_ok and bool(state.last_ingredients)
 
-    def _is_style_followup(self, message: str) -> bool:
+    def _is_style_followup(self, message: str, state: ConversationState) -> bool:
         text = (message or "").lower().strip()
         if not text:
             return False
         has_style = any(k in text for k in STYLE_KEYWORDS)
         has_non_style = any(k in text for k in NON_STYLE_HINTS)
-        recent_allows_follow = self.last_intent in {"INGREDIENTS_TO_DISHES", "RECIPE", "INGREDIENTS"}
-        return has_style and not has_non_style and recent_allows_follow and bool(self.last_ingredients) and self._is_fresh(self.last_ingredients_ts)
+        recent_allows_follow = state.last_intent in {"INGREDIENTS_TO_DISHES", "RECIPE", "INGREDIENTS"}
+        return has_style and not has_non_style and recent_allows_follow and bool(state.last_ingredients) and self._is_fresh(state.last_ingredients_ts)
+
+    async def process_message(self, message: str, session_id: Optional[str] = None) -> Dict[str, Any]:
+        # 세션 ID가 없는 요청은 이 요청에서만 쓰는 빈 상태로 처리 (다른 사용자와 상태를 공유하지 않음)
+        if not session_id:
+            return await self._process(message, ConversationState())
+        # SQLite 저장소 조회/저장이 이벤트 루프를 막지 않도록 스레드에서 수행
+        state = await asyncio.to_thread(self.sessions.load, session_id)
+        try:
+            return await self._process(message, state)
+        finally:
+            await asyncio.to_thread(self.sessions.save, session_id, state)
 
-    async def process_message(self, message: str) -> Dict[str, Any]:
+    async def _process(self, message: str, state: ConversationState) -> Dict[str, Any]:
         try:
-            self.turn_idx += 1
+            state.turn_idx += 1
             # 히스토리 비활성화: 사용자 메시지 저장하지 않음
 
-            selection_result = await self._handle_selection_if_any(message)
+            selection_result = await self._handle_selection_if_any(message, state)
             if selection_result is not None:
                 return selection_result
 
             if self._has_explicit_new_intent(message):
-                self.last_ingredients = []
-                self.last_ingredients_ts = 0.0
-                self.last_ingredients_turn = 0
-                self.last_suggested_dishes = []
-                self.last_suggested_ts = 0.0
-
-            if self._is_other_in_same_style(message) and self._is_cache_valid():
-                result = await self.recommend_dishes_by_ingredients_with_style(message, self.last_ingredients)
+                state.last_ingredients = []
+                state.last_ingredients_ts = 0.0
+                state.last_ingredients_turn = 0
+                state.last_suggested_dishes = []
+                state.last_suggested_ts = 0.0
+
+            if self._is_other_in_same_style(message, state) and self._is_cache_valid(state):
+                result = await self.recommend_dishes_by_ingredients_with_style(message, state.last_ingredients, state)
                 response_text = result.get("answer", "추천을 찾을 수 없습니다.")
                 self._add_assistant_response(response_text)
-                self.last_intent = "INGREDIENTS_TO_DISHES"
-                return {"answer": response_text, "food_name": None, "ingredients": result.get("extracted_ingredients", self.last_ingredients), "recipe": []}
+                state.last_intent = "INGREDIENTS_TO_DISHES"
+                return {"answer": response_text, "food_name": None, "ingredients": result.get("extracted_ingredients", state.last_ingredients), "recipe": []}
 
             # last_style이 없더라도 '다른 거'라면, 최근 재료 캐시로 동일 맥락 재추천(스타일 가정 없음)
-            if self._is_other_request(message) and self._is_cache_valid() and not self.last_style:
+            if self._is_other_request(message) and self._is_cache_valid(state) and not state.last_style:
                 ingredients_str = ", ".join([
                     (ing.get("item") if isinstance(ing, dict) and ing.get("item") else str(ing))
-                    for ing in self.last_ingredients
+                    for ing in state.last_ingredients
                 ])
-                result = await self.recommend_dishes_by_ingredients(ingredients_str)
+                result = await self.recommend_dishes_by_ingredients(ingredients_str, state)
                 response_text = result.get("answer", "추천을 찾을 수 없습니다.")
                 self._add_assistant_response(response_text)
-                self.last_intent = "INGREDIENTS_TO_DISHES"
-                return {"answer": response_text, "food_name": None, "ingredients": result.get("extracted_ingredients", self.last_ingredients), "recipe": []}
+                state.last_intent = "INGREDIENTS_TO_DISHES"
+                return {"answer": response_text, "food_name": None, "ingredients": result.get("extracted_ingredients", state.last_ingredients), "recipe": []}
 
-            if self._is_style_followup(message) and self._is_cache_valid():
-                result = await self.recommend_dishes_by_ingredients_with_style(message, self.last_ingredients)
+            if self._is_style_followup(message, state) and self._is_cache_valid(state):
+                result = await self.recommend_dishes_by_ingredients_with_style(message, state.last_ingredients, state)
                 response_text = result.get("answer", "해당 재료로 만들 수 있는 요리를 찾을 수 없습니다.")
                 self._add_assistant_response(response_text)
-                self.last_intent = "INGREDIENTS_TO_DISHES"
-                return {"answer": response_text, "food_name": None, "ingredients": result.get("extracted_ingredients", self.last_ingredients), "recipe": []}
+                state.last_intent = "INGREDIENTS_TO_DISHES"
+                return {"answer": response_text, "food_name": None, "ingredients": result.get("extracted_ingredients", state.last_ingredients), "recipe": []}
 
             # 동일 스타일 내 '다른 거' 요청이지만 재료 캐시가 없을 때: 최근 스타일로 카테고리 재추천
-            if self._is_other_request(message) and getattr(self, "last_style", "") and not self._is_cache_valid():
-                synthetic_message = self.last_style
-                result = self.recommenders.recommend_by_category(synthetic_message, avoid=self.last_suggested_dishes)
+            if self._is_other_request(message) and getattr(state, "last_style", "") and not self._is_cache_valid(state):
+                synthetic_message = state.last_style
+                result = await self.recommenders.recommend_by_category(synthetic_message, avoid=state.last_suggested_dishes)
                 items = result.get("items", []) if isinstance(result, dict) else []
-                category_label = result.get("category", self.last_style) if isinstance(result, dict) else self.last_style
+                category_label = result.get("category", state.last_style) if isinstance(result, dict) else state.last_style
                 # 디듀프: 이전 제안 및 현재 목록 내 중복 제거
                 def _norm_cat(n: str) -> str:
                     import re
@@ -153,7 +158,7 @@ class TextAgent:
                     s = re.sub(r"[\s·ㆍ・/|()-]+", "", s)
                     s = re.sub(r"[^a-z가-힣]", "", s)
                     return s
-                avoid_set = {_norm_cat(x) for x in getattr(self, "last_suggested_dishes", [])}
+                avoid_set = {_norm_cat(x) for x in getattr(state, "last_suggested_dishes", [])}
                 seen = set()
                 deduped = []
                 for it in items:
@@ -188,35 +193,36 @@ class TextAgent:
                     response_text += "\n원하는 요리의 레시피를 알려드릴까요? 번호나 요리명을 말씀해 주세요."
 
                 self._add_assistant_response(response_text)
-                self.last_intent = "CATEGORY"
-                self.last_style = category_label or self.last_style
-                self.last_style_ts = time.time()
+                state.last_intent = "CATEGORY"
+                state.last_style = category_label or state.last_style
+                state.last_style_ts = time.time()
                 if category_label == "한식":
-                    self.last_suggested_dishes = [str(x).strip() for x in items if (isinstance(x, str) and x.strip()) or (isinstance(x, dict) and x.get("name"))]
+                    state.last_suggested_dishes = [str(x).strip() for x in items if (isinstance(x, str) and x.strip()) or (isinstance(x, dict) and x.get("name"))]
                 else:
-                    self.last_suggested_dishes = [x.get("name", "").strip() for x in items if isinstance(x, dict) and x.get("name")]
-                self.last_suggested_ts = time.time()
-                self.last_suggested_turn = self.turn_idx
+                    state.last_suggested_dishes = [x.get("name", "").strip() for x in items if isinstance(x, dict) and x.get("name")]
+                state.last_suggested_ts = time.time()
+                state.last_suggested_turn = state.turn_idx
                 return {"answer": response_text, "food_name": None, "ingredients": [], "recipe": []}
 
-            intent = self.intent_classifier.classify(message, "")
+            parsed = await self._parse_message(message, state)
+            intent = parsed.intent
 
             if intent == "CATEGORY":
-                if self.last_ingredients and self._is_style_followup(message):
-                    result = await self.recommend_dishes_by_ingredients_with_style(message, self.last_ingredients)
+                if state.last_ingredients and self._is_style_followup(message, state):
+                    result = await self.recommend_dishes_by_ingredients_with_style(message, state.last_ingredients, state)
                     response_text = result.get("answer", "재료로 만들 수 있는 요리를 찾을 수 없습니다.")
                     self._add_assistant_response(response_text)
-                    self.last_intent = "INGREDIENTS_TO_DISHES"
-                    return {"answer": response_text, "food_name": None, "ingredients": result.get("extracted_ingredients", self.last_ingredients), "recipe": []}
+                    state.last_intent = "INGREDIENTS_TO_DISHES"
+                    return {"answer": response_text, "food_name": None, "ingredients": result.get("extracted_ingredients", state.last_ingredients), "recipe": []}
                 else:
-                    result = self.recommenders.recommend_by_category(message, avoid=self.last_suggested_dishes)
+                    result = await self.recommenders.recommend_by_category(message, avoid=state.last_suggested_dishes)
                     items = result.get("items", []) if isinstance(result, dict) else []
                     if not isinstance(result, dict) or not items or (result.get("category") == "미정"):
                         # 스타일 유도 멘트만 출력
                         response_text = "혹시 특별히 끌리는 요리 스타일(한식, 중식, 이탈리아식 등)이 있으신가요? 말씀해주시면 거기에 맞춰 맛있는 메뉴를 추천해드릴게요!"
                         # 번호 선택 방지 위해 캐시 초기화
-                        self.last_suggested_dishes = []
-                        self.last_suggested_turn = 0
+                        state.last_suggested_dishes = []
+                        state.last_suggested_turn = 0
                     else:
                         category_label = result.get("category", "한식")
                         # 디듀프: 이전 제안 및 현재 목록 내 중복 제거
@@ -226,7 +232,7 @@ class TextAgent:
                             s = re.sub(r"[\s·ㆍ・/|()-]+", "", s)
                             s = re.sub(r"[^a-z가-힣]", "", s)
                             return s
-                        avoid_set = {_norm_cat(x) for x in getattr(self, "last_suggested_dishes", [])}
+                        avoid_set = {_norm_cat(x) for x in getattr(state, "last_suggested_dishes", [])}
                         seen = set()
                         deduped = []
                         for it in items:
@@ -261,34 +267,36 @@ class TextAgent:
                             response_text += "\n원하는 요리의 레시피를 알려드릴까요? 번호나 요리명을 말씀해 주세요."
 
                     self._add_assistant_response(response_text)
-                    self.last_intent = "CATEGORY"
+                    state.last_intent = "CATEGORY"
                     # CATEGORY 결과의 카테고리를 최근 스타일로 기억하여 '다른 거' 재추천에 활용
                     if isinstance(result, dict) and result.get("category") and result.get("category") != "미정":
-                        self.last_style = result.get("category") or ""
-                        self.last_style_ts = time.time()
+                        state.last_style = result.get("category") or ""
+                        state.last_style_ts = time.time()
                     if (result.get("category") or "") == "한식":
-                        self.last_suggested_dishes = [str(x).strip() for x in items if isinstance(x, str) and x.strip()]
+                        state.last_suggested_dishes = [str(x).strip() for x in items if isinstance(x, str) and x.strip()]
                     else:
-                        self.last_suggested_dishes = [x.get("name", "").strip() for x in items if isinstance(x, dict) and x.get("name")]
-                    self.last_suggested_ts = time.time()
-                    self.last_suggested_turn = self.turn_idx
+                        state.last_suggested_dishes = [x.get("name", "").strip() for x in items if isinstance(x, dict) and x.get("name")]
+                    state.last_suggested_ts = time.time()
+                    state.last_suggested_turn = state.turn_idx
                     return {"answer": response_text, "food_name": None, "ingredients": [], "recipe": []}
 
             elif intent == "INGREDIENTS_TO_DISHES":
-                result = await self.recommend_dishes_by_ingredients(message)
+                result = await self.recommend_dishes_by_ingredients(message, state)
                 response_text = result.get("answer", "재료로 만들 수 있는 요리를 찾을 수 없습니다.")
                 extracted_ingredients = result.get("extracted_ingredients", [])
                 if extracted_ingredients:
-                    self.last_ingredients = extracted_ingredients
-                    self.last_ingredients_ts = time.time()
-                    self.last_ingredients_turn = self.turn_idx
+                    state.last_ingredients = extracted_ingredients
+                    state.last_ingredients_ts = time.time()
+                    state.last_ingredients_turn = state.turn_idx
                 self._add_assistant_response(response_text)
-                self.last_intent = "INGREDIENTS_TO_DISHES"
+                state.last_intent = "INGREDIENTS_TO_DISHES"
                 return {"answer": response_text, "food_name": None, "ingredients": [], "recipe": []}
 
             elif intent == "RECIPE":
-                dish = self._extract_dish_smart(message)
-                result = self.recipes.handle_vague_dish(dish) if self.recipes.is_vague_dish(dish) else self.recipes.get_recipe(dish)
+                dish = parsed.dish
+                if not dish:
+                    return self._ask_for_dish("레시피를")
+                result = await self.recipes.handle_vague_dish(dish) if self.recipes.is_vague_dish(dish) else await self.recipes.get_recipe(dish)
                 if result.get("type") == "vague_dish":
                     varieties = result.get("varieties", [])
                     response_text = f"어떤 {dish} 레시피를 원하시나요?\n\n"
@@ -296,15 +304,15 @@ class TextAgent:
                         response_text += f"{i}. {variety}\n"
                     response_text += f"\n다른 원하시는 {dish} 종류가 있으시면 말씀해주세요!"
                     self._add_assistant_response(response_text)
-                    self.last_suggested_dishes = [str(v).strip() for v in varieties if isinstance(v, str) and v.strip()]
-                    self.last_suggested_ts = time.time()
+                    state.last_suggested_dishes = [str(v).strip() for v in varieties if isinstance(v, str) and v.strip()]
+                    state.last_suggested_ts = time.time()
                     return {"answer": response_text, "food_name": dish, "ingredients": [], "recipe": []}
                 else:
                     title = result.get("title", dish)
                     ingredients = result.get("ingredients", [])
                     steps = result.get("steps", [])
                     if isinstance(ingredients, list):
-                        self.last_ingredients = ingredients
+                        state.last_ingredients = ingredients
                     response_text = "📋 [재료]\n"
                     for i, ingredient in enumerate(ingredients, 1):
                         response_text += f"{i}. {ingredient}\n"
@@ -316,8 +324,10 @@ class TextAgent:
                     return {"answer": simple_answer, "food_name": title, "ingredients": ingredients, "recipe": steps}
 
             elif intent == "INGREDIENTS":
-                dish = self._extract_dish_smart(message)
-                result = self.recipes.get_ingredients(dish)
+                dish = parsed.dish
+                if not dish:
+                    return self._ask_for_dish("재료를")
+                result = await self.recipes.get_ingredients(dish)
                 if not result or result == ["재료 정보를 찾을 수 없습니다"]:
                     response_text = "재료 정보를 찾을 수 없습니다"
                 else:
@@ -326,13 +336,15 @@ class TextAgent:
                         response_lines.append(f"{i}. {ingredient}")
                     response_text = "\n".join(response_lines)
                     if isinstance(result, list):
-                        self.last_ingredients = result
+                        state.last_ingredients = result
                 self._add_assistant_response(response_text)
                 return {"answer": response_text, "food_name": dish, "ingredients": result, "recipe": []}
 
             elif intent == "TIP":
-                dish = self._extract_dish_smart(message)
-                result = self.recipes.get_tips(dish)
+                dish = parsed.dish
+                if not dish:
+                    return self._ask_for_dish("조리 팁을")
+                result = await self.recipes.get_tips(dish)
                 if not result or result == ["조리 팁을 찾을 수 없습니다"]:
                     response_text = f"죄송합니다. {dish}의 조리 팁을 찾을 수 없습니다."
                 else:
@@ -345,10 +357,10 @@ class TextAgent:
                 return {"answer": response_text, "food_name": dish, "ingredients": [], "recipe": result}
 
             elif intent == "SUBSTITUTE":
-                dish = self._extract_dish_smart(message)
-                ingredient = self._extract_ingredient_to_substitute(message)
-                user_substitute = self._extract_explicit_substitute_name(message)
-                subs = self.substitutions.get_substitutions(dish, ingredient, user_substitute, message, "")
+                dish = parsed.dish
+                ingredient = parsed.ingredient
+                user_substitute = parsed.substitute
+                subs = await self.substitutions.get_substitutions(dish, ingredient, user_substitute, message, "")
                 target_ing = subs.get("ingredient", ingredient or "해당 재료")
                 substitute_name = subs.get("substituteName", user_substitute or "")
                 candidates = subs.get("substitutes", [])
@@ -374,19 +386,19 @@ class TextAgent:
                                 lines.append(line)
                         response_text = "\n".join(lines)
                 self._add_assistant_response(response_text)
-                return {"answer": response_text, "food_name": dish, "ingredients": [target_ing], "recipe": []}
+                return {"answer": response_text, "food_name": dish or None, "ingredients": [target_ing], "recipe": []}
 
             elif intent == "NECESSITY":
-                dish = self._extract_dish_smart(message)
-                ingredient = self._extract_ingredient_to_substitute(message)
-                result = self.substitutions.get_necessity(dish, ingredient, "")
+                dish = parsed.dish
+                ingredient = parsed.ingredient
+                result = await self.substitutions.get_necessity(dish, ingredient, "")
                 possible = result.get("possible", False)
                 flavor_change = result.get("flavor_change", "")
                 response_text = f"가능: {'예' if possible else '아니오'}"
                 if flavor_change:
                     response_text += f"\n맛 변화: {flavor_change}"
                 self._add_assistant_response(response_text)
-                return {"answer": response_text, "food_name": dish, "ingredients": [ingredient] if ingredient else [], "recipe": []}
+                return {"answer": response_text, "food_name": dish or None, "ingredients": [ingredient] if ingredient else [], "recipe": []}
 
             else:
                 response_text = "요리 관련 질문을 해주세요. 레시피, 재료, 조리 팁 등 무엇이든 도와드릴 수 있어요!"
@@ -397,19 +409,85 @@ class TextAgent:
             error_message = "죄송합니다. 처리 중 오류가 발생했습니다. 다시 시도해주세요."
             return {"answer": error_message, "food_name": None, "ingredients": [], "recipe": []}
 
-    def _extract_dish_smart(self, message: str) -> str:
+    async def _parse_message(self, message: str, state: ConversationState) -> ParsedMessage:
+        """
+        의도와 처리에 필요한 요리명/대상 재료/대체 재료.
+        규칙/로컬 모델이 의도를 정하고 요리명까지 분명하면 LLM 없이, 아니면 구조화된 출력 한 번으로 모두 추출
+        """
+        if not INTENT_STRUCTURED_PARSE:
+            intent = await self.intent_classifier.classify(message, "")
+            parsed = ParsedMessage(intent=intent)
+            if intent in SLOT_INTENTS:
+                parsed.dish = self._extract_dish_smart(message, state)
+            if intent in ("SUBSTITUTE", "NECESSITY"):
+                parsed.ingredient = self._extract_ingredient_to_substitute(message, state)
+            if intent == "SUBSTITUTE":
+                parsed.substitute = self._extract_explicit_substitute_name(message)
+            return parsed
+
+        decision = self.intent_classifier.decide_fast(message)
+        if decision.intent is not None:
+            parsed = self._parse_fast(message, state, decision)
+            if parsed is not None:
+                self.intent_classifier.accept_fast(decision)
+                return parsed
+
+        parsed = await self.intent_classifier.parse(message, self._parse_context(state), decision)
+        if parsed.dish:
+            state.last_dish = parsed.dish
+        return parsed
+
+    def _parse_fast(self, message: str, state: ConversationState, decision: FastDecision) -> Optional[ParsedMessage]:
+        """빠른 경로 의도에 필요한 항목을 확실히 채울 수 있을 때만 결과 반환 (아니면 None → 구조화된 LLM 추출)"""
+        intent = decision.intent
+        if intent not in SLOT_INTENTS:
+            return ParsedMessage(intent=intent, source=decision.source)
+        if intent in ("SUBSTITUTE", "NECESSITY"):
+            # 대상/대체 재료는 표현이 다양해 정규식으로 확실히 뽑을 수 없음
+            return None
+        # 지칭어("그거") 또는 "X 레시피"처럼 요리명이 분명한 경우만 (요리명 없는 질문을 최근 요리로 추측하지 않음)
+        if any(pronoun in message for pronoun in PRONOUNS):
+            dish = state.last_dish
+        else:
+            dish = find_dish_by_pattern(message)
+        # "그거 레시피"(최근 요리 없음), "더 맛있게 만드는 팁", "간단한 레시피", "오늘 저녁 레시피"는 LLM에 맡김
+        if not is_plausible_dish(dish):
+            return None
+        state.last_dish = dish
+        return ParsedMessage(intent=intent, dish=dish, source=decision.source)
+
+    def _parse_context(self, state: ConversationState) -> str:
+        lines = []
+        if state.last_dish:
+            lines.append(f"최근 요리: {state.last_dish}")
+        if state.last_ingredients:
+            names = [
+                (ing.get("item") if isinstance(ing, dict) and ing.get("item") else str(ing))
+                for ing in state.last_ingredients[:30]
+            ]
+            lines.append(f"최근 재료 목록: {', '.join(names)}")
+        if state.last_suggested_dishes:
+            lines.append(f"최근 추천한 요리: {', '.join(state.last_suggested_dishes)}")
+        return "\n".join(lines)
+
+    def _ask_for_dish(self, what: str) -> Dict[str, Any]:
+        response_text = f"어떤 요리의 {what} 알려드릴까요? 요리명을 말씀해 주세요."
+        self._add_assistant_response(response_text)
+        return {"answer": response_text, "food_name": None, "ingredients": [], "recipe": []}
+
+    def _extract_dish_smart(self, message: str, state: ConversationState) -> str:
         if any(pronoun in message for pronoun in PRONOUNS):
-            if self.last_dish:
-                return self.last_dish
+            if state.last_dish:
+                return state.last_dish
         dish = find_dish_by_pattern(message)
         if dish:
-            self.last_dish = dish
+            state.last_dish = dish
             return dish
         # fallback: keep last dish or unknown
-        return self.last_dish or "알 수 없는 요리"
+        return state.last_dish or UNKNOWN_DISH
 
-    def _extract_ingredient_to_substitute(self, message: str) -> str:
-        candidate_from_inventory = match_ingredient_from_inventory(message, self.last_ingredients)
+    def _extract_ingredient_to_substitute(self, message: str, state: ConversationState) -> str:
+        candidate_from_inventory = match_ingredient_from_inventory(message, state.last_ingredients)
         if candidate_from_inventory:
             return candidate_from_inventory
         patterns = [
@@ -428,7 +506,7 @@ class TextAgent:
             if match:
                 raw_ing = match.group(1).strip()
                 if 1 < len(raw_ing) < 30:
-                    mapped = map_to_inventory(raw_ing, self.last_ingredients)
+                    mapped = map_to_inventory(raw_ing, state.last_ingredients)
                     return mapped or raw_ing
         return ""
 
@@ -446,7 +524,7 @@ class TextAgent:
                     return name
         return ""
 
-    async def recommend_dishes_by_ingredients(self, message: str) -> Dict:
+    async def recommend_dishes_by_ingredients(self, message: str, state: ConversationState) -> Dict:
         prompt = f"""
         당신은 한식 전문가입니다. 사용자가 요청한 재료로 만들 수 있는 한식 요리를 추천해주세요.
 
@@ -482,7 +560,7 @@ class TextAgent:
           ]
         }}
         """
-        data = self.llm.generate_json(prompt)
+        data = await self.llm.agenerate_json(prompt)
         if not isinstance(data, dict):
             return {"answer": "재료 분석 중 오류가 발생했습니다. 다시 시도해주세요.", "extracted_ingredients": []}
         ingredients = data.get("ingredients", [])
@@ -495,8 +573,8 @@ class TextAgent:
             s = re.sub(r"[^a-z가-힣]", "", s)
             return s
         avoid_set = set()
-        if getattr(self, "last_suggested_dishes", None):
-            avoid_set = {_norm(x) for x in self.last_suggested_dishes}
+        if getattr(state, "last_suggested_dishes", None):
+            avoid_set = {_norm(x) for x in state.last_suggested_dishes}
         seen = set()
         filtered = []
         for d in dishes or []:
@@ -523,24 +601,24 @@ class TextAgent:
                 response_text += f"{i}. {dish}\n"
         response_text += "\n원하는 요리 형식이 있으신가요? (프랑스식, 이탈리아식, 미국식 등)"
         response_text += "\n또는 위 요리 중 어떤 것의 레시피를 알고 싶으시면 번호나 요리명을 말씀해주세요!"
-        self.last_suggested_dishes = [
+        state.last_suggested_dishes = [
             (d.get("name") if isinstance(d, dict) else str(d)).strip() for d in dishes if (isinstance(d, dict) and d.get("name")) or isinstance(d, str)
         ]
-        self.last_suggested_ts = time.time()
-        self.last_suggested_turn = self.turn_idx
+        state.last_suggested_ts = time.time()
+        state.last_suggested_turn = state.turn_idx
         return {"answer": response_text, "extracted_ingredients": ingredients, "recommended_dishes": dishes}
 
-    async def recommend_dishes_by_ingredients_with_style(self, message: str, last_ingredients: List[str]) -> Dict:
+    async def recommend_dishes_by_ingredients_with_style(self, message: str, last_ingredients: List[str], state: ConversationState) -> Dict:
         lower_msg = message.lower()
         inferred = next((c for c in CUISINE_PROFILES if any(k in lower_msg or k in message for k in c["keywords"])), None)
         if inferred is None:
             # 스타일 키워드가 없으면, 최근 스타일이 있으면 그것을 사용하고, 없으면 명확히 요청
-            if getattr(self, "last_style", ""):
-                inferred = next((c for c in CUISINE_PROFILES if c["key"] == self.last_style), None)
+            if getattr(state, "last_style", ""):
+                inferred = next((c for c in CUISINE_PROFILES if c["key"] == state.last_style), None)
             if inferred is None:
                 # 선택 번호 매핑 혼선을 막기 위해 추천 캐시를 비움
-                self.last_suggested_dishes = []
-                self.last_suggested_turn = 0
+                state.last_suggested_dishes = []
+                state.last_suggested_turn = 0
                 return {"answer": "원하시는 요리 스타일을 알려주세요. (예: 프랑스식, 이탈리아식, 미국식 등)", "extracted_ingredients": last_ingredients}
         category_key = inferred["key"]
         chef = inferred["chef"]
@@ -570,7 +648,7 @@ class TextAgent:
           ]
         }}
         """
-        data = self.llm.generate_json(prompt)
+        data = await self.llm.agenerate_json(prompt)
         if not isinstance(data, dict):
             return {"answer": f"{category_key} 스타일 요리 추천 중 오류가 발생했습니다. 다시 시도해주세요.", "extracted_ingredients": last_ingredients}
         style = data.get("style", category_key)
@@ -583,8 +661,8 @@ class TextAgent:
             s = re.sub(r"[^a-z가-힣]", "", s)
             return s
         avoid_set = set()
-        if getattr(self, "last_suggested_dishes", None):
-            avoid_set = {_norm(x) for x in self.last_suggested_dishes}
+        if getattr(state, "last_suggested_dishes", None):
+            avoid_set = {_norm(x) for x in state.last_suggested_dishes}
         seen = set()
         filtered = []
         for d in dishes or []:
@@ -609,26 +687,26 @@ class TextAgent:
             else:
                 response_text += f"{i}. {dish}\n"
         response_text += "\n원하는 요리의 레시피를 알려드릴까요? 번호(예: 1번)나 요리명을 말씀해 주세요."
-        self.last_suggested_dishes = [
+        state.last_suggested_dishes = [
             (d.get("name") if isinstance(d, dict) else str(d)).strip() for d in dishes if (isinstance(d, dict) and d.get("name")) or isinstance(d, str)
         ]
-        self.last_suggested_ts = time.time()
-        self.last_style = style
-        self.last_style_ts = time.time()
-        self.last_suggested_turn = self.turn_idx
+        state.last_suggested_ts = time.time()
+        state.last_style = style
+        state.last_style_ts = time.time()
+        state.last_suggested_turn = state.turn_idx
         return {"answer": response_text, "extracted_ingredients": last_ingredients, "style": style, "recommended_dishes": dishes}
 
-    async def _handle_selection_if_any(self, message: str):
+    async def _handle_selection_if_any(self, message: str, state: ConversationState):
         import re
         text = (message or "").strip()
         if not text:
             return None
         if not re.search(r"\d", text):
             return None
-        if not getattr(self, "last_suggested_dishes", None):
+        if not getattr(state, "last_suggested_dishes", None):
             return None
         # 직전 추천 직후의 선택만 허용하여 오래된 목록으로의 잘못된 매핑을 방지
-        if not getattr(self, "last_suggested_turn", 0) or (self.turn_idx - self.last_suggested_turn) > 1:
+        if not getattr(state, "last_suggested_turn", 0) or (state.turn_idx - state.last_suggested_turn) > 1:
             return None
         indices = re.findall(r"\d+", text)
         if not indices:
@@ -637,21 +715,21 @@ class TextAgent:
         for s in indices:
             try:
                 n = int(s)
-                if n >= 1 and n <= len(self.last_suggested_dishes) and n not in unique_idxs:
+                if n >= 1 and n <= len(state.last_suggested_dishes) and n not in unique_idxs:
                     unique_idxs.append(n)
             except Exception:
                 continue
         if not unique_idxs:
             return None
-        chosen_dishes = [self.last_suggested_dishes[i - 1] for i in unique_idxs]
+        chosen_dishes = [state.last_suggested_dishes[i - 1] for i in unique_idxs]
         main_dish = chosen_dishes[0]
-        recipe = self.recipes.get_recipe(main_dish)
+        recipe = await self.recipes.get_recipe(main_dish)
         answer_lines: List[str] = []
         if len(chosen_dishes) > 1:
             answer_lines.append("여러 개를 선택하셨네요. 먼저 1개 레시피부터 안내드릴게요. 나머지 요리도 원하시면 다시 번호를 말씀해주세요.")
         answer_lines.append(f"네. {recipe.get('title', main_dish)}의 레시피를 알려드릴게요.")
         self._add_assistant_response("\n".join(answer_lines))
-        self.last_intent = "RECIPE"
+        state.last_intent = "RECIPE"
         return {"answer": "\n".join(answer_lines), "food_name": recipe.get("title", main_dish), "ingredients": recipe.get("ingredients", []), "recipe": recipe.get("steps", recipe.get("recipe", []))}
 
 
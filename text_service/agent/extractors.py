@@ -4,6 +4,20 @@ from typing import List
 
 PRONOUNS = ["그거", "그 음식", "이거", "저거", "그것", "이것"]
 
+# "X 레시피"의 X 자리에 오지만 요리명이 아닌 말 (때/일반 명사)
+NON_DISH_WORDS = {"오늘", "내일", "아침", "점심", "저녁", "야식", "간식", "요리", "음식", "메뉴", "이", "그", "저", "좀", "다른", "아무"}
+# 관형형/부사형 어미로 끝나는 말 ("만드는", "간단한", "맛있게", "쉬운")
+_MODIFIER_ENDINGS = ("는", "한", "게", "운", "던")
+
+
+def is_plausible_dish(word: str) -> bool:
+    """find_dish_by_pattern이 잡은 단어가 요리명으로 볼 만한지 (지칭어/수식어/일반 명사 제외)"""
+    if not word:
+        return False
+    if any(word.startswith(p) or p.startswith(word) for p in PRONOUNS):
+        return False
+    return word not in NON_DISH_WORDS and not word.endswith(_MODIFIER_ENDINGS)
+
 
 def find_dish_by_pattern(message: str) -> str:
     patterns = [
@@ -1,7 +1,21 @@
 import logging
-from typing import Literal
+import time
+from dataclasses import dataclass
+from typing import Literal, Optional
 
+from ..config import (
+    INTENT_MODEL_AB_RATIO,
+    INTENT_MODEL_AUTO_PROMOTE,
+    INTENT_MODEL_MIN_CONFIDENCE,
+    INTENT_MODEL_MODE,
+    INTENT_MODEL_PATH,
+    INTENT_MODEL_PROMOTE_ACCURACY,
+    INTENT_MODEL_PROMOTE_MIN_SAMPLES,
+    INTENT_RULES_MODE,
+)
+from . import intent_rules
 from .llm import LLMClient
+from .local_model import LocalModelGate
 
 logger = logging.getLogger(__name__)
 
@@ -16,12 +30,156 @@ Intent = Literal[
     "OTHER",
 ]
 
+INTENTS = ["CATEGORY", "INGREDIENTS_TO_DISHES", "RECIPE", "INGREDIENTS", "TIP", "SUBSTITUTE", "NECESSITY", "OTHER"]
+# 요리명/재료명이 있어야 처리할 수 있는 의도
+SLOT_INTENTS = {"RECIPE", "INGREDIENTS", "TIP", "SUBSTITUTE", "NECESSITY"}
+
+PARSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "intent": {"type": "STRING", "enum": INTENTS},
+        "dish": {"type": "STRING"},
+        "ingredient": {"type": "STRING"},
+        "substitute": {"type": "STRING"},
+    },
+    "required": ["intent", "dish", "ingredient", "substitute"],
+}
+
+
+@dataclass
+class ParsedMessage:
+    """의도와 처리에 필요한 항목 (없는 항목은 빈 문자열)"""
+    intent: str
+    dish: str = ""
+    ingredient: str = ""
+    substitute: str = ""
+    source: str = "llm"  # rules | model | llm
+
+
+@dataclass
+class FastDecision:
+    """규칙/로컬 모델 단계의 결과. intent가 None이면 LLM이 필요"""
+    intent: Optional[str] = None
+    source: str = ""
+    rule_intent: Optional[str] = None
+    confidence: float = 0.0
+    shadow: bool = False
+    model_intent: Optional[str] = None
+
+
+_intent_model: Optional[LocalModelGate] = None
+
+
+def get_intent_model() -> LocalModelGate:
+    """프로세스 공용 로컬 의도 분류 모델 게이트"""
+    global _intent_model
+    if _intent_model is None:
+        _intent_model = LocalModelGate(
+            "intent",
+            INTENT_MODEL_PATH,
+            mode=INTENT_MODEL_MODE,
+            ab_ratio=INTENT_MODEL_AB_RATIO,
+            min_confidence=INTENT_MODEL_MIN_CONFIDENCE,
+            promote_accuracy=INTENT_MODEL_PROMOTE_ACCURACY,
+            promote_min_samples=INTENT_MODEL_PROMOTE_MIN_SAMPLES,
+            auto_promote=INTENT_MODEL_AUTO_PROMOTE,
+        )
+    return _intent_model
+
 
 class IntentClassifier:
     def __init__(self, llm: LLMClient) -> None:
         self.llm = llm
+        self.model = get_intent_model()
+
+    async def classify(self, message: str, context: str) -> Intent:
+        decision = self.decide_fast(message)
+        if decision.intent is not None:
+            self.accept_fast(decision)
+            return decision.intent  # type: ignore[return-value]
+
+        started = time.perf_counter()
+        llm_intent = await self._classify_llm(message, context)
+        self._record_llm(message, decision, llm_intent, started)
+        return llm_intent
+
+    def decide_fast(self, message: str) -> FastDecision:
+        """규칙 → 로컬 모델 순서로 LLM 없이 의도를 정함 (규칙 shadow 비교 중에는 LLM 결과가 필요하므로 정하지 않음)"""
+        decision = FastDecision()
+        if INTENT_RULES_MODE != "off":
+            rule_intent, confidence, matched = intent_rules.decide(message)
+            intent_rules.record_decision(rule_intent)
+            shadow = INTENT_RULES_MODE == "shadow" or (rule_intent is not None and intent_rules.should_shadow())
+            decision = FastDecision(rule_intent=rule_intent, confidence=confidence, shadow=rule_intent is not None and shadow)
+            if rule_intent is not None and not shadow:
+                logger.info(f"규칙 기반 의도 분류: {rule_intent} (신뢰도 {confidence}, 규칙 {matched})")
+                decision.intent, decision.source = rule_intent, "rules"
+                return decision
+
+        model_intent, prob, _ = self.model.predict(message)
+        decision.model_intent = model_intent
+        if decision.rule_intent is None and self.model.should_serve(model_intent, prob):
+            logger.info(f"로컬 모델 의도 분류: {model_intent} (확률 {prob:.2f})")
+            decision.intent, decision.source = model_intent, "model"
+        return decision
+
+    def accept_fast(self, decision: FastDecision) -> None:
+        """빠른 경로 결과를 실제로 사용했을 때 호출 (항목을 채우지 못해 LLM으로 넘긴 경우는 제외)"""
+        if decision.source == "model":
+            self.model.record_served()
+
+    async def parse(self, message: str, context: str, decision: Optional[FastDecision] = None) -> ParsedMessage:
+        """
+        의도와 요리명/대상 재료/대체 재료를 구조화된 출력 한 번으로 추출.
+        context에는 최근 요리와 재료 목록을 넣어 "그거", "그 재료" 같은 지칭을 풀게 함
+        """
+        prompt = f"""
+        당신은 요리 대화의 사용자 메시지를 분석하는 전문가입니다.
+
+        대화 컨텍스트:
+        {context or "없음"}
+
+        현재 메시지: {message}
+
+        intent (하나만):
+        - CATEGORY: 음식 카테고리 요청 (한식 추천, 중식 추천 등). 카테고리 없이 "추천"만 요청해도 CATEGORY
+        - INGREDIENTS_TO_DISHES: 재료로 요리 추천 요청 (재료 가지고, 재료로 뭐 만들까 등)
+        - RECIPE: 레시피 요청 (레시피 알려줘, 조리법, 만드는 법)
+        - INGREDIENTS: 재료 요청 (재료 알려줘, 재료만)
+        - TIP: 조리 팁 요청
+        - SUBSTITUTE: 재료 대체 요청 (X 대신, 대체 가능, 없으면 뭘로, Y 써도 돼?)
+        - NECESSITY: 재료 필요 여부 (꼭 넣어야 해?, 빼도 돼?, 없어도 돼?, 생략해도 돼?)
+        - OTHER: 그 외
+
+        dish: 대상 요리명. "그거", "그 음식", "이거" 같은 지칭이나 요리명이 없는 후속 질문은 컨텍스트의 최근 요리를 사용하세요.
+              메시지와 컨텍스트 어디에도 요리가 없으면 빈 문자열.
+        ingredient: SUBSTITUTE/NECESSITY에서 빼거나 바꾸려는 재료명 (수량/조사 없이, 최근 재료 목록에 있으면 그 이름). 없으면 빈 문자열.
+        substitute: SUBSTITUTE에서 사용자가 직접 말한 대체 재료명 ("버터 말고 올리브유 써도 돼?" → 올리브유). 없으면 빈 문자열.
+        """
+        started = time.perf_counter()
+        data = await self.llm.agenerate_json(prompt, schema=PARSE_SCHEMA)
+        if not isinstance(data, dict) or data.get("intent") not in INTENTS:
+            logger.error(f"구조화된 의도 분석 실패: {data}")
+            # 빠른 경로가 정한 의도가 있으면 그것만이라도 사용
+            fallback = decision.intent if decision and decision.intent else "OTHER"
+            return ParsedMessage(intent=fallback, source=decision.source if decision and decision.intent else "llm")
+
+        parsed = ParsedMessage(
+            intent=data["intent"],
+            dish=str(data.get("dish") or "").strip(),
+            ingredient=str(data.get("ingredient") or "").strip(),
+            substitute=str(data.get("substitute") or "").strip(),
+        )
+        self._record_llm(message, decision or FastDecision(), parsed.intent, started)
+        return parsed
+
+    def _record_llm(self, message: str, decision: FastDecision, llm_intent: str, started: float) -> None:
+        self.model.record_llm(decision.model_intent, llm_intent, (time.perf_counter() - started) * 1000)
+        if INTENT_RULES_MODE != "off":
+            # 규칙이 결정했는데도 LLM을 부른 경우(shadow, 항목 추출)는 두 결과의 일치 여부를 기록
+            intent_rules.record_llm_label(message, decision.rule_intent, decision.confidence, llm_intent, shadow=decision.shadow)
 
-    def classify(self, message: str, context: str) -> Intent:
+    async def _classify_llm(self, message: str, context: str) -> Intent:
         prompt = f"""
         당신은 세계적으로 유명한 프로 셰프이자 요리 전문가입니다.
         Pierre Koffmann(프랑스), Gordon Ramsay(미국식), Ken Hom(중식), Massimo Bottura(이탈리아), José Andrés(스페인식), Yotam Ottolenghi(지중해식), 강레오(한식), 안성재(한식) 셰프의 경험과 스타일을 모두 갖춘 요리 컨설턴트입니다.
@@ -48,17 +206,8 @@ class IntentClassifier:
         """
 
         try:
-            intent_text = self.llm.generate_text(prompt).upper()
-            return intent_text if intent_text in {
-                "CATEGORY",
-                "INGREDIENTS_TO_DISHES",
-                "RECIPE",
-                "INGREDIENTS",
-                "TIP",
-                "SUBSTITUTE",
-                "NECESSITY",
-                "OTHER",
-            } else "OTHER"  # type: ignore[return-value]
+            intent_text = (await self.llm.agenerate_text(prompt)).upper()
+            return intent_text if intent_text in INTENTS else "OTHER"  # type: ignore[return-value]
         except Exception as e:
             logger.error(f"Intent classification error: {e}")
             return "OTHER"  # type: ignore[return-value]
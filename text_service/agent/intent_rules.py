@@ -0,0 +1,123 @@
+# 의도 분류 규칙 기반 빠른 경로 (LLM 호출 없음)
+# "X 레시피 알려줘", "X 재료", "X 팁", "X 대신" 처럼 표현이 분명한 메시지는 정규식 규칙으로 바로 분류하고,
+# 여러 의도에 걸치거나 아무 규칙에도 맞지 않는 애매한 메시지만 LLM 분류로 넘깁니다.
+import json
+import logging
+import random
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from ..config import INTENT_LOG_PATH, INTENT_RULE_THRESHOLD, INTENT_SHADOW_RATE
+from .constants import STYLE_KEYWORDS
+
+logger = logging.getLogger(__name__)
+
+# (의도, 규칙 이름, 가중치, 정규식). 가중치는 규칙 하나만 맞았을 때의 신뢰도
+_RULES: List[Tuple[str, str, float, str]] = [
+    ("SUBSTITUTE", "instead", 0.95, r"대신|대체\s*(재료|할|해도|가능)|없으면\s*(뭘로|뭐로|무엇으로|어떻게)|말고\s*[가-힣A-Za-z]+\s*(써도|넣어도)|[가-힣A-Za-z]+\s*써도\s*(돼|되|될까)"),
+    ("NECESSITY", "can_skip", 0.95, r"꼭\s*(넣어야|필요|있어야)|빼도\s*(돼|되|될까)|없어도\s*(돼|되|될까)|생략\s*해도|반드시\s*필요|안\s*넣어도"),
+    ("INGREDIENTS_TO_DISHES", "with_ingredients", 0.9,
+     r"(로|으로|가지고|갖고|있는데|남았는데)\s*.{0,10}(뭐|무슨|어떤|할\s*수\s*있는|만들\s*수\s*있는)\s*.{0,6}(요리|음식|메뉴|만들|해\s*먹)|냉장고에|재료로\s*.{0,6}(추천|만들|요리)"),
+    ("RECIPE", "recipe", 0.9, r"레시피|만드는\s*법|만드는\s*방법|조리법|어떻게\s*만들"),
+    ("INGREDIENTS", "ingredients", 0.9, r"재료(?!로)\s*(만|는|가|좀|알려|뭐|목록|리스트|\?|$)|뭐\s*(들어가|필요해)"),
+    ("TIP", "tip", 0.9, r"팁|요령|비법|노하우|더\s*맛있게"),
+    ("CATEGORY", "style_recommend", 0.9, r"(" + "|".join(map(re.escape, STYLE_KEYWORDS)) + r")\s*.{0,8}(추천|뭐\s*먹|메뉴)"),
+    # "감자 요리 추천"처럼 재료가 붙은 추천도 맞으므로 단독으로는 임계값 미만 (다른 규칙과 함께 맞을 때만 참고)
+    ("CATEGORY", "recommend", 0.6, r"추천|뭐\s*먹지|뭐\s*해\s*먹|메뉴\s*(골라|정해)"),
+]
+_COMPILED = [(intent, name, weight, re.compile(pattern, re.IGNORECASE)) for intent, name, weight, pattern in _RULES]
+
+# 여러 의도 규칙이 함께 맞을 때 앞 의도가 뒤 의도의 표현을 포함하는 조합 ("레시피에서 마늘 대신" → SUBSTITUTE)
+# 이 밖의 조합("레시피랑 팁")은 애매한 것으로 보고 LLM에 넘김
+_DOMINATES = {
+    ("SUBSTITUTE", "RECIPE"), ("SUBSTITUTE", "INGREDIENTS"), ("SUBSTITUTE", "CATEGORY"),
+    ("NECESSITY", "RECIPE"), ("NECESSITY", "INGREDIENTS"),
+    ("INGREDIENTS_TO_DISHES", "CATEGORY"), ("INGREDIENTS_TO_DISHES", "RECIPE"),
+}
+
+
+def classify(message: str) -> Tuple[Optional[str], float, List[str]]:
+    """(의도, 신뢰도, 맞은 규칙 이름). 맞은 규칙이 없으면 의도는 None"""
+    text = (message or "").strip()
+    scores: Dict[str, float] = {}
+    matched: List[str] = []
+    for intent, name, weight, pattern in _COMPILED:
+        if pattern.search(text):
+            matched.append(name)
+            scores[intent] = max(scores.get(intent, 0.0), weight)
+    if not scores:
+        return None, 0.0, matched
+
+    ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+    top, confidence = ranked[0]
+    for other, weight in ranked[1:]:
+        if (top, other) in _DOMINATES:
+            continue
+        if (other, top) in _DOMINATES:
+            top, confidence = other, max(confidence, weight)
+            continue
+        # 서로 설명되지 않는 의도가 함께 맞으면 차이만큼만 신뢰
+        confidence = min(confidence, max(0.0, confidence - weight + 0.3))
+    return top, round(confidence, 3), matched
+
+
+def decide(message: str, threshold: float = INTENT_RULE_THRESHOLD) -> Tuple[Optional[str], float, List[str]]:
+    """확실하면 의도, 애매하면 None (LLM 분류 필요)"""
+    intent, confidence, matched = classify(message)
+    if intent is not None and confidence >= threshold:
+        return intent, confidence, matched
+    return None, confidence, matched
+
+
+# --- 통계 및 기록 ---
+_stats = {"rule_decided": 0, "ambiguous": 0, "llm_calls": 0, "shadow_calls": 0, "agree": 0, "compared": 0}
+_disagreements: Dict[str, int] = {}
+_stats_lock = threading.Lock()
+
+
+def should_shadow() -> bool:
+    """규칙이 결정한 경우에도 일정 비율은 LLM을 함께 호출해 일치율을 측정"""
+    return random.random() < INTENT_SHADOW_RATE
+
+
+def record_decision(intent: Optional[str]) -> None:
+    with _stats_lock:
+        _stats["ambiguous" if intent is None else "rule_decided"] += 1
+
+
+def record_llm_label(message: str, rule_intent: Optional[str], confidence: float, llm_intent: str, shadow: bool) -> None:
+    with _stats_lock:
+        _stats["llm_calls"] += 1
+        if shadow:
+            _stats["shadow_calls"] += 1
+        if rule_intent is not None:
+            _stats["compared"] += 1
+            if rule_intent == llm_intent:
+                _stats["agree"] += 1
+            else:
+                key = f"{rule_intent}->{llm_intent}"
+                _disagreements[key] = _disagreements.get(key, 0) + 1
+    if rule_intent is not None and rule_intent != llm_intent:
+        logger.info(f"의도 규칙 불일치: 규칙={rule_intent}({confidence}) LLM={llm_intent} 메시지='{message}'")
+
+    if INTENT_LOG_PATH:
+        try:
+            with _stats_lock, open(INTENT_LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps({
+                    "message": message, "label": llm_intent, "rule": rule_intent, "confidence": confidence,
+                }, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning(f"의도 학습 데이터 기록 실패: {e}")
+
+
+def get_stats() -> Dict:
+    with _stats_lock:
+        stats = dict(_stats)
+        stats["disagreements"] = dict(sorted(_disagreements.items(), key=lambda kv: -kv[1])[:10])
+    total = stats["rule_decided"] + stats["ambiguous"]
+    stats["total"] = total
+    stats["saved_calls"] = max(0, total - stats["llm_calls"])
+    stats["saved_ratio"] = round(stats["saved_calls"] / total, 4) if total else 0.0
+    stats["agreement_rate"] = round(stats["agree"] / stats["compared"], 4) if stats["compared"] else None
+    return stats
@@ -1,15 +1,41 @@
+import asyncio
 import json
 import logging
 from typing import Any, Dict, Optional
 
 import google.generativeai as genai
 
+from ..config import LLM_MAX_CONCURRENCY, LLM_TIMEOUT_SECONDS
+
 logger = logging.getLogger(__name__)
 
+JSON_CONFIG = {"response_mime_type": "application/json"}
+
 
 class LLMClient:
-    def __init__(self, model_name: str = "gemini-2.5-flash") -> None:
+    def __init__(self, model_name: str = "gemini-2.5-flash", max_concurrency: int = LLM_MAX_CONCURRENCY) -> None:
+        self.model_name = model_name
         self.model = genai.GenerativeModel(model_name)
+        self.max_concurrency = max(1, max_concurrency)
+        # 세마포어는 이벤트 루프에 묶이므로 처음 사용하는 루프에서 생성
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _generate_async(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None):
+        # Gemini 비동기 API 사용: 응답을 기다리는 동안 이벤트 루프가 다른 요청을 처리
+        async with self._get_semaphore():
+            return await self.model.generate_content_async(
+                prompt,
+                generation_config=generation_config,
+                request_options={"timeout": LLM_TIMEOUT_SECONDS},
+            )
 
     def generate_text(self, prompt: str) -> str:
         """Plain text generation with basic error handling."""
@@ -23,13 +49,32 @@ class LLMClient:
     def generate_json(self, prompt: str) -> Optional[Dict[str, Any]]:
         """Generate JSON content and parse safely; returns None on failure."""
         try:
-            resp = self.model.generate_content(
-                prompt, generation_config={"response_mime_type": "application/json"}
-            )
+            resp = self.model.generate_content(prompt, generation_config=JSON_CONFIG)
             text = getattr(resp, "text", "").strip()
             return json.loads(text)
         except Exception as e:
             logger.error(f"LLM JSON generation error: {e}")
             return None
 
+    async def agenerate_text(self, prompt: str) -> str:
+        """Non-blocking variant of generate_text for use inside the async request path."""
+        try:
+            resp = await self._generate_async(prompt)
+            return getattr(resp, "text", "").strip()
+        except Exception as e:
+            logger.error(f"LLM text generation error: {e}")
+            return ""
+
+    async def agenerate_json(self, prompt: str, schema: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Non-blocking variant of generate_json; returns None on failure.
 
+        With a schema the response is constrained to it (Gemini structured output).
+        """
+        try:
+            config = {**JSON_CONFIG, "response_schema": schema} if schema else JSON_CONFIG
+            resp = await self._generate_async(prompt, config)
+            text = getattr(resp, "text", "").strip()
+            return json.loads(text)
+        except Exception as e:
+            logger.error(f"LLM JSON generation error: {e}")
+            return None
@@ -0,0 +1,257 @@
+# CPU 전용 로컬 의도 분류 모델 (문자 n-gram 해싱 특징 + 다중 클래스 로지스틱 회귀, NumPy)
+# LLM이 붙인 라벨 기록((메시지, 라벨) JSONL)으로 학습하며, text_service의 의도 분류와
+# intent_service의 도구 선택에 함께 사용합니다. shadow/A-B 모드로 LLM과 비교해 정확도를 재고,
+# 기준을 넘으면 주 분류기(primary)로 승격할 수 있습니다.
+import argparse
+import json
+import logging
+import random
+import re
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIM = 2 ** 16
+MODES = ("off", "shadow", "ab", "primary")
+
+
+def _ngrams(text: str, n_min: int = 1, n_max: int = 3) -> List[str]:
+    """공백을 경계 문자로 바꾼 문자 n-gram과 단어 토큰"""
+    norm = re.sub(r"\s+", " ", (text or "").lower()).strip()
+    padded = f" {norm} "
+    grams = [
+        f"c{n}:{padded[i:i + n]}"
+        for n in range(n_min, n_max + 1)
+        for i in range(len(padded) - n + 1)
+    ]
+    grams.extend(f"w:{w}" for w in norm.split())
+    return grams
+
+
+class NgramClassifier:
+    def __init__(self, labels: Sequence[str], dim: int = DEFAULT_DIM, meta: Optional[Dict] = None) -> None:
+        self.labels = list(labels)
+        self.dim = dim
+        self.W = np.zeros((dim, len(self.labels)), dtype=np.float32)
+        self.b = np.zeros(len(self.labels), dtype=np.float32)
+        self.meta = meta or {}
+
+    def featurize(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """해시된 특징 인덱스와 L2 정규화된 빈도 (중복 인덱스는 합산)"""
+        hashed = np.fromiter((zlib.crc32(g.encode("utf-8")) % self.dim for g in _ngrams(text)), dtype=np.int64)
+        if hashed.size == 0:
+            return hashed, np.zeros(0, dtype=np.float32)
+        idx, counts = np.unique(hashed, return_counts=True)
+        values = counts.astype(np.float32)
+        return idx, values / np.linalg.norm(values)
+
+    def _probs(self, idx: np.ndarray, values: np.ndarray) -> np.ndarray:
+        z = values @ self.W[idx] + self.b if idx.size else self.b.copy()
+        z = z - z.max()
+        e = np.exp(z)
+        return e / e.sum()
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        probs = self._probs(*self.featurize(text))
+        best = int(probs.argmax())
+        return self.labels[best], float(probs[best])
+
+    def fit(self, texts: Sequence[str], labels: Sequence[str], epochs: int = 15, lr: float = 0.5,
+            l2: float = 1e-5, seed: int = 0) -> None:
+        """샘플 단위 SGD (특징이 희소하므로 해당 행만 갱신)"""
+        label_index = {l: i for i, l in enumerate(self.labels)}
+        data = [(self.featurize(t), label_index[l]) for t, l in zip(texts, labels)]
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(data)
+            step = lr / (1 + epoch * 0.5)
+            for (idx, values), y in data:
+                grad = self._probs(idx, values)
+                grad[y] -= 1.0
+                if idx.size:
+                    rows = self.W[idx]
+                    self.W[idx] = rows * (1 - step * l2) - step * np.outer(values, grad)
+                self.b -= step * grad
+
+    def accuracy(self, texts: Sequence[str], labels: Sequence[str]) -> float:
+        if not texts:
+            return 0.0
+        return sum(self.predict(t)[0] == l for t, l in zip(texts, labels)) / len(texts)
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(
+            path, W=self.W, b=self.b, labels=np.array(self.labels),
+            meta=np.array(json.dumps({**self.meta, "dim": self.dim}, ensure_ascii=False)),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "NgramClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            model = cls([str(l) for l in data["labels"]], dim=int(meta.get("dim", DEFAULT_DIM)), meta=meta)
+            model.W = data["W"].astype(np.float32)
+            model.b = data["b"].astype(np.float32)
+        return model
+
+
+# --- LLM 대비 평가와 모드 전환 ---
+class LocalModelGate:
+    """
+    로컬 모델을 LLM 앞에 두는 게이트.
+    off: 사용 안 함 / shadow: 항상 LLM 결과를 쓰고 모델은 비교만 / ab: ab_ratio 비율만 모델 결과 사용 / primary: 모델이 확실하면 LLM 생략
+    """
+
+    def __init__(self, name: str, path: str, mode: str = "off", ab_ratio: float = 0.1, min_confidence: float = 0.7,
+                 promote_accuracy: float = 0.95, promote_min_samples: int = 200, auto_promote: bool = False) -> None:
+        self.name = name
+        self.path = path
+        self.mode = mode if mode in MODES else "off"
+        self.ab_ratio = ab_ratio
+        self.min_confidence = min_confidence
+        self.promote_accuracy = promote_accuracy
+        self.promote_min_samples = promote_min_samples
+        self.auto_promote = auto_promote
+        self.model: Optional[NgramClassifier] = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "predictions": 0, "served_by_model": 0, "llm_calls": 0, "compared": 0, "agree": 0,
+            "model_ms_total": 0.0, "llm_ms_total": 0.0,
+        }
+        if self.mode != "off":
+            self.reload()
+
+    def reload(self) -> bool:
+        try:
+            model = NgramClassifier.load(self.path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"[{self.name}] 로컬 모델을 불러오지 못했습니다 ({self.path}): {e}")
+            return False
+        with self._lock:
+            self.model = model
+        logger.info(f"[{self.name}] 로컬 모델 로드: {self.path} (라벨 {len(model.labels)}개, 모드 {self.mode})")
+        return True
+
+    def predict(self, text: str) -> Tuple[Optional[str], float, float]:
+        """(라벨, 확률, 소요 ms). 모델이 없거나 꺼져 있으면 라벨은 None"""
+        model = self.model
+        if self.mode == "off" or model is None:
+            return None, 0.0, 0.0
+        started = time.perf_counter()
+        label, prob = model.predict(text)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._stats["predictions"] += 1
+            self._stats["model_ms_total"] += elapsed_ms
+        return label, prob, elapsed_ms
+
+    def should_serve(self, label: Optional[str], prob: float) -> bool:
+        """이번 요청에 모델 결과를 그대로 쓸지 (확률이 기준 미만이면 항상 LLM)"""
+        if label is None or prob < self.min_confidence:
+            return False
+        if self.mode == "primary":
+            return True
+        return self.mode == "ab" and random.random() < self.ab_ratio
+
+    def record_served(self) -> None:
+        with self._lock:
+            self._stats["served_by_model"] += 1
+
+    def record_llm(self, label: Optional[str], llm_label: str, llm_ms: float) -> None:
+        with self._lock:
+            self._stats["llm_calls"] += 1
+            self._stats["llm_ms_total"] += llm_ms
+            if label is not None:
+                self._stats["compared"] += 1
+                self._stats["agree"] += int(label == llm_label)
+        if self.auto_promote and self.mode in ("shadow", "ab") and self.promotable():
+            self.promote()
+
+    def promotable(self) -> bool:
+        with self._lock:
+            compared, agree = self._stats["compared"], self._stats["agree"]
+        return compared >= self.promote_min_samples and agree / compared >= self.promote_accuracy
+
+    def promote(self) -> None:
+        logger.info(f"[{self.name}] 로컬 모델을 primary로 승격합니다. (LLM 일치율 {self.stats()['accuracy']})")
+        self.set_mode("primary")
+
+    def set_mode(self, mode: str) -> None:
+        if mode not in MODES:
+            raise ValueError(f"알 수 없는 모드: {mode} ({', '.join(MODES)} 중 하나)")
+        if mode != "off" and self.model is None:
+            self.reload()
+        self.mode = mode
+
+    def stats(self) -> Dict:
+        with self._lock:
+            s = dict(self._stats)
+        total = s["served_by_model"] + s["llm_calls"]
+        return {
+            "mode": self.mode,
+            "model_loaded": self.model is not None,
+            "trained": (self.model.meta if self.model else {}),
+            "ab_ratio": self.ab_ratio,
+            "predictions": s["predictions"],
+            "compared": s["compared"],
+            "accuracy": round(s["agree"] / s["compared"], 4) if s["compared"] else None,
+            "llm_calls_saved": s["served_by_model"],
+            "saved_ratio": round(s["served_by_model"] / total, 4) if total else 0.0,
+            "avg_model_ms": round(s["model_ms_total"] / s["predictions"], 3) if s["predictions"] else None,
+            "avg_llm_ms": round(s["llm_ms_total"] / s["llm_calls"], 1) if s["llm_calls"] else None,
+            "promotable": self.promotable(),
+        }
+
+
+# --- 학습 ---
+def load_samples(path: str, text_key: str = "message", label_key: str = "label") -> Tuple[List[str], List[str]]:
+    texts, labels = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            if rec.get(text_key) and rec.get(label_key):
+                texts.append(str(rec[text_key]))
+                labels.append(str(rec[label_key]))
+    return texts, labels
+
+
+def train_from_log(log_path: str, out_path: str, holdout: float = 0.2, dim: int = DEFAULT_DIM,
+                   epochs: int = 15, seed: int = 0) -> Dict:
+    """(메시지, LLM 라벨) 기록으로 학습하고 홀드아웃 정확도를 함께 저장"""
+    texts, labels = load_samples(log_path)
+    if not texts:
+        raise ValueError("학습 데이터가 없습니다.")
+    order = list(range(len(texts)))
+    random.Random(seed).shuffle(order)
+    n_test = int(len(order) * holdout)
+    test, train = order[:n_test], order[n_test:]
+
+    model = NgramClassifier(sorted(set(labels)), dim=dim)
+    model.fit([texts[i] for i in train], [labels[i] for i in train], epochs=epochs, seed=seed)
+    report = {
+        "samples": len(texts),
+        "train_accuracy": round(model.accuracy([texts[i] for i in train], [labels[i] for i in train]), 4),
+        "holdout_accuracy": round(model.accuracy([texts[i] for i in test], [labels[i] for i in test]), 4) if test else None,
+        "labels": {l: labels.count(l) for l in model.labels},
+        "trained_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    model.meta = report
+    model.save(out_path)
+    return report
+
+
+if __name__ == "__main__":
+    # 사용법: python -m text_service.agent.local_model <학습 로그 jsonl> <모델 출력 npz>
+    parser = argparse.ArgumentParser(description="로컬 의도 분류 모델 학습")
+    parser.add_argument("log", help="(message, label) JSONL 기록 (INTENT_LOG_PATH / TOOL_LOG_PATH)")
+    parser.add_argument("out", help="모델 출력 경로 (.npz)")
+    parser.add_argument("--holdout", type=float, default=0.2, help="평가용으로 떼어 둘 비율")
+    parser.add_argument("--epochs", type=int, default=15)
+    args = parser.parse_args()
+    print(json.dumps(train_from_log(args.log, args.out, args.holdout, epochs=args.epochs), ensure_ascii=False, indent=2))
@@ -1,7 +1,10 @@
 import json
 import logging
-from typing import Dict, List
+from typing import Any, Callable, Dict, List, Optional
 
+from .cache import RecipeCache, canonical_dish, get_recipe_cache, prompt_version
+from .constants import UNKNOWN_DISH
+from ..config import DISH_BUNDLE
 from .llm import LLMClient
 from .parsers import (
     parse_recipe_from_text,
@@ -11,10 +14,56 @@ from .parsers import (
 
 logger = logging.getLogger(__name__)
 
+# 프롬프트 버전 계산용 자리표시자 (요리명을 뺀 프롬프트 본문이 바뀌면 캐시 키가 바뀜)
+_DISH_PLACEHOLDER = "\x00DISH\x00"
+
+# 요리 번들 응답 스키마: 레시피/재료/팁을 한 번에 생성
+BUNDLE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "title": {"type": "STRING"},
+        "ingredients": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "item": {"type": "STRING"},
+                    "amount": {"type": "STRING"},
+                    "unit": {"type": "STRING"},
+                },
+                "required": ["item", "amount", "unit"],
+            },
+        },
+        "steps": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "tips": {"type": "ARRAY", "items": {"type": "STRING"}},
+    },
+    "required": ["title", "ingredients", "steps", "tips"],
+}
+
+
+def _is_valid_bundle(data: Any) -> bool:
+    return isinstance(data, dict) and bool(data.get("ingredients")) and bool(data.get("steps"))
+
 
 class Recipes:
-    def __init__(self, llm: LLMClient) -> None:
+    def __init__(self, llm: LLMClient, cache: Optional[RecipeCache] = None) -> None:
         self.llm = llm
+        self.cache = cache if cache is not None else get_recipe_cache()
+
+    async def _cached_json(self, kind: str, dish: str, build_prompt: Callable[[str], str], is_valid: Callable[[Any], bool],
+                           schema: Optional[Dict[str, Any]] = None):
+        """요리별 LLM JSON 응답을 캐시에서 찾고, 없으면 생성해 유효한 결과만 저장"""
+        if self.cache is None or dish == UNKNOWN_DISH or not canonical_dish(dish):
+            return await self.llm.agenerate_json(build_prompt(dish), schema)
+        key = self.cache.key(kind, dish, prompt_version(build_prompt(_DISH_PLACEHOLDER)), self.llm.model_name)
+        data = await self.cache.aget(key)
+        if data is not None:
+            logger.info(f"레시피 캐시 적중: {kind} / {dish}")
+            return data
+        data = await self.llm.agenerate_json(build_prompt(dish), schema)
+        if is_valid(data):
+            await self.cache.aput(key, data)
+        return data
 
     def is_vague_dish(self, dish: str) -> bool:
         vague_dishes = [
@@ -23,7 +72,7 @@ class Recipes:
         ]
         return dish in vague_dishes
 
-    def handle_vague_dish(self, dish: str) -> Dict:
+    async def handle_vague_dish(self, dish: str) -> Dict:
         prompt = f"""
         당신은 세계적인 프로 셰프입니다.
         사용자가 입력한 '{dish}'가 광범위한 요리 종류라면 해당 음식의 대표적인 하위 요리 3~5가지를 JSON 배열로 출력하세요.
@@ -31,13 +80,40 @@ class Recipes:
 
         예시: ["구체적인 요리명1", "구체적인 요리명2", "구체적인 요리명3"]
         """
-        data = self.llm.generate_json(prompt)
+        data = await self.llm.agenerate_json(prompt)
         if isinstance(data, list) and len(data) > 0:
             return {"title": f"{dish} 종류 추천", "varieties": data, "type": "vague_dish"}
         return {"title": dish, "type": "vague_dish"}
 
-    def get_recipe(self, dish: str) -> Dict:
-        prompt = f"""
+    @staticmethod
+    def _bundle_prompt(dish: str) -> str:
+        return f"""
+        당신은 세계적으로 유명한 프로 셰프입니다.
+        Pierre Koffmann(프랑스), Gordon Ramsay(미국식), Ken Hom(중식), Massimo Bottura(이탈리아), José Andrés(스페인식), Yotam Ottolenghi(지중해식), 강레오(한식), 안성재(한식) 셰프의 경험을 바탕으로 정확한 레시피를 제공합니다.
+
+        '{dish}'의 요리 정보를 JSON으로 작성하세요. '{dish}'가 요리명이 아닐 경우, 가장 가능성이 높은 **단일 요리명 1개**를 추론해 그 요리만 작성하세요.
+        - title: 요리명
+        - ingredients: 재료 객체 배열. item은 손질/상태/형용사와 브랜드/원산지를 뺀 재료명만, amount는 수량 숫자만(불명확하면 빈 문자열, 범위는 "1-2"),
+          unit은 g, ml, 컵, 큰술, 작은술, 개, 마리, 통, 쪽, 톨 등 단위명(없으면 빈 문자열)
+        - steps: 조리법 최대 15단계. 복잡한 과정은 요약해서 핵심만 포함
+        - tips: 더 맛있게 만드는 구체적이고 실용적인 조리 팁 3개
+        - 출력 텍스트에는 어떤 셰프의 이름이나 스타일/출처도 언급하지 마세요
+        """
+
+    async def get_bundle(self, dish: str) -> Optional[Dict]:
+        """레시피/재료/팁을 한 번의 구조화 호출로 생성한 요리 번들 (요리별 캐시). 실패하면 None"""
+        data = await self._cached_json("bundle", dish, self._bundle_prompt, _is_valid_bundle, schema=BUNDLE_SCHEMA)
+        if not _is_valid_bundle(data):
+            return None
+        data.setdefault("title", dish)
+        data.setdefault("tips", [])
+        if isinstance(data.get("steps"), list) and len(data["steps"]) > 15:
+            data["steps"] = data["steps"][:15]
+        return data
+
+    @staticmethod
+    def _recipe_prompt(dish: str) -> str:
+        return f"""
         당신은 세계적으로 유명한 프로 셰프입니다.
         Pierre Koffmann(프랑스), Gordon Ramsay(미국식), Ken Hom(중식), Massimo Bottura(이탈리아), José Andrés(스페인식), Yotam Ottolenghi(지중해식), 강레오(한식), 안성재(한식) 셰프의 경험을 바탕으로 정확한 레시피를 제공합니다.
 
@@ -60,7 +136,13 @@ class Recipes:
           "steps": ["1단계 설명", "2단계 설명"]
         }}
         """
-        data = self.llm.generate_json(prompt)
+
+    async def get_recipe(self, dish: str) -> Dict:
+        if DISH_BUNDLE:
+            bundle = await self.get_bundle(dish)
+            if bundle is not None:
+                return {"title": bundle["title"], "ingredients": bundle["ingredients"], "steps": bundle["steps"]}
+        data = await self._cached_json("recipe", dish, self._recipe_prompt, lambda d: isinstance(d, dict) and bool(d))
         if isinstance(data, dict) and data:
             data.setdefault("title", dish)
             data.setdefault("ingredients", ["재료 정보를 찾을 수 없습니다"])
@@ -73,26 +155,34 @@ class Recipes:
         # We cannot access the raw response here, so just return minimal structure
         return {"title": dish, "ingredients": ["재료 정보를 찾을 수 없습니다"], "steps": ["조리법 정보를 찾을 수 없습니다"]}
 
-    def get_ingredients(self, dish: str):
-        prompt = f"""
+    @staticmethod
+    def _ingredients_prompt(dish: str) -> str:
+        return f"""
         당신은 세계적으로 유명한 프로 셰프입니다.
         Pierre Koffmann(프랑스), Gordon Ramsay(미국식), Ken Hom(중식), Massimo Bottura(이탈리아), José Andrés(스페인식), Yotam Ottolenghi(지중해식), 강레오(한식), 안성재(한식) 셰프의 전문 지식을 바탕으로 정확한 재료 정보를 제공합니다.
 
         '{dish}'에 필요한 정확한 재료와 양을 JSON 객체 배열로만 출력하세요. '{dish}'가 애매하면 메시지에서 가장 가능성이 높은 **단일 요리명 1개**를 추론해 그 재료만 출력하세요.
-        각 원소는 다음 형식의 객체여야 합니다: {"item": 재료명만, "amount": 숫자만, "unit": 단위만}
+        각 원소는 다음 형식의 객체여야 합니다: {{"item": 재료명만, "amount": 숫자만, "unit": 단위만}}
         - item: 수식어/브랜드/원산지/손질 상태를 제외한 재료명만
         - amount: 수량 숫자만(정수/소수/분수). 불명확하면 빈 문자열
         - unit: g, ml, 컵, 큰술, 작은술, 개, 마리, 통, 쪽, 톨 등 단위명. 없으면 빈 문자열
         기타 텍스트, 코드블록, 설명은 출력하지 마세요.
-        예시: [{"item": "재료1", "amount": "100", "unit": "g"}, {"item": "재료2", "amount": "1/2", "unit": "컵"}]
+        예시: [{{"item": "재료1", "amount": "100", "unit": "g"}}, {{"item": "재료2", "amount": "1/2", "unit": "컵"}}]
         """
-        data = self.llm.generate_json(prompt)
+
+    async def get_ingredients(self, dish: str):
+        if DISH_BUNDLE:
+            bundle = await self.get_bundle(dish)
+            if bundle is not None:
+                return bundle["ingredients"]
+        data = await self._cached_json("ingredients", dish, self._ingredients_prompt, lambda d: isinstance(d, list) and len(d) > 0)
         if isinstance(data, list) and len(data) > 0:
             return data
         return ["재료 정보를 찾을 수 없습니다"]
 
-    def get_tips(self, dish: str) -> List[str]:
-        prompt = f"""
+    @staticmethod
+    def _tips_prompt(dish: str) -> str:
+        return f"""
         당신은 세계적으로 유명한 프로 셰프입니다.
         Pierre Koffmann, Gordon Ramsay, Ken Hom, Massimo Bottura, José Andrés, Yotam Ottolenghi, 강레오, 안성재 셰프의 실무 경험을 바탕으로 전문적이고 실용적인 조리 팁을 제공합니다.
 
@@ -100,7 +190,13 @@ class Recipes:
         각 팁은 구체적이고 실용적이어야 하며, 셰프의 이름이나 출처는 언급하지 마세요.
         예시: ["구체적인 팁1", "실용적인 팁2", "전문가 팁3"]
         """
-        data = self.llm.generate_json(prompt)
+
+    async def get_tips(self, dish: str) -> List[str]:
+        if DISH_BUNDLE:
+            bundle = await self.get_bundle(dish)
+            if bundle is not None and bundle.get("tips"):
+                return bundle["tips"]
+        data = await self._cached_json("tips", dish, self._tips_prompt, lambda d: isinstance(d, list) and len(d) > 0)
         if isinstance(data, list) and len(data) > 0:
             return data
         return ["조리 팁을 찾을 수 없습니다"]
@@ -12,7 +12,7 @@ class Recommenders:
     def __init__(self, llm: LLMClient) -> None:
         self.llm = llm
 
-    def recommend_by_category(self, message: str, avoid: Optional[List[str]] = None) -> Dict:
+    async def recommend_by_category(self, message: str, avoid: Optional[List[str]] = None) -> Dict:
         lower_msg = message.lower()
         inferred = next(
             (c for c in CUISINE_PROFILES if any(k in lower_msg or k in message for k in c["keywords"])),
@@ -52,7 +52,7 @@ class Recommenders:
             ]
             """
 
-        data = self.llm.generate_json(prompt)
+        data = await self.llm.agenerate_json(prompt)
         if data is None:
             return {"category": category_key, "items": []}
 
@@ -0,0 +1,201 @@
+import asyncio
+import bisect
+import hashlib
+import logging
+import random
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import aiohttp
+
+from ..config import (
+    SESSION_BACKEND,
+    TEXT_EJECT_FAILURES,
+    TEXT_EJECT_SECONDS,
+    TEXT_HEALTH_INTERVAL,
+    TEXT_ROUTING_VNODES,
+    TEXT_SERVICE_URLS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """가상 노드를 둔 consistent hash 링. 노드가 추가/제거돼도 약 1/N의 키만 다른 노드로 이동"""
+
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = TEXT_ROUTING_VNODES) -> None:
+        self.vnodes = max(1, vnodes)
+        self._points: List[int] = []
+        self._owners: Dict[int, str] = {}
+        self.nodes: List[str] = []
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node: str) -> None:
+        if node in self.nodes:
+            return
+        self.nodes.append(node)
+        for i in range(self.vnodes):
+            point = _hash(f"{node}#{i}")
+            if point in self._owners:
+                continue
+            self._owners[point] = node
+            bisect.insort(self._points, point)
+
+    def remove(self, node: str) -> None:
+        if node not in self.nodes:
+            return
+        self.nodes.remove(node)
+        self._points = [p for p in self._points if self._owners[p] != node]
+        self._owners = {p: n for p, n in self._owners.items() if n != node}
+
+    def preference(self, key: str) -> List[str]:
+        """키의 위치에서 시계 방향으로 만나는 노드 순서 (첫 번째가 주 담당, 이후는 장애 시 대체)"""
+        if not self._points:
+            return []
+        start = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        order: List[str] = []
+        for i in range(len(self._points)):
+            node = self._owners[self._points[(start + i) % len(self._points)]]
+            if node not in order:
+                order.append(node)
+                if len(order) == len(self.nodes):
+                    break
+        return order
+
+
+class TextServiceRouter:
+    """
+    대화(세션) ID로 text_service 복제본을 고르는 라우터.
+    같은 대화는 같은 복제본으로 보내 세션 상태/요리 캐시가 따뜻한 곳을 재사용하고,
+    연속 실패하거나 /health에 응답하지 않는 복제본은 일정 시간 링에서 건너뜁니다.
+    세션 상태가 복제본 메모리에만 있으면(SESSION_BACKEND=memory) 장애 대체/재배치 때 대화가 끊기므로
+    공유 저장소를 쓸 때만 여러 복제본으로 나누고, 아니면 첫 번째 복제본 하나만 사용합니다.
+    """
+
+    def __init__(self, nodes: Iterable[str] = TEXT_SERVICE_URLS, vnodes: int = TEXT_ROUTING_VNODES,
+                 eject_failures: int = TEXT_EJECT_FAILURES, eject_seconds: float = TEXT_EJECT_SECONDS,
+                 shared_sessions: bool = SESSION_BACKEND != "memory") -> None:
+        self.shared_sessions = shared_sessions
+        self.ring = HashRing(self._fanout(list(nodes)), vnodes)
+        self.eject_failures = max(1, eject_failures)
+        self.eject_seconds = eject_seconds
+        self._health: Dict[str, Dict] = {n: self._new_health() for n in self.ring.nodes}
+        self._lock = threading.Lock()
+        self._last_probe = 0.0
+
+    @staticmethod
+    def _new_health() -> Dict:
+        return {"failures": 0, "ejected_until": 0.0, "requests": 0, "errors": 0}
+
+    def _available(self, node: str, now: float) -> bool:
+        return self._health[node]["ejected_until"] <= now
+
+    def _fanout(self, nodes: List[str]) -> List[str]:
+        if len(nodes) > 1 and not self.shared_sessions:
+            logger.warning(f"SESSION_BACKEND=memory에서는 대화 상태를 공유할 수 없어 복제본 하나만 사용합니다: {nodes[0]} (제외: {nodes[1:]})")
+            return nodes[:1]
+        return nodes
+
+    def candidates(self, key: Optional[str]) -> List[str]:
+        """
+        요청을 보낼 복제본 순서. 제외된 복제본은 뒤로 미루고, 모두 제외됐으면 원래 순서대로 시도.
+        대화 ID가 없는 요청은 이어 쓸 상태가 없으므로 링을 쓰지 않고 무작위 순서로 분산.
+        """
+        now = time.time()
+        with self._lock:
+            if key:
+                order = self.ring.preference(key)
+            else:
+                order = random.sample(self.ring.nodes, len(self.ring.nodes))
+            healthy = [n for n in order if self._available(n, now)]
+            return healthy + [n for n in order if n not in healthy]
+
+    def report_success(self, node: str) -> None:
+        with self._lock:
+            health = self._health.get(node)
+            if health is None:
+                return
+            health["requests"] += 1
+            if health["ejected_until"]:
+                logger.info(f"text_service 복제본 복구: {node}")
+            health["failures"] = 0
+            health["ejected_until"] = 0.0
+
+    def report_failure(self, node: str) -> None:
+        with self._lock:
+            health = self._health.get(node)
+            if health is None:
+                return
+            health["requests"] += 1
+            health["errors"] += 1
+            health["failures"] += 1
+            if health["failures"] >= self.eject_failures:
+                health["ejected_until"] = time.time() + self.eject_seconds
+                logger.warning(f"text_service 복제본 제외 ({self.eject_seconds:.0f}초): {node} - 연속 실패 {health['failures']}회")
+
+    def set_nodes(self, nodes: Iterable[str]) -> Dict[str, List[str]]:
+        """복제본 목록을 교체 (추가/제거된 노드만 링에서 갱신하므로 나머지 대화는 그대로 유지)"""
+        wanted = self._fanout([n.strip().rstrip("/") for n in nodes if n and n.strip()])
+        with self._lock:
+            added = [n for n in wanted if n not in self.ring.nodes]
+            removed = [n for n in self.ring.nodes if n not in wanted]
+            for node in removed:
+                self.ring.remove(node)
+                self._health.pop(node, None)
+            for node in added:
+                self.ring.add(node)
+                self._health[node] = self._new_health()
+        if added or removed:
+            logger.info(f"text_service 복제본 변경: 추가 {added}, 제거 {removed}")
+        return {"added": added, "removed": removed}
+
+    async def probe(self, timeout: float = 2.0) -> None:
+        """모든 복제본의 /health를 확인해 제외/복구 상태를 갱신"""
+        self._last_probe = time.time()
+
+        async def _check(session: aiohttp.ClientSession, node: str) -> None:
+            try:
+                async with session.get(f"{node}/health") as resp:
+                    ok = resp.status == 200
+            except Exception:
+                ok = False
+            if ok:
+                self.report_success(node)
+            else:
+                self.report_failure(node)
+
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+            await asyncio.gather(*(_check(session, n) for n in list(self.ring.nodes)))
+
+    def probe_due(self) -> bool:
+        return len(self.ring.nodes) > 1 and time.time() - self._last_probe >= TEXT_HEALTH_INTERVAL
+
+    def stats(self) -> Dict:
+        now = time.time()
+        with self._lock:
+            return {
+                "nodes": {
+                    n: {**h, "ejected": not self._available(n, now)}
+                    for n, h in self._health.items()
+                },
+                "vnodes": self.ring.vnodes,
+            }
+
+
+_router: Optional[TextServiceRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> TextServiceRouter:
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = TextServiceRouter()
+            logger.info(f"text_service 라우팅 대상: {_router.ring.nodes}")
+        return _router
@@ -0,0 +1,131 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Dict, List, Optional
+
+from ..config import SESSION_BACKEND, SESSION_MAX_ENTRIES, SESSION_STORE_PATH, SESSION_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ConversationState:
+    """한 사용자 대화의 상태. TextAgent는 요청마다 이 상태를 불러와 갱신한 뒤 다시 저장합니다."""
+    last_dish: Optional[str] = None
+    last_ingredients: List[Any] = field(default_factory=list)
+    last_intent: Optional[str] = None
+    last_suggested_dishes: List[str] = field(default_factory=list)
+    last_ingredients_ts: float = 0.0
+    last_suggested_ts: float = 0.0
+    last_suggested_turn: int = 0
+    turn_idx: int = 0
+    last_ingredients_turn: int = 0
+    last_style: str = ""
+    last_style_ts: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ConversationState":
+        # 저장 후 필드가 바뀌어도 읽을 수 있도록 아는 필드만 사용
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+class InMemorySessionStore:
+    """프로세스 내 LRU + TTL 저장소 (워커 1개일 때)"""
+
+    def __init__(self, max_entries: int = SESSION_MAX_ENTRIES, ttl_seconds: int = SESSION_TTL_SECONDS) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._items: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str) -> ConversationState:
+        now = time.time()
+        with self._lock:
+            item = self._items.get(session_id)
+            if item is None or now - item[0] > self.ttl_seconds:
+                self._items.pop(session_id, None)
+                return ConversationState()
+            self._items.move_to_end(session_id)
+            # 저장본을 그대로 넘기지 않아 요청 처리 중 변경이 다른 요청에 보이지 않게 함
+            return ConversationState.from_dict(item[1])
+
+    def save(self, session_id: str, state: ConversationState) -> None:
+        with self._lock:
+            self._items[session_id] = (time.time(), state.to_dict())
+            self._items.move_to_end(session_id)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._items.pop(session_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backend": "memory", "sessions": len(self._items), "max_entries": self.max_entries}
+
+
+class SQLiteSessionStore:
+    """여러 워커/노드가 공유하는 SQLite 저장소 (공유 볼륨의 파일 경로 사용)"""
+
+    def __init__(self, path: str = SESSION_STORE_PATH, ttl_seconds: int = SESSION_TTL_SECONDS) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_by_updated ON sessions (updated_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def load(self, session_id: str) -> ConversationState:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT state FROM sessions WHERE id = ? AND updated_at >= ?",
+                (session_id, time.time() - self.ttl_seconds),
+            ).fetchone()
+        if row is None:
+            return ConversationState()
+        try:
+            return ConversationState.from_dict(json.loads(row[0]))
+        except (ValueError, TypeError) as e:
+            logger.warning(f"세션 상태 파싱 실패({session_id}): {e}")
+            return ConversationState()
+
+    def save(self, session_id: str, state: ConversationState) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, state, updated_at) VALUES (?, ?, ?)",
+                (session_id, json.dumps(state.to_dict(), ensure_ascii=False), now),
+            )
+            # 만료된 세션 정리
+            conn.execute("DELETE FROM sessions WHERE updated_at < ?", (now - self.ttl_seconds,))
+
+    def delete(self, session_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        return {"backend": "sqlite", "sessions": count, "path": self.path}
+
+
+def create_session_store(backend: str = SESSION_BACKEND):
+    if backend == "sqlite":
+        logger.info(f"세션 저장소: SQLite ({SESSION_STORE_PATH})")
+        return SQLiteSessionStore()
+    if backend != "memory":
+        logger.warning(f"알 수 없는 SESSION_BACKEND '{backend}' - 메모리 저장소를 사용합니다.")
+    return InMemorySessionStore()
@@ -11,7 +11,7 @@ class Substitutions:
     def __init__(self, llm: LLMClient) -> None:
         self.llm = llm
 
-    def get_substitutions(self, dish: str, ingredient: str, user_substitute: str, message: str, context: str) -> Dict:
+    async def get_substitutions(self, dish: str, ingredient: str, user_substitute: str, message: str, context: str) -> Dict:
         target = ingredient or "핵심 재료"
         prompt = f"""
         당신은 프로 요리사입니다.
@@ -35,7 +35,7 @@ class Substitutions:
           ]
         }}
         """
-        data = self.llm.generate_json(prompt)
+        data = await self.llm.agenerate_json(prompt)
         if isinstance(data, dict):
             data.setdefault("ingredient", target)
             data.setdefault("substituteName", user_substitute or "")
@@ -43,7 +43,7 @@ class Substitutions:
             return data
         return {"ingredient": target, "substituteName": user_substitute or "", "substitutes": []}
 
-    def get_necessity(self, dish: str, ingredient: str, context: str) -> Dict:
+    async def get_necessity(self, dish: str, ingredient: str, context: str) -> Dict:
         target = ingredient or "핵심 재료"
         prompt = f"""
         당신은 프로 요리사입니다.
@@ -55,7 +55,7 @@ class Substitutions:
         JSON으로만 출력하세요. 필드는 possible(불리언), flavor_change(문장 1줄)만 포함하세요. 다른 필드/설명은 금지.
         예시: {{"possible": true, "flavor_change": "감칠맛이 약간 줄어듭니다"}}
         """
-        data = self.llm.generate_json(prompt)
+        data = await self.llm.agenerate_json(prompt)
         if isinstance(data, dict):
             return {
                 "possible": bool(data.get("possible", False)),
@@ -1,12 +1,30 @@
+import asyncio
+import contextvars
 import json
 import logging
+from contextlib import contextmanager
+from typing import Optional
+
 import aiohttp
 from langchain_core.tools import tool
 
-from .constants import TEXT_SERVICE_URL
+from .routing import get_router
 
 logger = logging.getLogger(__name__)
 
+# 도구 호출을 일으킨 대화의 세션 ID (에이전트 실행 전에 bind_session으로 설정)
+_current_session: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("text_session_id", default=None)
+
+
+@contextmanager
+def bind_session(session_id: Optional[str]):
+    """이 블록 안의 text_based_cooking_assistant 호출이 session_id의 대화 상태를 이어 쓰도록 설정"""
+    token = _current_session.set(session_id)
+    try:
+        yield
+    finally:
+        _current_session.reset(token)
+
 
 @tool
 async def text_based_cooking_assistant(query: str) -> str:
@@ -16,42 +34,53 @@ async def text_based_cooking_assistant(query: str) -> str:
     유튜브 링크(URL)가 포함된 질문에는 이 도구를 사용하지 마세요.
     사용자의 질문을 그대로 입력값으로 사용하세요.
     """
-    logger.info(
-        f"TextAgent 도구 실행: '{query}'에 대한 처리를 위해 {TEXT_SERVICE_URL}/process로 전달합니다."
-    )
-    try:
-        async with aiohttp.ClientSession() as session:
-            payload = {"message": query}
-            logger.debug("=== 🤍payload for TextAgent Service: %s", payload)
-            logger.info("=== 🤍TextAgent Service로 요청 전송: %s/process", TEXT_SERVICE_URL)
-            async with session.post(f"{TEXT_SERVICE_URL}/process", json=payload) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    logger.info("TextAgent Service 응답: %s", result)
-                    return json.dumps(result, ensure_ascii=False)
-                else:
-                    error_text = await response.text()
-                    logger.error(
-                        "TextAgent Service 오류 (상태: %s): %s", response.status, error_text
-                    )
-                    return json.dumps(
-                        {"error": f"TextAgent Service 오류: {response.status}", "message": error_text},
-                        ensure_ascii=False,
-                    )
-    except aiohttp.ClientConnectorError as e:
-        logger.error(f"TextAgent Service 연결 실패: {e}")
-        return json.dumps(
-            {
-                "error": "TextAgent Service에 연결할 수 없습니다.",
-                "message": "8002 서버가 실행 중인지 확인해주세요.",
-            },
-            ensure_ascii=False,
-        )
-    except Exception as e:
-        logger.error(f"TextAgent Service 호출 중 오류: {e}")
-        return json.dumps(
-            {"error": "TextAgent Service 호출 중 오류가 발생했습니다.", "message": str(e)},
-            ensure_ascii=False,
-        )
+    router = get_router()
+    session_id = _current_session.get()
+    # 같은 대화는 같은 복제본으로 (대화 ID가 없으면 상태가 없는 요청이므로 아무 복제본이나)
+    candidates = router.candidates(session_id)
+    if router.probe_due():
+        asyncio.ensure_future(router.probe())
+    payload = {"message": query}
+    if session_id:
+        payload["session_id"] = session_id
+    logger.debug("=== 🤍payload for TextAgent Service: %s", payload)
 
+    last_error = None
+    async with aiohttp.ClientSession() as session:
+        for node in candidates:
+            logger.info(f"TextAgent 도구 실행: '{query}'에 대한 처리를 위해 {node}/process로 전달합니다.")
+            try:
+                async with session.post(f"{node}/process", json=payload) as response:
+                    if response.status == 200:
+                        result = await response.json()
+                        router.report_success(node)
+                        logger.info("TextAgent Service 응답: %s", result)
+                        return json.dumps(result, ensure_ascii=False)
+                    error_text = await response.text()
+                    logger.error("TextAgent Service 오류 (상태: %s, %s): %s", response.status, node, error_text)
+                    if response.status < 500:
+                        router.report_success(node)
+                        return json.dumps(
+                            {"error": f"TextAgent Service 오류: {response.status}", "message": error_text},
+                            ensure_ascii=False,
+                        )
+                    # 5xx는 복제본 문제로 보고 다음 복제본으로 재시도
+                    router.report_failure(node)
+                    last_error = {"error": f"TextAgent Service 오류: {response.status}", "message": error_text}
+            except aiohttp.ClientConnectorError as e:
+                logger.error(f"TextAgent Service 연결 실패 ({node}): {e}")
+                router.report_failure(node)
+                last_error = {
+                    "error": "TextAgent Service에 연결할 수 없습니다.",
+                    "message": "text_service 서버가 실행 중인지 확인해주세요.",
+                }
+            except Exception as e:
+                # 응답 대기 중 오류(타임아웃 등)는 이미 처리 중일 수 있으므로 다른 복제본에 다시 보내지 않음
+                logger.error(f"TextAgent Service 호출 중 오류 ({node}): {e}")
+                router.report_failure(node)
+                return json.dumps(
+                    {"error": "TextAgent Service 호출 중 오류가 발생했습니다.", "message": str(e)},
+                    ensure_ascii=False,
+                )
 
+    return json.dumps(last_error or {"error": "사용 가능한 TextAgent Service가 없습니다.", "message": ""}, ensure_ascii=False)
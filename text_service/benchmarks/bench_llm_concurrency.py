@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+text_service 동시 처리 벤치마크 (동시 요청 수에 따른 처리량 변화)
+
+llm 모드: 같은 이벤트 루프에서 동시 요청 N개를 보낼 때
+    blocking = 기존 동기 generate_text (호출마다 이벤트 루프가 멈춤)
+    async    = 비동기 agenerate_text (LLM_MAX_CONCURRENCY 세마포어로 상한)
+의 처리량(req/s)과 지연 시간(p50/p95)을 비교합니다.
+
+http 모드: 실행 중인 text_service의 /process에 동시 요청을 보내 서버 전체의 처리량을 측정합니다.
+
+사용법:
+    python text_service/benchmarks/bench_llm_concurrency.py llm [--requests 32] [--levels 1,4,16]
+    python text_service/benchmarks/bench_llm_concurrency.py http --url http://localhost:8002 [--message "김치찌개 레시피"]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# 프로젝트 루트를 import 경로에 추가 (text_service 패키지 기준 절대 임포트)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+PROMPT = "다음 요리의 의도를 한 단어로 분류하세요: 김치찌개 레시피 알려줘"
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def _run_level(call, total: int, concurrency: int):
+    """동시 실행 수를 concurrency로 제한해 total개 요청을 처리하고 (처리량, 지연 목록) 반환"""
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with gate:
+            started = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return total / (time.perf_counter() - started), latencies
+
+
+def _report(label: str, concurrency: int, throughput: float, latencies) -> None:
+    print(
+        f"{label:<10}{concurrency:>6}{throughput:>12.2f}"
+        f"{statistics.median(latencies):>10.2f}{_percentile(latencies, 0.95):>10.2f}"
+    )
+
+
+async def bench_llm(args) -> None:
+    import google.generativeai as genai
+    from text_service.config import GEMINI_API_KEY
+    from text_service.agent.llm import LLMClient
+
+    genai.configure(api_key=GEMINI_API_KEY)
+    llm = LLMClient()
+
+    async def blocking():
+        llm.generate_text(PROMPT)
+
+    async def non_blocking():
+        await llm.agenerate_text(PROMPT)
+
+    print(f"{'mode':<10}{'동시':>6}{'req/s':>12}{'p50(s)':>10}{'p95(s)':>10}")
+    for level in args.levels:
+        for label, call in (("blocking", blocking), ("async", non_blocking)):
+            throughput, latencies = await _run_level(call, args.requests, level)
+            _report(label, level, throughput, latencies)
+
+
+async def bench_http(args) -> None:
+    import aiohttp
+
+    timeout = aiohttp.ClientTimeout(total=300)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        async def call():
+            async with session.post(f"{args.url}/process", json={"message": args.message}) as resp:
+                await resp.read()
+
+        print(f"{'mode':<10}{'동시':>6}{'req/s':>12}{'p50(s)':>10}{'p95(s)':>10}")
+        for level in args.levels:
+            throughput, latencies = await _run_level(call, args.requests, level)
+            _report("http", level, throughput, latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="text_service 동시 처리 벤치마크")
+    parser.add_argument("target", choices=["llm", "http"], help="llm: LLMClient 직접 호출, http: /process 호출")
+    parser.add_argument("--requests", type=int, default=32, help="동시 수준별 총 요청 수")
+    parser.add_argument("--levels", default="1,2,4,8,16", help="동시 요청 수 목록 (쉼표 구분)")
+    parser.add_argument("--url", default="http://localhost:8002", help="http 모드의 text_service 주소")
+    parser.add_argument("--message", default="김치찌개 레시피 알려줘", help="http 모드의 요청 메시지")
+    args = parser.parse_args()
+    args.levels = [int(x) for x in args.levels.split(",") if x.strip()]
+
+    asyncio.run(bench_llm(args) if args.target == "llm" else bench_http(args))
+
+
+if __name__ == "__main__":
+    main()
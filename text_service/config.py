@@ -7,6 +7,60 @@ load_dotenv()
 # Gemini API 설정
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 
+# LLM 호출 설정 (프로세스당 동시 Gemini 호출 수 상한, 호출 타임아웃)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+
+# 대화 세션 상태 저장소 (memory: 프로세스 내 LRU+TTL, sqlite: 여러 워커/노드가 공유하는 파일)
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+SESSION_STORE_PATH = os.getenv("SESSION_STORE_PATH", "text_sessions.db")
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", "3600"))
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "10000"))
+
+# text_service 복제본 라우팅 (intent_service → text_service, 세션 ID 기준 consistent hashing)
+# 복제본을 여러 개 쓰려면 SESSION_BACKEND가 공유 저장소(sqlite)여야 함 (memory면 첫 번째 복제본만 사용)
+TEXT_SERVICE_URLS = [u.strip().rstrip("/") for u in os.getenv("TEXT_SERVICE_URLS", "http://localhost:8002").split(",") if u.strip()]
+TEXT_ROUTING_VNODES = int(os.getenv("TEXT_ROUTING_VNODES", "100"))          # 복제본당 해시 링 가상 노드 수
+TEXT_EJECT_FAILURES = int(os.getenv("TEXT_EJECT_FAILURES", "3"))            # 연속 실패 몇 번이면 제외할지
+TEXT_EJECT_SECONDS = float(os.getenv("TEXT_EJECT_SECONDS", "30"))           # 제외 후 다시 시도하기까지의 시간(초)
+TEXT_HEALTH_INTERVAL = float(os.getenv("TEXT_HEALTH_INTERVAL", "10"))       # /health 점검 간격(초)
+
+# 요리별 레시피/재료/팁 캐시 (sqlite: 재시작 후에도 유지, memory: 프로세스 내, off: 사용 안 함)
+RECIPE_CACHE_BACKEND = os.getenv("RECIPE_CACHE_BACKEND", "sqlite")
+RECIPE_CACHE_PATH = os.getenv("RECIPE_CACHE_PATH", "recipe_cache.db")
+RECIPE_CACHE_TTL_SECONDS = int(os.getenv("RECIPE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+RECIPE_CACHE_MAX_ENTRIES = int(os.getenv("RECIPE_CACHE_MAX_ENTRIES", "5000"))
+RECIPE_CACHE_MEMORY_ENTRIES = int(os.getenv("RECIPE_CACHE_MEMORY_ENTRIES", "500"))   # SQLite 앞단 메모리 LRU 크기
+
+# 레시피/재료/팁을 요리별 번들 한 번의 호출로 생성 (false면 항목별로 따로 호출)
+DISH_BUNDLE = os.getenv("DISH_BUNDLE", "true").lower() == "true"
+
+# 의도 분류 규칙 기반 빠른 경로
+# primary: 규칙이 확실하면 LLM 생략 / shadow: 항상 LLM을 쓰고 규칙과의 일치율만 기록 / off: 규칙 사용 안 함
+INTENT_RULES_MODE = os.getenv("INTENT_RULES_MODE", "primary")
+INTENT_RULE_THRESHOLD = float(os.getenv("INTENT_RULE_THRESHOLD", "0.8"))   # 이 신뢰도 이상이면 규칙 결과 사용
+INTENT_SHADOW_RATE = float(os.getenv("INTENT_SHADOW_RATE", "0.05"))        # primary 모드에서도 LLM을 함께 호출해 일치율을 측정할 비율
+# (메시지, LLM 의도) 규칙 점검/학습용 기록. 사용자 메시지 원문이 쌓이므로 기본은 기록 안 함(빈 값).
+# 켤 때는 cwd가 아닌 전용 경로를 지정하고, 학습에 필요한 기간만 보관한 뒤 logrotate 등으로 지움 (파일 크기 제한 없음)
+INTENT_LOG_PATH = os.getenv("INTENT_LOG_PATH", "")
+
+# 로컬 의도 분류 모델 (문자 n-gram + 선형 모델, INTENT_LOG_PATH 기록으로 학습)
+# 학습: python -m text_service.agent.local_model intent_samples.jsonl intent_model.npz
+# off | shadow(LLM과 비교만) | ab(INTENT_MODEL_AB_RATIO 비율만 모델 사용) | primary(모델이 확실하면 LLM 생략)
+INTENT_MODEL_MODE = os.getenv("INTENT_MODEL_MODE", "off")
+INTENT_MODEL_PATH = os.getenv("INTENT_MODEL_PATH", "intent_model.npz")
+INTENT_MODEL_AB_RATIO = float(os.getenv("INTENT_MODEL_AB_RATIO", "0.1"))
+INTENT_MODEL_MIN_CONFIDENCE = float(os.getenv("INTENT_MODEL_MIN_CONFIDENCE", "0.7"))   # 이 확률 미만이면 LLM 사용
+INTENT_MODEL_PROMOTE_ACCURACY = float(os.getenv("INTENT_MODEL_PROMOTE_ACCURACY", "0.95"))  # primary 승격 기준 (LLM 일치율)
+INTENT_MODEL_PROMOTE_MIN_SAMPLES = int(os.getenv("INTENT_MODEL_PROMOTE_MIN_SAMPLES", "200"))
+INTENT_MODEL_AUTO_PROMOTE = os.getenv("INTENT_MODEL_AUTO_PROMOTE", "false").lower() == "true"
+
+# 의도와 요리명/대상 재료/대체 재료를 구조화된 출력 한 번으로 추출 (false면 의도만 LLM으로 분류하고 항목은 정규식으로 추출)
+INTENT_STRUCTURED_PARSE = os.getenv("INTENT_STRUCTURED_PARSE", "true").lower() == "true"
+
+# 운영용 엔드포인트(/intent_model 변경) 인증 토큰. X-Admin-Token 헤더로 전달, 빈 값이면 해당 엔드포인트 비활성화
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
 # 애플리케이션 설정
 APP_HOST = "0.0.0.0"
 APP_PORT = 8000
@@ -1,10 +1,12 @@
 from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Union, Literal
+from typing import List, Optional, Union, Literal
 import uvicorn
 import logging
+import asyncio
 import json
+import hmac
 import sys, os
 
 # 경로 설정을 먼저 수행해 절대 임포트가 가능하도록 함
@@ -16,8 +18,16 @@ if project_root not in sys.path:
 # TextAgent 임포트 (절대 → 실패 시 로컬 패키지 대체)
 try:
     from text_service.agent.core import TextAgent
+    from text_service.agent.cache import get_recipe_cache
+    from text_service.agent import intent_rules
+    from text_service.agent.intent import get_intent_model
+    from text_service.config import ADMIN_TOKEN
 except ModuleNotFoundError:
     from agent.core import TextAgent
+    from agent.cache import get_recipe_cache
+    from agent import intent_rules
+    from agent.intent import get_intent_model
+    from config import ADMIN_TOKEN
 
 from intent_service.planning_agent import run_agent
 
@@ -37,11 +47,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# TextAgent 인스턴스 생성
+def require_admin(request: Request) -> None:
+    """운영용 엔드포인트 인증. ADMIN_TOKEN이 비어 있으면 누구도 호출할 수 없음"""
+    token = request.headers.get("X-Admin-Token", "")
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="ADMIN_TOKEN이 설정되지 않아 사용할 수 없는 엔드포인트입니다.")
+    if not hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=401, detail="관리자 토큰이 올바르지 않습니다.")
+
+# TextAgent 인스턴스 생성 (대화 상태는 session_id별 저장소에 있으므로 모든 요청이 공유해도 됨)
 text_agent = TextAgent()
 
 class TextRequest(BaseModel):
     message: str
+    session_id: Optional[str] = None  # 대화 세션 ID (없으면 이 요청에서만 쓰는 빈 상태)
 
 class Ingredient(BaseModel):
     item: str
@@ -72,7 +91,7 @@ async def process_message(request: TextRequest):
         logger.info(f"=== 💛text_service에서 /process 엔드포인트 호출됨💛 ===")
         logger.info(f"처리할 메시지: {request.message}")
         
-        result = await text_agent.process_message(request.message)
+        result = await text_agent.process_message(request.message, request.session_id)
         logger.info(f"TextAgent 처리 결과: {result}")
 
         # 표준 스키마로 정규화 (content 우선: answer → content로 승격)
@@ -109,6 +128,37 @@ async def health_check():
     """서버 상태 확인"""
     return {"status": "healthy", "service": "TextAgent Server"}
 
+@app.get("/stats")
+async def stats():
+    """레시피 캐시 적중률, 세션 저장소, 규칙/로컬 모델 의도 분류(절약된 LLM 호출, LLM과의 일치율) 통계"""
+    cache = get_recipe_cache()
+    return {
+        "status": "success",
+        # SQLite 집계는 스레드에서 (이벤트 루프를 막지 않도록)
+        "recipe_cache": await asyncio.to_thread(cache.stats) if cache is not None else {"backend": "off"},
+        "sessions": await asyncio.to_thread(text_agent.sessions.stats),
+        "intent_rules": intent_rules.get_stats(),
+        "intent_model": get_intent_model().stats(),
+    }
+
+@app.put("/intent_model")
+async def update_intent_model(request: Request):
+    """
+    로컬 의도 분류 모델 모드 변경/다시 불러오기 (shadow에서 검증한 뒤 primary로 승격할 때 호출, X-Admin-Token 헤더 필요).
+    바디: {"mode": "primary", "reload": true}
+    """
+    require_admin(request)
+    body = await request.json()
+    gate = get_intent_model()
+    if body.get("reload") and not gate.reload():
+        raise HTTPException(status_code=400, detail=f"모델을 불러오지 못했습니다: {gate.path}")
+    if body.get("mode"):
+        try:
+            gate.set_mode(body["mode"])
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "success", "intent_model": gate.stats()}
+
 @app.get("/")
 async def root():
     """루트 엔드포인트"""
@@ -118,7 +168,9 @@ async def root():
         "endpoints": {
             "/chat": "POST - 채팅 메시지 처리",
             "/process": "POST - 레시피 검색 처리", 
-            "/health": "GET - 서버 상태 확인"
+            "/health": "GET - 서버 상태 확인",
+            "/stats": "GET - 레시피 캐시/세션/의도 분류 통계",
+            "/intent_model": "PUT - 로컬 의도 분류 모델 모드 변경"
         }
     }
 
@@ -0,0 +1,24 @@
+# 규칙 기반 의도 분류가 분명한 표현만 결정하고, 애매한 표현은 LLM으로 넘기는지 확인
+import pytest
+
+from text_service.agent import intent_rules
+
+
+@pytest.mark.parametrize("message, expected", [
+    # 부사 "대체"는 대체 재료 요청이 아님
+    ("대체 뭐가 맛있어?", None),
+    ("대체 왜 이렇게 짜지?", None),
+    ("버터 대체 재료 알려줘", "SUBSTITUTE"),
+    ("설탕 대체 가능해?", "SUBSTITUTE"),
+    ("버터 대체할 만한 거 있어?", "SUBSTITUTE"),
+    ("마늘 대신 뭐 넣어?", "SUBSTITUTE"),
+    # 재료가 붙은 추천은 INGREDIENTS_TO_DISHES일 수 있으므로 LLM에 넘김
+    ("감자 요리 추천해줘", None),
+    ("계란 요리 추천", None),
+    ("한식 추천해줘", "CATEGORY"),
+    ("김치찌개 레시피 알려줘", "RECIPE"),
+    ("계란으로 뭐 만들 수 있는 요리 있어?", "INGREDIENTS_TO_DISHES"),
+])
+def test_decide(message, expected):
+    intent, _, _ = intent_rules.decide(message, threshold=0.8)
+    assert intent == expected
@@ -0,0 +1,59 @@
+# 해시 링이 노드 추가/제거 때 약 1/N의 대화만 옮기고, 제외된 복제본을 뒤로 미루는지 확인
+from text_service.agent.routing import HashRing, TextServiceRouter
+
+NODES = [f"http://text-{i}:8002" for i in range(4)]
+KEYS = [f"session-{i}" for i in range(5000)]
+
+
+def _owners(ring):
+    return {key: ring.preference(key)[0] for key in KEYS}
+
+
+def test_adding_a_node_moves_about_one_over_n_keys():
+    ring = HashRing(NODES)
+    before = _owners(ring)
+    ring.add("http://text-4:8002")
+    after = _owners(ring)
+    moved = [k for k in KEYS if before[k] != after[k]]
+    # 이동한 대화는 모두 새 노드로만 가야 함
+    assert all(after[k] == "http://text-4:8002" for k in moved)
+    assert 0.5 / 5 < len(moved) / len(KEYS) < 1.5 / 5
+
+
+def test_removing_a_node_moves_only_its_keys():
+    ring = HashRing(NODES)
+    before = _owners(ring)
+    ring.remove(NODES[0])
+    after = _owners(ring)
+    moved = [k for k in KEYS if before[k] != after[k]]
+    assert moved == [k for k in KEYS if before[k] == NODES[0]]
+    assert 0.5 / 4 < len(moved) / len(KEYS) < 1.5 / 4
+
+
+def test_preference_lists_every_node_once():
+    ring = HashRing(NODES)
+    order = ring.preference("session-1")
+    assert sorted(order) == sorted(NODES)
+
+
+def test_candidates_moves_ejected_node_to_the_end():
+    router = TextServiceRouter(NODES, eject_failures=1, eject_seconds=60, shared_sessions=True)
+    order = router.ring.preference("session-1")
+    router.report_failure(order[0])
+    assert router.candidates("session-1") == order[1:] + order[:1]
+    router.report_success(order[0])
+    assert router.candidates("session-1") == order
+
+
+def test_candidates_keeps_ring_order_when_all_nodes_are_ejected():
+    router = TextServiceRouter(NODES, eject_failures=1, eject_seconds=60, shared_sessions=True)
+    order = router.ring.preference("session-1")
+    for node in NODES:
+        router.report_failure(node)
+    assert router.candidates("session-1") == order
+
+
+def test_memory_sessions_use_a_single_replica():
+    router = TextServiceRouter(NODES, shared_sessions=False)
+    assert router.ring.nodes == NODES[:1]
+    assert router.candidates("session-1") == NODES[:1]
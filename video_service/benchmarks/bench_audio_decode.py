@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Whisper 폴백 오디오 경로 벤치마크
+
+기존 경로(공용 temp_audio + m4a 재인코딩), 작업별 파일 경로, 메모리 PCM 경로의
+벽시계 시간과 디스크 기록 바이트를 비교합니다.
+
+사용법:
+    cd video_service
+    python benchmarks/bench_audio_decode.py <youtube_url> [--repeat 3]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import yt_dlp
+
+# video_service 디렉토리를 import 경로에 추가 (server.py와 동일한 모듈 구성)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import transcript  # noqa: E402
+
+
+def _legacy_path(url: str):
+    """변경 전 경로: 공용 디렉토리에 받은 뒤 FFmpegExtractAudio로 m4a 재인코딩 후 디코딩"""
+    temp_dir = tempfile.mkdtemp(prefix="legacy_audio_")
+    downloaded = {"bytes": 0}
+
+    def hook(d):
+        if d.get("status") == "finished":
+            downloaded["bytes"] += int(d.get("total_bytes") or d.get("downloaded_bytes") or 0)
+
+    ydl_opts = {
+        'format': 'bestaudio/best',
+        'outtmpl': os.path.join(temp_dir, '%(id)s.%(ext)s'),
+        'postprocessors': [{'key': 'FFmpegExtractAudio', 'preferredcodec': 'm4a'}],
+        'progress_hooks': [hook],
+        'quiet': True,
+    }
+    try:
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=True)
+        audio_file = os.path.join(temp_dir, f"{info['id']}.m4a")
+        encoded = os.path.getsize(audio_file) if os.path.exists(audio_file) else 0
+        audio = transcript.decode_audio_to_pcm(audio_file)
+        return audio, downloaded["bytes"] + encoded
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def _file_path(url: str):
+    temp_dir = tempfile.mkdtemp(prefix="file_audio_")
+    ydl_opts = {
+        'format': 'bestaudio/best',
+        'outtmpl': os.path.join(temp_dir, '%(id)s.%(ext)s'),
+        'quiet': True,
+    }
+    try:
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=True)
+            audio_file = ydl.prepare_filename(info)
+        size = os.path.getsize(audio_file)
+        return transcript.decode_audio_to_pcm(audio_file), size
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def _memory_path(url: str):
+    return transcript._load_audio_in_memory(url), 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Whisper 오디오 입력 경로 벤치마크")
+    parser.add_argument("url")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    paths = [("legacy(m4a)", _legacy_path), ("file", _file_path), ("memory", _memory_path)]
+    print(f"{'path':<14}{'wall(s)':>10}{'disk(MB)':>12}{'audio(s)':>10}")
+    for name, fn in paths:
+        walls, disk, seconds = [], 0, 0.0
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            audio, disk = fn(args.url)
+            walls.append(time.perf_counter() - start)
+            seconds = len(audio) / transcript.SAMPLE_RATE
+        best = min(walls)
+        print(f"{name:<14}{best:>10.2f}{disk / 1e6:>12.2f}{seconds:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+스크립트 압축 벤치마크 (토큰 감소량 + 추출 품질 유지 확인)
+
+고정 코퍼스의 각 스크립트를 원문과 압축본으로 각각 추출해 재료/단계가 얼마나 보존되는지 비교합니다.
+정답(expected)이 있으면 정답 대비 재료 재현율도 함께 계산합니다.
+
+코퍼스 파일(JSONL) 형식:
+    {"title": "...", "transcript": "...", "expected": {"ingredients": ["..."]}}   # expected는 선택
+
+사용법:
+    cd video_service
+    python benchmarks/bench_compress.py corpus.jsonl [--budget 12000] [--no-llm]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.compress import compress_transcript  # noqa: E402
+
+
+def _items(ingredients) -> set:
+    # "돼지고기 200g" → "돼지고기" 처럼 분량을 뺀 재료명으로 비교
+    from core.extractor import normalize_ingredient_string
+    return {re.sub(r"\s+", "", normalize_ingredient_string(i)["item"]) for i in ingredients if i}
+
+
+def _recall(found: set, expected: set) -> float:
+    return len(found & expected) / len(expected) if expected else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스크립트 압축 벤치마크")
+    parser.add_argument("corpus", help="JSONL 코퍼스 (title, transcript, expected)")
+    parser.add_argument("--budget", type=int, default=None, help="토큰 예산 (기본: COMPRESS_TARGET_TOKENS)")
+    parser.add_argument("--no-llm", action="store_true", help="토큰 감소량만 측정 (추출 품질 비교 생략)")
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding="utf-8") as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+
+    reductions, retained, expected_raw, expected_cmp = [], [], [], []
+    for sample in corpus:
+        compressed, stats = compress_transcript(sample["transcript"], args.budget)
+        reductions.append(stats["reduction_ratio"])
+        line = f"{sample['title'][:30]:<32}{stats['original_tokens']:>8} → {stats['compressed_tokens']:>7} 토큰"
+
+        if not args.no_llm:
+            from core.extractor import _extract_recipe
+            raw = _items(_extract_recipe(sample["title"], sample["transcript"]).ingredients)
+            cmp = _items(_extract_recipe(sample["title"], compressed).ingredients)
+            retained.append(_recall(cmp, raw))
+            line += f"  재료 보존 {retained[-1]:.0%}"
+            expected = _items(sample.get("expected", {}).get("ingredients", []))
+            if expected:
+                expected_raw.append(_recall(raw, expected))
+                expected_cmp.append(_recall(cmp, expected))
+        print(line)
+
+    print(f"\n샘플 {len(corpus)}개, 평균 토큰 감소 {statistics.mean(reductions):.1%}" if corpus else "샘플 없음")
+    if retained:
+        print(f"원문 추출 대비 재료 보존율 평균 {statistics.mean(retained):.1%}")
+    if expected_raw:
+        print(f"정답 대비 재료 재현율: 원문 {statistics.mean(expected_raw):.1%} / 압축 {statistics.mean(expected_cmp):.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+판별 + 추출 2단계 호출 vs 통합 호출 벤치마크
+
+같은 (제목, 스크립트) 묶음에 대해 두 방식의 지연 시간과 입력/출력 토큰 수, 판별 일치 여부를 비교합니다.
+
+입력 파일(JSONL) 형식: {"title": "...", "transcript": "..."}
+
+사용법:
+    cd video_service
+    python benchmarks/bench_validate_extract.py samples.jsonl
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.callbacks import get_usage_metadata_callback  # noqa: E402
+
+from core import extractor  # noqa: E402
+
+
+def _tokens(cb) -> tuple:
+    usage = list(cb.usage_metadata.values())
+    return (
+        sum(u.get("input_tokens", 0) for u in usage),
+        sum(u.get("output_tokens", 0) for u in usage),
+    )
+
+
+def run_two_step(title: str, transcript: str):
+    with get_usage_metadata_callback() as cb:
+        start = time.perf_counter()
+        is_recipe = extractor._judge_recipe_video(title, transcript)
+        if is_recipe:
+            extractor._extract_recipe(title, transcript)
+        elapsed = time.perf_counter() - start
+    return is_recipe, elapsed, _tokens(cb)
+
+
+def run_combined(title: str, transcript: str):
+    with get_usage_metadata_callback() as cb:
+        start = time.perf_counter()
+        result = extractor._validate_and_extract(title, transcript)
+        elapsed = time.perf_counter() - start
+    return result.is_recipe, elapsed, _tokens(cb)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="판별+추출 통합 호출 벤치마크")
+    parser.add_argument("samples", help="JSONL 파일 (title, transcript)")
+    args = parser.parse_args()
+
+    with open(args.samples, encoding="utf-8") as f:
+        samples = [json.loads(line) for line in f if line.strip()]
+
+    results = {"two_step": [], "combined": []}
+    agree = 0
+    for sample in samples:
+        a = run_two_step(sample["title"], sample["transcript"])
+        b = run_combined(sample["title"], sample["transcript"])
+        results["two_step"].append(a)
+        results["combined"].append(b)
+        agree += int(a[0] == b[0])
+
+    print(f"샘플 {len(samples)}개, 판별 일치율 {agree / max(1, len(samples)):.2%}")
+    print(f"{'mode':<10}{'p50(s)':>9}{'mean(s)':>9}{'in_tok':>10}{'out_tok':>10}")
+    for mode, rows in results.items():
+        if not rows:
+            continue
+        latencies = [r[1] for r in rows]
+        in_tok = sum(r[2][0] for r in rows) / len(rows)
+        out_tok = sum(r[2][1] for r in rows) / len(rows)
+        print(f"{mode:<10}{statistics.median(latencies):>9.2f}{statistics.mean(latencies):>9.2f}{in_tok:>10.0f}{out_tok:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+청크 병렬 Whisper 전사 처리량 벤치마크
+
+같은 오디오를 워커 수(코어 수)를 바꿔가며 전사해 벽시계 시간과 실시간 배율(RTF)을 비교합니다.
+워커 1개는 기존 단일 model.transcribe 호출이며, --workers에 없더라도 항상 먼저 실행해 speedup의 기준으로 씁니다.
+
+사용법:
+    cd video_service
+    python benchmarks/bench_whisper_chunked.py <youtube_url 또는 오디오 파일> --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from faster_whisper import WhisperModel  # noqa: E402
+
+from core import asr_policy, transcript  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="청크 병렬 Whisper 처리량 벤치마크")
+    parser.add_argument("source", help="유튜브 URL 또는 로컬 오디오/비디오 파일")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--model", default="medium")
+    parser.add_argument("--chunk-seconds", type=float, default=120.0)
+    args = parser.parse_args()
+
+    if os.path.exists(args.source):
+        audio = transcript.decode_audio_to_pcm(args.source)
+    else:
+        audio = transcript.load_audio(args.source)
+    duration = len(audio) / transcript.SAMPLE_RATE
+    print(f"오디오 길이: {duration:.1f}초, CPU 코어: {os.cpu_count()}")
+    print(f"{'workers':>8}{'wall(s)':>10}{'RTF':>8}{'speedup':>9}{'segments':>10}")
+
+    compute_type = asr_policy.compute_type_for("cpu")
+    # speedup은 항상 워커 1개(단일 호출) 실행 시간 기준
+    worker_counts = [1] + [w for w in dict.fromkeys(args.workers) if w != 1]
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        if workers == 1:
+            model = WhisperModel(args.model, device="cpu", compute_type=compute_type)
+            segments, _ = model.transcribe(audio, language="ko")
+            n_segments = sum(1 for _ in segments)
+        else:
+            n_segments = len(transcript.transcribe_chunked(audio, args.model, compute_type, workers, args.chunk_seconds))
+        wall = time.perf_counter() - start
+        if workers == 1:
+            baseline = wall
+        print(f"{workers:>8}{wall:>10.1f}{wall / duration:>8.3f}{baseline / wall:>9.2f}{n_segments:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,4 +9,94 @@ load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
 # 🌟 이 줄을 추가하여 GEMINI_API_KEY를 LangChain이 찾는 GOOGLE_API_KEY 환경 변수에 직접 할당합니다.
-os.environ["GOOGLE_API_KEY"] = GEMINI_API_KEY
\ No newline at end of file
+if GEMINI_API_KEY:
+    os.environ["GOOGLE_API_KEY"] = GEMINI_API_KEY
+
+# Whisper 오디오 입력 방식
+# - memory: 최적 오디오 스트림을 ffmpeg로 바로 16kHz mono PCM으로 디코딩 (임시 파일 없음)
+# - file: 작업별 임시 디렉토리에 원본 오디오를 내려받아 사용 (재인코딩 없음)
+WHISPER_AUDIO_MODE = os.getenv("WHISPER_AUDIO_MODE", "memory")
+
+# file 모드에서 작업별 임시 디렉토리를 만들 위치 (예: /dev/shm). 비우면 시스템 기본 임시 디렉토리
+AUDIO_SCRATCH_DIR = os.getenv("AUDIO_SCRATCH_DIR", "")
+
+# 자막 없는 긴 영상의 청크 병렬 전사 설정 (CPU 전용)
+# WHISPER_CHUNK_WORKERS: 프로세스 풀 워커 수 (0이면 min(4, CPU 코어 수)), 1이면 청크 모드 비활성화
+WHISPER_CHUNK_WORKERS = int(os.getenv("WHISPER_CHUNK_WORKERS", "0"))
+WHISPER_CHUNK_SECONDS = float(os.getenv("WHISPER_CHUNK_SECONDS", "120"))
+WHISPER_CHUNKED_MIN_SECONDS = float(os.getenv("WHISPER_CHUNKED_MIN_SECONDS", "300"))
+
+# 스트리밍 모드: 전사 세그먼트가 도착하는 대로 판별/추출을 진행하고, 레시피가 아니면 남은 전사를 취소
+VIDEO_STREAMING_MODE = os.getenv("VIDEO_STREAMING_MODE", "false").lower() == "true"
+STREAM_VALIDATE_SECONDS = float(os.getenv("STREAM_VALIDATE_SECONDS", "60"))   # 판별을 시작할 전사 분량(초)
+STREAM_WINDOW_SECONDS = float(os.getenv("STREAM_WINDOW_SECONDS", "180"))      # 부분 추출 1회당 전사 분량(초)
+STREAM_BATCH_SECONDS = float(os.getenv("STREAM_BATCH_SECONDS", "30"))         # 전사 노드가 한 번에 가져오는 분량(초)
+
+# ASR 전 VAD 트리밍: 음악/조리 소음/무음 구간을 잘라 Whisper 연산과 환각 텍스트를 줄임
+WHISPER_VAD_TRIM = os.getenv("WHISPER_VAD_TRIM", "true").lower() == "true"
+VAD_THRESHOLD = float(os.getenv("VAD_THRESHOLD", "0.5"))           # 음성 확률 임계값 (높을수록 음악/소음을 더 많이 제거)
+VAD_MIN_SILENCE_MS = int(os.getenv("VAD_MIN_SILENCE_MS", "1000"))  # 이보다 긴 비음성 구간만 제거
+VAD_SPEECH_PAD_MS = int(os.getenv("VAD_SPEECH_PAD_MS", "300"))     # 음성 구간 앞뒤 여유
+
+# Whisper 모델 자동 선택 정책
+ASR_LATENCY_SLO_SECONDS = float(os.getenv("ASR_LATENCY_SLO_SECONDS", "180"))  # 전사 지연 목표(초)
+ASR_MIN_MODEL = os.getenv("ASR_MIN_MODEL", "tiny")
+ASR_MAX_MODEL = os.getenv("ASR_MAX_MODEL", "medium")
+ASR_RERUN_LOW_CONFIDENCE = os.getenv("ASR_RERUN_LOW_CONFIDENCE", "true").lower() == "true"
+ASR_LOW_CONF_LOGPROB = float(os.getenv("ASR_LOW_CONF_LOGPROB", "-1.0"))  # 이보다 낮은 avg_logprob 세그먼트를 재전사
+ASR_STATS_PATH = os.getenv("ASR_STATS_PATH", "asr_stats.jsonl")  # 선택별 정확도/지연 기록 (비우면 기록 안 함)
+
+# 설명란 우선 추출: 설명란/챕터에 재료와 조리 순서가 충분히 있으면 전사와 LLM 호출을 건너뜀
+DESCRIPTION_FIRST = os.getenv("DESCRIPTION_FIRST", "true").lower() == "true"
+DESCRIPTION_MIN_CONFIDENCE = float(os.getenv("DESCRIPTION_MIN_CONFIDENCE", "0.75"))
+
+# 레시피 판별 로컬 사전 필터: 확률이 ACCEPT 이상이면 통과, REJECT 이하이면 거절, 그 사이만 LLM 판별
+# PREFILTER_MODE - enforce: 위 결정을 따름 / shadow: 항상 LLM 판별, 사전 필터는 일치율만 기록
+#                  auto: PREFILTER_WEIGHTS_PATH에 학습된 가중치(python -m core.prefilter)가 있으면 enforce, 없으면 shadow
+PREFILTER_MODE = os.getenv("PREFILTER_MODE", "auto")
+PREFILTER_ACCEPT = float(os.getenv("PREFILTER_ACCEPT", "0.9"))
+PREFILTER_REJECT = float(os.getenv("PREFILTER_REJECT", "0.1"))
+PREFILTER_SHADOW_RATE = float(os.getenv("PREFILTER_SHADOW_RATE", "0.05"))  # 결정한 경우에도 LLM을 함께 호출해 일치율을 측정할 비율
+PREFILTER_TRANSCRIPT_CHARS = int(os.getenv("PREFILTER_TRANSCRIPT_CHARS", "1500"))
+PREFILTER_WEIGHTS_PATH = os.getenv("PREFILTER_WEIGHTS_PATH", "prefilter_weights.json")
+PREFILTER_LOG_PATH = os.getenv("PREFILTER_LOG_PATH", "prefilter_samples.jsonl")  # (특징, LLM 라벨) 학습 데이터 기록
+
+# 레시피 판별/추출 방식
+# - two_step: 판별 호출 후 추출 호출 (기존)
+# - combined: 하나의 구조화 출력 호출이 is_recipe와 레시피를 함께 반환
+VIDEO_EXTRACT_MODE = os.getenv("VIDEO_EXTRACT_MODE", "two_step")
+
+# 긴 스크립트 맵-리듀스 추출: 토큰 예산 단위 구간별로 부분 레시피를 병렬 추출한 뒤 병합
+VIDEO_MAP_REDUCE = os.getenv("VIDEO_MAP_REDUCE", "false").lower() == "true"
+MAP_REDUCE_MIN_TOKENS = int(os.getenv("MAP_REDUCE_MIN_TOKENS", "6000"))   # 이보다 긴 스크립트만 구간 분할
+MAP_WINDOW_TOKENS = int(os.getenv("MAP_WINDOW_TOKENS", "4000"))           # 구간당 최대 토큰
+MAP_WINDOW_OVERLAP_TOKENS = int(os.getenv("MAP_WINDOW_OVERLAP_TOKENS", "200"))
+MAP_WORKERS = int(os.getenv("MAP_WORKERS", "4"))                          # 구간 동시 추출 수
+
+# 처리 가능한 최대 영상 길이(초). 맵-리듀스 추출이 실제로 도는 경로(VIDEO_MAP_REDUCE=true이고
+# combined 모드이거나 TIMESTAMPED_EXTRACTION=false)에서만 MAX_VIDEO_DURATION_MAP_REDUCE까지 허용
+MAX_VIDEO_DURATION = int(os.getenv("MAX_VIDEO_DURATION", "1200"))
+MAX_VIDEO_DURATION_MAP_REDUCE = int(os.getenv("MAX_VIDEO_DURATION_MAP_REDUCE", "3600"))
+
+# LLM 전송 전 스크립트 압축 (중복 자막 줄/군말/구독·좋아요 요청 제거, 예산 초과 시 조리 관련도 낮은 문장부터 제외)
+TRANSCRIPT_COMPRESSION = os.getenv("TRANSCRIPT_COMPRESSION", "true").lower() == "true"
+COMPRESS_TARGET_TOKENS = int(os.getenv("COMPRESS_TARGET_TOKENS", "12000"))  # 0이면 정리만 하고 문장을 덜어내지 않음
+
+# 시각 정보가 있는 스크립트 세그먼트 저장소 (SQLite). 비우면 메모리에만 보관
+SEGMENT_STORE_PATH = os.getenv("SEGMENT_STORE_PATH", "segments.db")
+# 세그먼트 기반 구간 추출: 챕터/토큰 예산 구간별로 추출해 조리 단계에 영상 시각을 붙이고, 구간 결과를 캐시
+TIMESTAMPED_EXTRACTION = os.getenv("TIMESTAMPED_EXTRACTION", "true").lower() == "true"
+
+# 레시피 그래프 체크포인트 (LangGraph SqliteSaver). 비우면 체크포인트 없이 매번 처음부터 실행
+GRAPH_CHECKPOINT_PATH = os.getenv("GRAPH_CHECKPOINT_PATH", "graph_checkpoints.db")
+# 그래프 스레드 임대 시간(초). 실행 중에는 하트비트로 연장하며, 끝나지 않은 스레드는 임대가 만료된 뒤에만 다른 실행이 재개
+GRAPH_THREAD_LEASE_SECONDS = float(os.getenv("GRAPH_THREAD_LEASE_SECONDS", "120"))
+# 체크포인트에 저장된 최종 판정(레시피 아님, 길이 초과 등)을 다시 쓰는 기간(초). 지나거나 판정 설정이 바뀌면 다시 실행
+GRAPH_VERDICT_TTL_SECONDS = int(os.getenv("GRAPH_VERDICT_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# 공유 작업 큐 모드: /process는 작업을 큐에 넣고 결과를 기다리며, 처리는 여러 노드의 worker.py가 담당
+VIDEO_QUEUE_MODE = os.getenv("VIDEO_QUEUE_MODE", "false").lower() == "true"
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "video_jobs.db")       # 모든 노드가 접근하는 공유 저장소 경로
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "120"))     # 하트비트 없이 이 시간이 지나면 다른 워커가 재처리
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_WAIT_TIMEOUT = float(os.getenv("JOB_WAIT_TIMEOUT", "900"))       # /process가 결과를 기다리는 최대 시간(초)
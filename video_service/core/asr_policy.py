@@ -0,0 +1,188 @@
+# Whisper 모델 선택 정책 (영상 길이, 대기 작업 수, 지연 목표 기반)
+import json
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from video_service import config
+except ModuleNotFoundError:
+    import config
+
+
+# 작은 모델부터 큰 모델 순서
+MODEL_LADDER = ["tiny", "base", "small", "medium"]
+
+# int8 기준 모델별 실시간 배율(RTF, 전사 시간 / 오디오 길이) 초기 추정치
+# 기록된 실측치가 충분히 쌓이면 실측 중앙값으로 대체됨
+DEFAULT_RTF = {
+    "cpu": {"tiny": 0.04, "base": 0.07, "small": 0.18, "medium": 0.45},
+    "cuda": {"tiny": 0.01, "base": 0.015, "small": 0.03, "medium": 0.06},
+}
+
+# 실측 RTF를 사용하기 위한 최소 기록 수
+MIN_SAMPLES_FOR_TUNING = 5
+# 장치/모델별로 중앙값 계산에 쓰는 최근 기록 수
+RTF_WINDOW = 200
+
+
+# --- 동시 전사 작업 수 (대기열 깊이) ---
+_active_jobs = 0
+_active_lock = threading.Lock()
+
+
+def current_queue_depth() -> int:
+    with _active_lock:
+        return _active_jobs
+
+
+@contextmanager
+def asr_slot():
+    """전사 작업 구간을 감싸 동시 작업 수를 집계"""
+    global _active_jobs
+    with _active_lock:
+        _active_jobs += 1
+    try:
+        yield
+    finally:
+        with _active_lock:
+            _active_jobs -= 1
+
+
+def compute_type_for(device: str) -> str:
+    return "int8_float16" if device == "cuda" else "int8"
+
+
+def next_larger_model(model_size: str) -> Optional[str]:
+    idx = MODEL_LADDER.index(model_size) if model_size in MODEL_LADDER else len(MODEL_LADDER) - 1
+    return MODEL_LADDER[idx + 1] if idx + 1 < len(MODEL_LADDER) else None
+
+
+def _allowed_models() -> List[str]:
+    lo = MODEL_LADDER.index(config.ASR_MIN_MODEL) if config.ASR_MIN_MODEL in MODEL_LADDER else 0
+    hi = MODEL_LADDER.index(config.ASR_MAX_MODEL) if config.ASR_MAX_MODEL in MODEL_LADDER else len(MODEL_LADDER) - 1
+    return MODEL_LADDER[lo:hi + 1]
+
+
+# --- 선택별 정확도/지연 기록 ---
+_stats_lock = threading.Lock()
+
+
+def record_asr_run(record: Dict) -> None:
+    """모델 선택 결과(정확도 지표, 지연)를 JSONL로 기록"""
+    if not config.ASR_STATS_PATH:
+        return
+    record = {"ts": round(time.time(), 3), **record}
+    try:
+        with _stats_lock, open(config.ASR_STATS_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"WARN: ASR 기록 저장 실패: {e}")
+
+
+# 기록 파일에서 이미 읽은 위치와 (장치, 모델)별 최근 실측 RTF. select_model마다 파일 전체를 다시 읽지 않도록
+# 새로 추가된 줄만 이어서 읽음 (파일이 교체/축소되면 처음부터 다시 읽음)
+_rtf_cache: Dict = {"file": None, "offset": 0, "samples": {}}
+_rtf_lock = threading.Lock()
+
+
+def _refresh_rtf_samples() -> Dict[Tuple[str, str], deque]:
+    path = config.ASR_STATS_PATH
+    try:
+        st = os.stat(path)
+    except OSError:
+        _rtf_cache.update(file=None, offset=0, samples={})
+        return _rtf_cache["samples"]
+    file_key = (path, st.st_ino)
+    if _rtf_cache["file"] != file_key or st.st_size < _rtf_cache["offset"]:
+        _rtf_cache.update(file=file_key, offset=0, samples={})
+    if st.st_size == _rtf_cache["offset"]:
+        return _rtf_cache["samples"]
+
+    with open(path, "rb") as f:
+        f.seek(_rtf_cache["offset"])
+        chunk = f.read()
+    # 기록 중인 마지막 줄(개행 전)은 다음 조회 때 읽음
+    complete = chunk[:chunk.rfind(b"\n") + 1]
+    _rtf_cache["offset"] += len(complete)
+    for line in complete.splitlines():
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            continue
+        if rec.get("rtf") and rec.get("model") and not rec.get("parallel"):
+            key = (rec.get("device"), rec["model"])
+            _rtf_cache["samples"].setdefault(key, deque(maxlen=RTF_WINDOW)).append(float(rec["rtf"]))
+    return _rtf_cache["samples"]
+
+
+def load_observed_rtf(device: str) -> Dict[str, float]:
+    """기록된 실측 RTF의 모델별 중앙값 (장치/모델별 최근 RTF_WINDOW건 기준)"""
+    if not config.ASR_STATS_PATH:
+        return {}
+    with _rtf_lock:
+        samples = _refresh_rtf_samples()
+        return {
+            model: statistics.median(values)
+            for (dev, model), values in samples.items()
+            if dev == device and len(values) >= MIN_SAMPLES_FOR_TUNING
+        }
+
+
+def estimate_rtf(device: str) -> Dict[str, float]:
+    table = dict(DEFAULT_RTF.get(device, DEFAULT_RTF["cpu"]))
+    table.update(load_observed_rtf(device))
+    return table
+
+
+def select_model(audio_seconds: float, device: str, queue_depth: Optional[int] = None,
+                 slo_seconds: Optional[float] = None, parallelism: int = 1) -> Tuple[str, str]:
+    """
+    지연 목표 안에 끝날 것으로 예상되는 가장 큰 모델을 선택합니다.
+    대기 중인 다른 전사 작업과 자원을 나눠 쓰므로 예산을 (대기 작업 수 + 1)로 나눕니다.
+    """
+    queue_depth = current_queue_depth() if queue_depth is None else queue_depth
+    slo_seconds = slo_seconds or config.ASR_LATENCY_SLO_SECONDS
+    budget = slo_seconds / (queue_depth + 1)
+    rtf = estimate_rtf(device)
+
+    allowed = _allowed_models()
+    chosen = allowed[0]
+    for model in allowed:
+        expected = rtf.get(model, DEFAULT_RTF["cpu"][model]) * audio_seconds / max(1, parallelism)
+        if expected <= budget:
+            chosen = model
+    print(
+        f"🎯 ASR 모델 선택: {chosen} ({compute_type_for(device)}) — 오디오 {audio_seconds:.0f}초, "
+        f"대기 {queue_depth}건, 예산 {budget:.0f}초"
+    )
+    return chosen, compute_type_for(device)
+
+
+# --- 신뢰도 지표 ---
+def is_low_confidence(seg: Dict) -> bool:
+    return (
+        seg.get("avg_logprob", 0.0) < config.ASR_LOW_CONF_LOGPROB
+        or seg.get("compression_ratio", 0.0) > 2.4
+    )
+
+
+def confidence_summary(segments: List[Dict]) -> Dict:
+    if not segments:
+        return {"mean_avg_logprob": None, "low_conf_ratio": 0.0}
+    logprobs = [seg.get("avg_logprob", 0.0) for seg in segments]
+    low = sum(1 for seg in segments if is_low_confidence(seg))
+    return {
+        "mean_avg_logprob": round(statistics.mean(logprobs), 4),
+        "low_conf_ratio": round(low / len(segments), 4),
+    }
+
+
+def text_agreement(a: str, b: str) -> float:
+    """작은 모델과 큰 모델 전사 결과의 문자 단위 일치율 (작은 모델 정확도의 근사치)"""
+    return round(SequenceMatcher(None, a or "", b or "").ratio(), 4)
@@ -0,0 +1,169 @@
+# LLM에 보내기 전 스크립트 압축 (자동 자막의 중복 줄, 군말, 구독/좋아요 요청 제거 + 조리 관련도 기반 토큰 예산 맞춤)
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from video_service import config
+except ModuleNotFoundError:
+    import config
+
+from .prefilter import COOKING_VERBS, INGREDIENT_WORDS, QUANTITY
+from .tokens import estimate_tokens, split_sentences
+
+
+# 단독으로 쓰인 경우에만 제거하는 군말 (뜻이 없는 머뭇거림만. "좀", "자", "그", "진짜"는 "소금 좀 더"처럼 내용이 될 수 있어 유지)
+FILLERS = {"음", "음음", "어", "어어", "엄", "um", "uh"}
+# 자막 태그 ([음악], [박수], (웃음) 등)
+CAPTION_TAG = re.compile(r"[\[(（](음악|박수|웃음|music|applause|laughter|音楽)[\])）]", re.IGNORECASE)
+# 구독/좋아요/알림 요청과 시청 인사 문장 ("좋아요"는 "맛이 좋아요"와 구분하도록 요청 표현과 함께일 때만)
+BOILERPLATE = re.compile(
+    r"(구독|좋아요\s*(와|랑|하고|,)?\s*(구독|눌러|누르|부탁|버튼)|알림\s*(설정|버튼)|"
+    r"시청해\s*주셔서|봐\s*주셔서|subscribe|like\s+and|thanks\s+for\s+watching)",
+    re.IGNORECASE,
+)
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"[^0-9a-z가-힣]", "", text.lower())
+
+
+def _strip_fillers(sentence: str) -> str:
+    words = [w for w in sentence.split() if w.strip(".,!?~").lower() not in FILLERS]
+    # "네 네 네", "볶아 볶아" 처럼 바로 반복된 단어는 하나만 남김
+    deduped = [w for i, w in enumerate(words) if i == 0 or w != words[i - 1]]
+    return " ".join(deduped)
+
+
+def _remove_overlap(prev: List[str], cur: List[str]) -> List[str]:
+    # 자동 자막은 이전 줄의 끝부분이 다음 줄 앞에 반복되는 경우가 많음 (단어 단위 최장 겹침 제거)
+    for size in range(min(len(prev), len(cur)), 1, -1):
+        if prev[-size:] == cur[:size]:
+            return cur[size:]
+    return cur
+
+
+def relevance(sentence: str) -> float:
+    """조리 관련도 점수 (조리 동사, 재료, 분량 표현 출현 수)"""
+    lower = sentence.lower()
+    verbs = sum(1 for w in COOKING_VERBS if w in lower)
+    ingredients = sum(1 for w in INGREDIENT_WORDS if w in lower)
+    quantities = len(QUANTITY.findall(sentence))
+    return verbs + ingredients + 2.0 * quantities
+
+
+def _clean_sentences(text: str) -> Tuple[List[str], Dict[str, int]]:
+    counts = {"overlap_removed": 0, "duplicates_removed": 0, "boilerplate_removed": 0}
+    kept: List[str] = []
+    prev_key = ""
+    prev_words: List[str] = []
+    raw = split_sentences(CAPTION_TAG.sub(" ", text))
+    for i, sentence in enumerate(raw):
+        words = sentence.split()
+        trimmed = _remove_overlap(prev_words, words)
+        if len(trimmed) < len(words):
+            counts["overlap_removed"] += 1
+        prev_words = words
+        sentence = _strip_fillers(" ".join(trimmed))
+
+        key = _normalize(sentence)
+        if not key:
+            continue
+        # 자동 자막이 같은 줄을 연달아 반복한 경우만 제거 (떨어진 곳의 같은 문장은 다른 단계일 수 있으므로 유지)
+        if key == prev_key:
+            counts["duplicates_removed"] += 1
+            continue
+        # "좋아요 / 눌러주세요"처럼 문장 분리에서 따로 잘린 "좋아요"는 이웃 문장과 이어서 요청인지 판단
+        like_request = (
+            (key == "좋아요" and i + 1 < len(raw) and BOILERPLATE.search(f"{sentence} {raw[i + 1]}"))
+            or (i > 0 and _normalize(raw[i - 1]) == "좋아요" and BOILERPLATE.search(f"{raw[i - 1]} {sentence}"))
+        )
+        # 분량/조리 동사가 섞인 문장은 상투어가 있어도 유지 ("구독하시고, 이제 간장 2큰술 넣어주세요")
+        if (like_request or BOILERPLATE.search(sentence)) and relevance(sentence) == 0:
+            counts["boilerplate_removed"] += 1
+            continue
+        prev_key = key
+        kept.append(sentence)
+    return kept, counts
+
+
+def compress_transcript(text: str, budget_tokens: Optional[int] = None) -> Tuple[str, Dict]:
+    """
+    스크립트를 정리하고, budget_tokens를 넘으면 조리 관련도가 높은 문장부터 예산 안에서 남깁니다.
+    남긴 문장은 원래 순서를 유지합니다. budget_tokens가 0이면 정리만 하고 문장을 덜어내지 않습니다.
+    """
+    budget = config.COMPRESS_TARGET_TOKENS if budget_tokens is None else budget_tokens
+    original_tokens = estimate_tokens(text)
+    sentences, counts = _clean_sentences(text or "")
+
+    dropped = 0
+    if budget and sum(estimate_tokens(s) for s in sentences) > budget:
+        # 관련도 높은 순 (동점이면 앞 문장 우선)
+        order = sorted(range(len(sentences)), key=lambda i: (-relevance(sentences[i]), i))
+        keep, used = set(), 0
+        for i in order:
+            tokens = estimate_tokens(sentences[i])
+            if used + tokens > budget:
+                continue
+            keep.add(i)
+            used += tokens
+        dropped = len(sentences) - len(keep)
+        sentences = [s for i, s in enumerate(sentences) if i in keep]
+
+    compressed = " ".join(sentences)
+    compressed_tokens = estimate_tokens(compressed)
+    stats = {
+        "original_tokens": original_tokens,
+        "compressed_tokens": compressed_tokens,
+        "reduction_ratio": round(1 - compressed_tokens / original_tokens, 4) if original_tokens else 0.0,
+        "low_relevance_dropped": dropped,
+        **counts,
+    }
+    _record(stats)
+    return compressed, stats
+
+
+# 같은 문장의 세그먼트가 이 간격(초) 안에 다시 나오면 자막 반복으로 보고 제거
+DUPLICATE_WINDOW_SECONDS = 5.0
+
+
+def clean_segments(segments: List[Dict]) -> List[Dict]:
+    """시각 정보를 유지한 채 세그먼트 단위로 정리 (자막 태그/겹침/군말/인접 중복/상투 문장 제거, 예산 축소는 하지 않음)"""
+    cleaned: List[Dict] = []
+    recent: Dict[str, float] = {}  # 정규화한 문장 → 마지막으로 남긴 세그먼트의 끝 시각
+    prev_words: List[str] = []
+    for seg in segments:
+        words = CAPTION_TAG.sub(" ", seg.get("text", "")).split()
+        trimmed = _remove_overlap(prev_words, words)
+        prev_words = words
+        text = _strip_fillers(" ".join(trimmed))
+        key = _normalize(text)
+        if not key or (BOILERPLATE.search(text) and relevance(text) == 0):
+            continue
+        # 겹치거나 몇 초 안에 반복된 같은 문장만 중복 (몇 분 뒤 같은 말은 다른 단계의 재료 추가일 수 있음)
+        start = float(seg.get("start", 0.0))
+        if key in recent and start - recent[key] <= DUPLICATE_WINDOW_SECONDS:
+            continue
+        recent[key] = float(seg.get("end", start))
+        cleaned.append({**seg, "text": text})
+    return cleaned
+
+
+# --- 누적 통계 ---
+_totals = {"transcripts": 0, "original_tokens": 0, "compressed_tokens": 0}
+_totals_lock = threading.Lock()
+
+
+def _record(stats: Dict) -> None:
+    with _totals_lock:
+        _totals["transcripts"] += 1
+        _totals["original_tokens"] += stats["original_tokens"]
+        _totals["compressed_tokens"] += stats["compressed_tokens"]
+
+
+def get_stats() -> Dict:
+    with _totals_lock:
+        totals = dict(_totals)
+    original = totals["original_tokens"]
+    totals["reduction_ratio"] = round(1 - totals["compressed_tokens"] / original, 4) if original else 0.0
+    return totals
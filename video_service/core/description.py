@@ -0,0 +1,137 @@
+# 영상 설명란/챕터에서 레시피를 규칙 기반으로 추출하는 기능 (LLM/전사 없이)
+import re
+from typing import Dict, List, Optional, Tuple
+
+
+# 섹션 제목 패턴
+INGREDIENT_HEADER = re.compile(
+    r"^[\W_]*(재료|필요한\s*재료|주\s*재료|부\s*재료|양념(장)?|소스|드레싱|반죽|ingredients?|seasoning|sauce)\b",
+    re.IGNORECASE,
+)
+STEP_HEADER = re.compile(
+    r"^[\W_]*(만드는\s*(법|방법)|조리\s*(법|방법|순서|과정)|레시피|만들기|recipe|directions|instructions|method|steps)\b",
+    re.IGNORECASE,
+)
+# 레시피 섹션이 끝났음을 알리는 줄 (채널 홍보, 음악 출처, 해시태그 등)
+STOP_LINE = re.compile(
+    r"(구독|좋아요|알림\s*설정|문의|협찬|instagram|인스타|blog|블로그|bgm|music|음악|subscribe|copyright|ⓒ|©|^#)",
+    re.IGNORECASE,
+)
+
+UNITS = (
+    r"kg|g|mg|ml|l|cc|oz|lb|cup|cups|tbsp|tsp|T|t|컵|큰술|작은술|스푼|숟가락|티스푼|개|마리|쪽|톨|줌|꼬집|장|대|알|"
+    r"모|팩|봉지|봉|통|캔|조각|공기|인분|포기|근|송이|줄기|덩이|단|뿌리"
+)
+QUANTITY = re.compile(rf"(\d+([./]\d+)?|½|¼|¾|반)\s*({UNITS})\b|약간|적당량|조금|한\s*(줌|꼬집|스푼)", re.IGNORECASE)
+NUMBERED = re.compile(r"^\s*(\d{1,2}|[①-⑳])\s*[.)\]:\-]?\s+")
+COOKING_VERBS = re.compile(
+    r"(넣|볶|끓|굽|구워|썰|다지|섞|버무|삶|데치|튀기|찌|졸이|부치|재워|절이|익히|불려|올려|뿌려|"
+    r"add|stir|boil|fry|bake|chop|mix|simmer|grill|roast|season)",
+    re.IGNORECASE,
+)
+# 조리 단계가 아닌 챕터 제목
+NON_STEP_CHAPTER = re.compile(r"(인트로|intro|outro|아웃트로|시식|먹방|마무리|완성|tasting|ending|예고)", re.IGNORECASE)
+TIMESTAMP = re.compile(r"^\s*\(?\d{1,2}:\d{2}(:\d{2})?\)?\s*")
+BULLET = re.compile(r"^[\s\-•·*▶►■□◆◇○●✔✓☑→>]+")
+
+
+def _clean_line(line: str) -> str:
+    line = TIMESTAMP.sub("", line)
+    line = BULLET.sub("", line)
+    return line.strip()
+
+
+def clean_food_name(title: str) -> str:
+    """영상 제목에서 괄호/해시태그/채널 꼬리말을 걷어낸 요리명 후보"""
+    name = re.sub(r"[\[【(<].*?[\]】)>]", " ", title or "")
+    name = re.sub(r"#\S+", " ", name)
+    name = re.split(r"[|ㅣ/]", name)[0]
+    name = re.sub(r"[^\w\s가-힣~&+-]", " ", name)
+    return re.sub(r"\s+", " ", name).strip() or (title or "").strip()
+
+
+def _split_ingredient_line(line: str) -> List[str]:
+    # "돼지고기 200g, 양파 1/2개, 대파 1대" 처럼 한 줄에 여러 재료가 있는 경우
+    parts = [p.strip() for p in re.split(r"[,，、]|\s{2,}", line) if p.strip()]
+    return parts if len(parts) > 1 and all(QUANTITY.search(p) for p in parts) else [line]
+
+
+def _parse_sections(lines: List[str]) -> Tuple[List[str], List[str], bool]:
+    ingredients: List[str] = []
+    steps: List[str] = []
+    section = ""
+    saw_header = False
+    for raw in lines:
+        line = _clean_line(raw)
+        if not line:
+            continue
+        if STOP_LINE.search(line) and not QUANTITY.search(line):
+            section = ""
+            continue
+        if INGREDIENT_HEADER.match(line):
+            section, saw_header = "ingredients", True
+            rest = re.sub(INGREDIENT_HEADER, "", line).strip(" :：-])】")
+            if rest and QUANTITY.search(rest):
+                ingredients.extend(_split_ingredient_line(rest))
+            continue
+        if STEP_HEADER.match(line) and len(line) < 30:
+            section, saw_header = "steps", True
+            continue
+
+        if section == "ingredients" and (QUANTITY.search(line) or len(line) <= 15):
+            ingredients.extend(_split_ingredient_line(line))
+        elif section == "steps" or (NUMBERED.match(line) and COOKING_VERBS.search(line)):
+            if COOKING_VERBS.search(line) or NUMBERED.match(line):
+                steps.append(NUMBERED.sub("", line).strip())
+        elif QUANTITY.search(line) and len(line) <= 40 and not COOKING_VERBS.search(line):
+            # 헤더 없이 나열된 "재료 + 양" 줄
+            ingredients.append(line)
+    return ingredients, steps, saw_header
+
+
+def _chapter_steps(chapters: Optional[List[Dict]]) -> List[str]:
+    steps = []
+    for ch in chapters or []:
+        title = _clean_line(str(ch.get("title", "")))
+        if title and not NON_STEP_CHAPTER.search(title):
+            steps.append(title)
+    return steps
+
+
+def parse_description_recipe(title: str, description: str,
+                             chapters: Optional[List[Dict]] = None) -> Tuple[Optional[Dict], float]:
+    """
+    설명란과 챕터에서 재료/조리 단계를 추출하고 신뢰도(0~1)를 함께 반환합니다.
+    재료나 단계가 하나도 없으면 (None, 0.0)을 반환합니다.
+    """
+    lines = (description or "").splitlines()
+    ingredients, steps, saw_header = _parse_sections(lines)
+
+    # 설명란에 단계가 없으면 조리 과정을 나타내는 챕터 제목을 단계로 사용
+    chapter_steps = _chapter_steps(chapters)
+    from_chapters = False
+    if len(steps) < 2 and len(chapter_steps) >= 3:
+        steps, from_chapters = chapter_steps, True
+
+    # 중복 제거 (순서 유지)
+    ingredients = list(dict.fromkeys(i for i in ingredients if 1 < len(i) <= 60))
+    steps = list(dict.fromkeys(s for s in steps if len(s) > 1))
+
+    if not ingredients or not steps:
+        return None, 0.0
+
+    quantified = sum(1 for i in ingredients if QUANTITY.search(i)) / len(ingredients)
+    verb_steps = sum(1 for s in steps if COOKING_VERBS.search(s)) / len(steps)
+    confidence = (
+        0.30 * min(1.0, len(ingredients) / 5)
+        + 0.20 * quantified
+        + 0.25 * min(1.0, len(steps) / 4)
+        + 0.15 * (verb_steps if not from_chapters else 0.5)
+        + 0.10 * (1.0 if saw_header else 0.0)
+    )
+    recipe = {
+        "food_name": clean_food_name(title),
+        "ingredients": ingredients,
+        "steps": steps[:15],
+    }
+    return recipe, round(confidence, 3)
@@ -1,19 +1,45 @@
 # LangGraph, Gemini 분석 기능
 
 import os
-from typing import TypedDict, List
+import re
+import operator
+import threading
+import uuid
+import contextvars
+import sqlite3
+import hashlib
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypedDict, List, Dict, Annotated, Optional, Tuple
 from pydantic import BaseModel, Field
 from langgraph.graph import StateGraph, END
+from langgraph.checkpoint.sqlite import SqliteSaver
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.tools import tool
 import logging
-from config import GEMINI_API_KEY
 import json
 import aiohttp
 
+# 서버(video_service 디렉토리 실행)와 intent_service(패키지 import) 양쪽에서 불러오므로 두 경로 모두 지원
+try:
+    from video_service import config
+except ModuleNotFoundError:
+    import config
+
+GEMINI_API_KEY = config.GEMINI_API_KEY
 
 # 다른 파일에 있는 스크립트 추출 함수를 가져옵니다.
-from .transcript import get_youtube_transcript, get_youtube_title, get_youtube_duration
+from .transcript import (
+    get_youtube_transcript, get_youtube_transcript_segments, get_youtube_title, get_youtube_duration,
+    get_youtube_info, get_local_media_segments, get_media_duration, TranscriptStream, _extract_video_id,
+)
+from .description import parse_description_recipe
+from . import metrics, prefilter, progress
+from .compress import compress_transcript, clean_segments
+from .segment_store import get_store, build_windows, window_text, window_hash, parse_timestamp
+from .thread_lease import ThreadLeases
+from .tokens import estimate_tokens, split_by_tokens
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -28,13 +54,47 @@ class Recipe(BaseModel):
     ingredients: List[str] = Field(description="요리에 필요한 재료 목록 (양 포함)")
     steps: List[str] = Field(description="조리 과정을 순서대로 요약한 목록")
 
+# 판별 + 추출 통합 호출용 스키마
+class RecipeWithValidation(BaseModel):
+    is_recipe: bool = Field(description="영상이 음식을 만들거나 조리하는 방법을 포함하면 true, 먹방/리뷰/소개 영상이면 false")
+    food_name: str = Field(default="", description="요리 이름 (is_recipe가 false면 빈 문자열)")
+    ingredients: List[str] = Field(default_factory=list, description="요리에 필요한 재료 목록 (양 포함)")
+    steps: List[str] = Field(default_factory=list, description="조리 과정을 순서대로 요약한 목록")
+
+# 시각 정보가 있는 구간 추출용 스키마 (단계별 영상 시각 포함)
+class TimedRecipe(Recipe):
+    step_timestamps: List[str] = Field(default_factory=list, description="각 조리 단계가 처음 언급된 영상 시각 [분:초] 목록 (steps와 같은 순서/개수)")
+
+# 조리 단계 최대 개수
+MAX_RECIPE_STEPS = 15
+
+# 구간 추출 프롬프트 버전. 프롬프트를 바꾸면 올려서 캐시된 구간 추출 결과를 다시 만들게 함
+EXTRACT_PROMPT_VERSION = "timed-v1"
+# 판별 프롬프트 버전. 판별 프롬프트/기준을 바꾸면 올려서 체크포인트에 저장된 "레시피 아님" 판정을 다시 내리게 함
+VALIDATE_PROMPT_VERSION = "validate-v1"
+
 class GraphState(TypedDict):
     youtube_url: str
+    media_path: str  # 로컬 미디어 파일 처리 시 (일괄 수집)
+    job_id: str
+    video_id: str
     transcript: str
     video_title: str
+    video_description: str
+    video_chapters: List[dict]
+    video_duration: int
     recipe: Recipe
+    recipe_source: str
     error: str
+    error_transient: bool  # 일시적 오류(예외, LLM/네트워크 실패)면 True, 레시피 아님/길이 초과 같은 최종 판정이면 False
+    verdict_version: str  # 실행 시작 시점의 판정 설정 버전 (저장된 최종 판정을 다시 쓸지 판단)
     final_answer: str
+    # 스트리밍 모드 전용: 도착한 전사 세그먼트와 부분 추출 결과를 누적
+    transcript_segments: Annotated[List[dict], operator.add]
+    stream_done: bool
+    validated: bool
+    extracted_upto: int
+    partial_recipes: Annotated[List[Recipe], operator.add]
 
 
 # 재료 문자열을 정규화하는 함수
@@ -107,45 +167,185 @@ def build_recipe_object(source: str, payload: dict) -> dict:
 
 
 
-# 영상 제목 추출을 담당하는 노드
+# 영상 제목 추출을 담당하는 노드 (설명/챕터/길이도 같은 조회에서 함께 저장)
 def title_node(state: GraphState) -> GraphState:
     logger.info("--- 영상 제목 추출 노드 실행 ---")
+    progress.report("metadata")
+    if state.get("media_path"):
+        # 로컬 파일은 파일 이름을 제목으로 사용 (설명란/챕터 없음)
+        path = state["media_path"]
+        return {
+            "video_title": os.path.splitext(os.path.basename(path))[0],
+            "video_duration": get_media_duration(path),
+        }
     try:
-        video_title = get_youtube_title(state["youtube_url"])
-        return {"video_title": video_title}
+        info = get_youtube_info(state["youtube_url"])
+        logger.info(f"✅ 유튜브 영상 제목: {info['title']}")
+        return {
+            "video_title": info["title"],
+            "video_description": info["description"],
+            "video_chapters": info["chapters"],
+            "video_duration": info["duration"],
+        }
     except Exception as e:
         logger.error(f"영상 제목 추출 오류: {e}")
         return {"video_title": "요리명을 추출할 수 없습니다."}
 
 
+# 설명란/챕터만으로 레시피를 만들 수 있으면 전사와 LLM 호출 없이 바로 반환하는 노드
+def description_node(state: GraphState) -> GraphState:
+    logger.info("--- 설명란 레시피 추출 노드 실행 ---")
+    progress.report("description")
+    if not config.DESCRIPTION_FIRST:
+        return {}
+    try:
+        parsed, confidence = parse_description_recipe(
+            state.get("video_title", ""), state.get("video_description", ""), state.get("video_chapters"),
+        )
+    except Exception as e:
+        logger.error(f"설명란 레시피 추출 오류: {e}")
+        return {}
+
+    logger.info(f"INFO: 설명란 레시피 신뢰도: {confidence}")
+    if not parsed or confidence < config.DESCRIPTION_MIN_CONFIDENCE:
+        return {}
+
+    recipe_object = Recipe(**parsed)
+    answer = f"✅ 유튜브 영상에서 '{recipe_object.food_name}' 레시피를 성공적으로 추출했습니다!"
+    return {"recipe": recipe_object, "recipe_source": "description", "final_answer": answer}
+
+
+def route_after_description(state: GraphState) -> str:
+    return END if state.get("recipe") else "transcriber"
+
+
+# 긴 스크립트가 실제로 텍스트 맵-리듀스 경로(_transcript_windows)로 추출되는지
+# (TIMESTAMPED_EXTRACTION이 켜진 two_step 추출은 세그먼트 구간 추출을 쓰므로 해당 없음)
+def _map_reduce_runs() -> bool:
+    if not config.VIDEO_MAP_REDUCE:
+        return False
+    return config.VIDEO_EXTRACT_MODE == "combined" or not config.TIMESTAMPED_EXTRACTION
+
+
+# 처리 가능한 최대 영상 길이(초). 맵-리듀스 추출이 실제로 도는 경로에서만 더 긴 영상을 허용하고,
+# 스트리밍 경로처럼 맵-리듀스를 거치지 않는 경로는 항상 기본 한도
+def max_video_duration(streaming: bool = False) -> int:
+    if streaming or not _map_reduce_runs():
+        return config.MAX_VIDEO_DURATION
+    return config.MAX_VIDEO_DURATION_MAP_REDUCE
+
+
+# 로컬 미디어 파일의 저장소 키 (경로/크기/수정 시각이 같으면 같은 파일로 간주)
+def local_media_id(path: str) -> str:
+    st = os.stat(path)
+    digest = hashlib.sha1(f"{os.path.abspath(path)}:{st.st_size}:{int(st.st_mtime)}".encode("utf-8")).hexdigest()
+    return f"local-{digest[:16]}"
+
+
 # 스크립트 추출을 담당하는 노드
 def transcript_node(state: GraphState) -> GraphState:
     logger.info("--- 스크립트 추출 노드 실행 ---")
+    progress.report("transcribing")
     try:
-        duration = get_youtube_duration(state["youtube_url"])
+        media_path = state.get("media_path")
+        duration = state.get("video_duration") or (0 if media_path else get_youtube_duration(state["youtube_url"]))
         logger.debug(f"DEBUG: 영상 길이(초): {duration}")
-        if duration > 1200:
-            logger.warning("WARN: 20분 초과 영상 - 처리 중단")
-            return {"error": "20분을 초과하는 영상은 처리할 수 없습니다."}
-        transcript_text = get_youtube_transcript(state["youtube_url"])
+        limit = max_video_duration()
+        if duration > limit:
+            logger.warning(f"WARN: {limit // 60}분 초과 영상 - 처리 중단")
+            return {"error": f"{limit // 60}분을 초과하는 영상은 처리할 수 없습니다.", "error_transient": False}
+        # 시각 정보가 있는 세그먼트를 저장소에 보관하고, 이미 저장된 영상은 다시 전사하지 않음
+        video_id = local_media_id(media_path) if media_path else _extract_video_id(state["youtube_url"])
+        store = get_store()
+        if store.has_transcript(video_id):
+            logger.info("INFO: 저장된 스크립트 세그먼트 사용")
+            segments = store.segments(video_id)
+        else:
+            if media_path:
+                segments, source = get_local_media_segments(media_path), "whisper"
+            else:
+                segments, source = get_youtube_transcript_segments(state["youtube_url"])
+            store.save_transcript(video_id, segments, state.get("video_chapters") or [], source)
+        transcript_text = " ".join(seg["text"] for seg in segments)
+        metrics.inc("transcript_chars", len(transcript_text))
         logger.debug(f"DEBUG: 추출된 스크립트 길이: {len(transcript_text) if transcript_text else 0}")
 
         # if not transcript_text or len(transcript_text.strip()) < 10:
         #     logger.warning("WARN: 스크립트가 없거나 너무 짧음")
         #     # 스크립트가 없으면 뒤의 비디오 분석 노드로 우회하도록 에러만 표기
         #     return {"error": "스크립트를 추출할 수 없습니다. (자막/음성 없음 또는 너무 짧음)"}
+        if transcript_text and config.TRANSCRIPT_COMPRESSION:
+            transcript_text, stats = compress_transcript(transcript_text)
+            logger.info(
+                f"INFO: 스크립트 압축 {stats['original_tokens']} → {stats['compressed_tokens']} 토큰 "
+                f"({stats['reduction_ratio']:.0%} 감소)"
+            )
         logger.info(f"INFO: 스크립트 일부 미리보기: {transcript_text[:100]}...")
-        return {"transcript": transcript_text}
+        return {"transcript": transcript_text, "video_id": video_id}
     
     except Exception as e:
         logger.error(f"스크립트 추출 오류: {e}")
-        return {"error": f"스크립트 추출 중 오류: {e}"}
+        return {"error": f"스크립트 추출 중 오류: {e}", "error_transient": True}
+
+
 
+# Gemini 모델 (호출 용도별 토큰 사용량을 지표로 집계)
+def _gemini(purpose: str) -> ChatGoogleGenerativeAI:
+    return ChatGoogleGenerativeAI(
+        model="gemini-2.5-flash", temperature=0, google_api_key=GEMINI_API_KEY,
+        callbacks=[metrics.TokenUsageCallback(purpose)],
+    )
+
+
+# 스레드 풀에서도 현재 작업의 지표/진행 상황 컨텍스트를 이어받아 실행
+def _map_in_context(pool: ThreadPoolExecutor, fn, items):
+    parent = contextvars.copy_context()
+    return pool.map(lambda item: parent.copy().run(fn, item), items)
+
+
+# 영상 제목과 스크립트를 보고 LLM이 레시피 영상인지 판단 (예/아니오)
+def _judge_recipe_video(title: str, transcript: str) -> bool:
+    llm = _gemini("validate")
+
+    prompt = f"""
+    주어진 영상 제목과 스크립트를 보고, 이 영상이 음식을 만들거나 조리하는 방법에 대한 정보를 포함하고 있는지 판단해줘.
+
+    - 단순히 음식을 먹기만 하는 '먹방'이나, 식당을 '리뷰' 또는 '소개'하는 영상은 '아니오'로 판단해야 해.
+    - 라면을 끓이거나, 기존 제품을 섞어 먹는 등 아주 간단한 조리법이라도 포함되어 있다면 '예'로 판단해야 해.
+
+    [영상 제목]
+    {title}
+
+    [스크립트]
+    {transcript[:1000]}  # 스크립트가 너무 길 경우를 대비해 앞부분만 사용
+
+    위 내용을 바탕으로 판단했을 때, 레시피 정보가 포함되어 있다면 '예', 그렇지 않다면 '아니오' 둘 중 하나로만 대답해줘.
+    """
+
+    result = llm.invoke(prompt).content.strip()
+    logger.info(f"✅ AI 판별 결과: {result}")
+    return "예" in result
+
+
+# 로컬 사전 필터로 확실한 경우는 바로 판정하고, 애매한 경우에만 LLM 판별을 호출
+def _is_recipe_video(title: str, description: str, transcript: str) -> bool:
+    decision, p, features = prefilter.decide(title, description, transcript)
+    prefilter.record_decision(decision)
+    logger.info(f"INFO: 사전 필터 점수 {p:.3f} → {'애매(LLM 판별)' if decision is None else decision}")
+
+    if decision is not None and prefilter.enforced() and not prefilter.should_shadow():
+        return decision
+
+    llm_label = _judge_recipe_video(title, transcript)
+    prefilter.record_llm_label(decision, p, features, llm_label)
+    # 섀도 호출은 일치율 측정용이므로 사전 필터의 결정을 그대로 따름 (shadow 모드는 항상 LLM 판정)
+    return llm_label if decision is None or not prefilter.enforced() else decision
 
 
 # 영상 제목과 스크립트를 기반으로 레시피 영상인지 판단하는 노드
 def recipe_validator_node(state: GraphState) -> GraphState:
     logger.info("--- AI 레시피 판별 노드 실행 ---")
+    progress.report("validating")
     title = state.get("video_title", "")
     transcript = state.get("transcript", "")
     
@@ -154,47 +354,31 @@ def recipe_validator_node(state: GraphState) -> GraphState:
     #     return {"error": "스크립트 내용이 너무 짧습니다."}
 
     try:
-        llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0, google_api_key=GEMINI_API_KEY)
-        
-        prompt = f"""
-        주어진 영상 제목과 스크립트를 보고, 이 영상이 음식을 만들거나 조리하는 방법에 대한 정보를 포함하고 있는지 판단해줘.
-
-        - 단순히 음식을 먹기만 하는 '먹방'이나, 식당을 '리뷰' 또는 '소개'하는 영상은 '아니오'로 판단해야 해.
-        - 라면을 끓이거나, 기존 제품을 섞어 먹는 등 아주 간단한 조리법이라도 포함되어 있다면 '예'로 판단해야 해.
-
-        [영상 제목]
-        {title}
-
-        [스크립트]
-        {transcript[:1000]}  # 스크립트가 너무 길 경우를 대비해 앞부분만 사용
-
-        위 내용을 바탕으로 판단했을 때, 레시피 정보가 포함되어 있다면 '예', 그렇지 않다면 '아니오' 둘 중 하나로만 대답해줘.
-        """
-        
-        result = llm.invoke(prompt).content.strip()
-        logger.info(f"✅ AI 판별 결과: {result}")
-
-        if "예" in result:
+        if _is_recipe_video(title, state.get("video_description", ""), transcript):
             return {} # 다음 단계로 진행 (에러 없음)
         else:
-            return {"error": "AI가 레시피 영상이 아니라고 판단했습니다."}
+            return {"error": "AI가 레시피 영상이 아니라고 판단했습니다.", "error_transient": False}
 
     except Exception as e:
         logger.error(f"❌ AI 판별 중 오류: {e}")
-        return {"error": f"AI 판별 중 오류 발생: {str(e)}"}
+        return {"error": f"AI 판별 중 오류 발생: {str(e)}", "error_transient": True}
 
 
 # 스크립트가 전혀 없을 때, 비디오 자체를 Gemini로 분석하여 레시피를 추출하는 노드
 def video_analyzer_node(state: GraphState) -> GraphState:
     logger.info("--- 비디오 직접 분석 노드 실행 (Gemini Video Understanding) ---")
+    progress.report("video_analysis")
     youtube_url = state.get("youtube_url", "")
     video_title = state.get("video_title", "요리명을 추출할 수 없습니다.")
 
     if not youtube_url:
-        return {"error": "유튜브 URL이 없습니다."}
+        # 로컬 미디어는 영상 분석으로 우회할 수 없으므로 앞 단계(전사)의 오류를 그대로 유지
+        if state.get("error"):
+            return {}
+        return {"error": "유튜브 URL이 없습니다.", "error_transient": False}
 
     try:
-        llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0, google_api_key=GEMINI_API_KEY)
+        llm = _gemini("video_analysis")
         structured_llm = llm.with_structured_output(Recipe)
 
         prompt = f"""
@@ -220,50 +404,154 @@ def video_analyzer_node(state: GraphState) -> GraphState:
 
     except Exception as e:
         logger.error(f"비디오 직접 분석 오류: {e}")
-        return {"error": f"비디오 직접 분석 중 오류 발생: {str(e)}"}
+        return {"error": f"비디오 직접 분석 중 오류 발생: {str(e)}", "error_transient": True}
 
 
-# 레시피 추출을 담당하는 노드
-def recipe_extract_node(state: GraphState) -> GraphState:
-    logger.info("--- 레시피 추출 노드 실행 ---")
-    transcript = state.get("transcript")
-    video_title = state.get("video_title", "요리명을 추출할 수 없습니다.")
+# 제목과 스크립트(전체 또는 일부 구간)로부터 LLM 구조화 출력으로 레시피를 추출
+def _extract_recipe(video_title: str, transcript: str, partial: bool = False) -> Recipe:
+    # LLM 모델 초기화
+    llm = _gemini("extract")
 
-    if not transcript:
-        return {"error": "스크립트가 없습니다. (자막/음성 없음)"}
+    # Pydantic 모델(Recipe)을 사용해 구조화된 출력을 요청
+    structured_llm = llm.with_structured_output(Recipe)
 
-    try:
-        # LLM 모델 초기화
-        llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0, google_api_key=GEMINI_API_KEY)
+    # 부분 구간이면 해당 구간에 실제로 등장한 내용만 뽑도록 지시 (병합은 코드에서 수행)
+    scope_note = (
+        "\n        - 이 스크립트는 영상의 **일부 구간**입니다. 이 구간에서 실제로 언급된 재료와 조리 단계만 추출하고, 없는 내용은 추측하지 마세요."
+        if partial else ""
+    )
 
-        # Pydantic 모델(Recipe)을 사용해 구조화된 출력을 요청
-        structured_llm = llm.with_structured_output(Recipe)
+    # 프롬프트 생성 - 더 구체적이고 명확한 지시사항
+    prompt = f"""
+    당신은 요리 레시피 전문가입니다. 주어진 유튜브 영상 제목과 스크립트를 바탕으로 레시피를 추출해주세요.
 
-        # 프롬프트 생성 - 더 구체적이고 명확한 지시사항
-        prompt = f"""
-        당신은 요리 레시피 전문가입니다. 주어진 유튜브 영상 제목과 스크립트를 바탕으로 레시피를 추출해주세요.
+    - 스크립트에서 언급된 모든 재료를 ingredients 목록에 추가하세요.
+    - 스크립트의 조리 과정을 순서대로 steps 목록에 추가하세요.{scope_note}
 
-        - 스크립트에서 언급된 모든 재료를 ingredients 목록에 추가하세요.
-        - 스크립트의 조리 과정을 순서대로 steps 목록에 추가하세요.
+    [영상 제목]
+    {video_title}
 
-        [영상 제목]
-        {video_title}
+    [스크립트]
+    {transcript}
 
-        [스크립트]
-        {transcript}
+    위 스크립트에서 요리의 재료와 조리 순서를 정확하게 추출해주세요.
 
-        위 스크립트에서 요리의 재료와 조리 순서를 정확하게 추출해주세요.
+    **중요한 지시사항:**
+    1. 재료는 스크립트에서 언급된 모든 재료를 리스트로 정리해주세요.
+    2. 조리 순서는 스크립트에서 실제로 언급된 모든 조리 단계를 순서대로 번호를 매겨 정리해주세요.
+    3. 조리 순서는 **최대 {MAX_RECIPE_STEPS}단계**까지만 생성해주세요.
+    4. 각 조리 단계는 구체적이고 실용적인 내용으로 정리해주세요.
+    5. 재료의 양이나 구체적인 수치가 언급되었다면 포함해주세요.
+    """
 
-        **중요한 지시사항:**
-        1. 재료는 스크립트에서 언급된 모든 재료를 리스트로 정리해주세요.
-        2. 조리 순서는 스크립트에서 실제로 언급된 모든 조리 단계를 순서대로 번호를 매겨 정리해주세요.
-        3. 조리 순서는 **최대 15단계**까지만 생성해주세요.
-        4. 각 조리 단계는 구체적이고 실용적인 내용으로 정리해주세요.
-        5. 재료의 양이나 구체적인 수치가 언급되었다면 포함해주세요.
-        """
+    # LLM 호출
+    return structured_llm.invoke(prompt)
+
+
+# 맵-리듀스 대상이면 토큰 예산 단위 구간 목록, 아니면 전체 스크립트 하나
+def _transcript_windows(transcript: str) -> List[str]:
+    tokens = estimate_tokens(transcript)
+    if not config.VIDEO_MAP_REDUCE or tokens <= config.MAP_REDUCE_MIN_TOKENS:
+        return [transcript]
+    windows = split_by_tokens(transcript, config.MAP_WINDOW_TOKENS, config.MAP_WINDOW_OVERLAP_TOKENS)
+    logger.info(f"INFO: 스크립트 약 {tokens} 토큰 → {len(windows)}개 구간으로 맵-리듀스 추출")
+    return windows
+
+
+# 구간별 부분 레시피를 병렬로 추출(map)한 뒤 하나로 병합(reduce)
+def _map_reduce_extract(video_title: str, windows: List[str], first: Optional[Recipe] = None) -> Recipe:
+    def _extract_window(window: str):
+        try:
+            return _extract_recipe(video_title, window, partial=True)
+        except Exception as e:
+            # 한 구간이 실패해도 나머지 구간 결과로 레시피를 만듦
+            logger.warning(f"WARN: 구간 추출 실패 - 건너뜀: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(config.MAP_WORKERS, len(windows)))) as pool:
+        partials = [p for p in _map_in_context(pool, _extract_window, windows) if p is not None]
+    if first is not None:
+        partials.insert(0, first)
+    if not partials:
+        raise RuntimeError("모든 구간에서 레시피 추출에 실패했습니다.")
+    return merge_partial_recipes(partials, video_title)
+
+
+# 시각이 붙은 구간 텍스트에서 레시피와 단계별 영상 시각을 추출
+def _extract_timed_recipe(video_title: str, text: str) -> TimedRecipe:
+    llm = _gemini("extract")
+    structured_llm = llm.with_structured_output(TimedRecipe)
+
+    prompt = f"""
+    당신은 요리 레시피 전문가입니다. 주어진 유튜브 영상 제목과 스크립트 구간을 바탕으로 레시피를 추출해주세요.
+    스크립트의 각 줄 앞에는 영상 시각이 [분:초] 형식으로 붙어 있습니다. 이 구간은 영상의 일부일 수 있습니다.
+
+    - 이 구간에서 실제로 언급된 재료를 ingredients 목록에 추가하고, 양이나 수치가 언급되었다면 포함하세요.
+    - 이 구간에서 실제로 언급된 조리 단계를 순서대로 steps 목록에 추가하세요. **최대 {MAX_RECIPE_STEPS}단계**까지만 생성하세요.
+    - 각 단계가 처음 언급된 줄의 시각을 step_timestamps에 steps와 같은 순서, 같은 개수로 넣으세요. (예: "3:25")
+    - 구간에 없는 내용은 추측하지 마세요.
+
+    [영상 제목]
+    {video_title}
+
+    [스크립트 구간]
+    {text}
+    """
+    return structured_llm.invoke(prompt)
+
+
+# 저장된 세그먼트를 챕터/토큰 예산 구간으로 나눠 추출하고 병합
+# 구간 결과는 (구간 해시, 프롬프트 버전)으로 캐시되어, 재추출 시 내용이나 프롬프트가 바뀐 구간만 LLM을 호출
+def _extract_from_segments(video_id: str, video_title: str) -> Recipe:
+    store = get_store()
+    segments = store.segments(video_id)
+    if config.TRANSCRIPT_COMPRESSION:
+        segments = clean_segments(segments)
+    windows = build_windows(segments, store.chapters(video_id), config.MAP_WINDOW_TOKENS)
+    if not windows:
+        raise RuntimeError("추출할 스크립트 구간이 없습니다.")
+    logger.info(f"INFO: 세그먼트 {len(segments)}개 → 추출 구간 {len(windows)}개")
+
+    def _extract_window(window: List[dict]):
+        text = window_text(window)
+        key = window_hash(f"{video_title}\n{text}")
+        cached = store.get_extraction(video_id, key, EXTRACT_PROMPT_VERSION)
+        if cached is not None:
+            return TimedRecipe(**cached)
+        try:
+            partial = _extract_timed_recipe(video_title, text)
+        except Exception as e:
+            logger.warning(f"WARN: 구간 추출 실패 - 건너뜀: {e}")
+            return None
+        store.put_extraction(video_id, key, EXTRACT_PROMPT_VERSION, partial.model_dump())
+        return partial
+
+    with ThreadPoolExecutor(max_workers=max(1, min(config.MAP_WORKERS, len(windows)))) as pool:
+        partials = [p for p in _map_in_context(pool, _extract_window, windows) if p is not None]
+    if not partials:
+        raise RuntimeError("모든 구간에서 레시피 추출에 실패했습니다.")
+    return merge_partial_recipes(partials, video_title)
 
-        # LLM 호출
-        recipe_object = structured_llm.invoke(prompt)
+
+# 레시피 추출을 담당하는 노드
+def recipe_extract_node(state: GraphState) -> GraphState:
+    logger.info("--- 레시피 추출 노드 실행 ---")
+    progress.report("extracting")
+    transcript = state.get("transcript")
+    video_title = state.get("video_title", "요리명을 추출할 수 없습니다.")
+
+    if not transcript:
+        return {"error": "스크립트가 없습니다. (자막/음성 없음)", "error_transient": False}
+
+    try:
+        if config.TIMESTAMPED_EXTRACTION and state.get("video_id"):
+            recipe_object = _extract_from_segments(state["video_id"], video_title)
+        else:
+            windows = _transcript_windows(transcript)
+            if len(windows) > 1:
+                recipe_object = _map_reduce_extract(video_title, windows)
+            else:
+                recipe_object = _extract_recipe(video_title, transcript)
         logger.info(f"✅ LLM 구조화된 출력 결과: {recipe_object}")
 
         # 사용자에게 보여줄 최종 답변을 생성합니다.
@@ -274,8 +562,237 @@ def recipe_extract_node(state: GraphState) -> GraphState:
         
     except Exception as e:
         logger.error(f"레시피 추출 오류: {e}")
-        return {"error": f"레시피 추출 중 오류 발생: {str(e)}"}
+        return {"error": f"레시피 추출 중 오류 발생: {str(e)}", "error_transient": True}
+
+
+# 판별과 추출을 한 번의 구조화 출력 호출로 수행 (제목/스크립트 입력 토큰을 한 번만 지불)
+def _validate_and_extract(video_title: str, transcript: str) -> RecipeWithValidation:
+    llm = _gemini("validate_extract")
+    structured_llm = llm.with_structured_output(RecipeWithValidation)
+
+    prompt = f"""
+    당신은 요리 레시피 전문가입니다. 주어진 유튜브 영상 제목과 스크립트를 보고 두 가지를 한 번에 수행하세요.
+
+    1) 판별 (is_recipe)
+    - 영상이 음식을 만들거나 조리하는 방법에 대한 정보를 포함하면 true로 판단하세요.
+    - 단순히 음식을 먹기만 하는 '먹방'이나, 식당을 '리뷰' 또는 '소개'하는 영상은 false로 판단하세요.
+    - 라면을 끓이거나, 기존 제품을 섞어 먹는 등 아주 간단한 조리법이라도 포함되어 있다면 true로 판단하세요.
+    - false라면 food_name은 빈 문자열, ingredients와 steps는 빈 목록으로 두세요.
+
+    2) 추출 (is_recipe가 true인 경우)
+    - 스크립트에서 언급된 모든 재료를 ingredients 목록에 추가하고, 양이나 수치가 언급되었다면 포함하세요.
+    - 스크립트에서 실제로 언급된 조리 단계를 순서대로 steps 목록에 추가하세요. **최대 {MAX_RECIPE_STEPS}단계**까지만 생성하세요.
+    - 각 조리 단계는 구체적이고 실용적인 내용으로 정리하세요.
+
+    [영상 제목]
+    {video_title}
+
+    [스크립트]
+    {transcript}
+    """
+    return structured_llm.invoke(prompt)
+
+
+# 판별 + 추출 통합 노드 (VIDEO_EXTRACT_MODE=combined)
+def validate_and_extract_node(state: GraphState) -> GraphState:
+    logger.info("--- 레시피 판별 + 추출 통합 노드 실행 ---")
+    progress.report("extracting")
+    transcript = state.get("transcript")
+    video_title = state.get("video_title", "요리명을 추출할 수 없습니다.")
+    if not transcript:
+        return {"error": "스크립트가 없습니다. (자막/음성 없음)", "error_transient": False}
+
+    # 사전 필터가 확실히 거절하는 영상은 LLM 호출 없이 종료
+    decision, p, features = prefilter.decide(video_title, state.get("video_description", ""), transcript)
+    prefilter.record_decision(decision)
+    if decision is False and prefilter.enforced():
+        logger.info(f"INFO: 사전 필터 점수 {p:.3f} → 레시피 영상 아님")
+        return {"error": "AI가 레시피 영상이 아니라고 판단했습니다.", "error_transient": False}
 
+    try:
+        # 긴 스크립트는 첫 구간으로 판별 + 추출하고, 레시피이면 나머지 구간만 부분 추출해 병합
+        windows = _transcript_windows(transcript)
+        result = _validate_and_extract(video_title, windows[0])
+        logger.info(f"✅ 판별 + 추출 결과: {result}")
+        prefilter.record_llm_label(decision, p, features, bool(result.is_recipe))
+        if not result.is_recipe:
+            return {"error": "AI가 레시피 영상이 아니라고 판단했습니다.", "error_transient": False}
+
+        recipe_object = Recipe(food_name=result.food_name or video_title, ingredients=result.ingredients, steps=result.steps)
+        if len(windows) > 1:
+            recipe_object = _map_reduce_extract(video_title, windows[1:], first=recipe_object)
+        answer = f"✅ 유튜브 영상에서 '{recipe_object.food_name}' 레시피를 성공적으로 추출했습니다!"
+        return {"recipe": recipe_object, "final_answer": answer}
+    except Exception as e:
+        logger.error(f"레시피 판별 + 추출 오류: {e}")
+        return {"error": f"레시피 추출 중 오류 발생: {str(e)}", "error_transient": True}
+
+
+# 여러 구간에서 추출한 부분 레시피를 하나로 병합 (재료 중복 제거, 단계는 순서 유지)
+def merge_partial_recipes(partials: List[Recipe], video_title: str) -> Recipe:
+    def _key(text: str) -> str:
+        return re.sub(r"[^0-9a-z가-힣]", "", (text or "").lower())
+
+    names = [p.food_name for p in partials if p.food_name]
+    food_name = max(set(names), key=names.count) if names else video_title
+
+    # 같은 재료는 한 번만 남기되, 양이 적힌 표기를 우선
+    ingredients: Dict[str, str] = {}
+    for partial in partials:
+        for ing in partial.ingredients:
+            parsed = normalize_ingredient_string(ing)
+            key = _key(parsed["item"])
+            if not key:
+                continue
+            if key not in ingredients or (parsed["amount"] and not normalize_ingredient_string(ingredients[key])["amount"]):
+                ingredients[key] = ing
+
+    # 구간 추출 결과(TimedRecipe)면 단계별 영상 시각도 함께 유지
+    steps: List[str] = []
+    times: List[str] = []
+    seen = set()
+    for partial in partials:
+        partial_times = getattr(partial, "step_timestamps", None) or []
+        for i, step in enumerate(partial.steps):
+            key = _key(step)
+            if key and key not in seen:
+                seen.add(key)
+                steps.append(step)
+                times.append(partial_times[i] if i < len(partial_times) else "")
+
+    # 단계 수 제한을 넘으면 가장 짧은 인접 단계끼리 합쳐 내용 손실 없이 줄임 (시각은 앞 단계 기준)
+    while len(steps) > MAX_RECIPE_STEPS:
+        i = min(range(len(steps) - 1), key=lambda k: len(steps[k]) + len(steps[k + 1]))
+        steps[i:i + 2] = [f"{steps[i].rstrip('.')}. {steps[i + 1]}"]
+        times[i:i + 2] = [times[i] or times[i + 1]]
+
+    if any(times):
+        return TimedRecipe(food_name=food_name, ingredients=list(ingredients.values()), steps=steps, step_timestamps=times)
+    return Recipe(food_name=food_name, ingredients=list(ingredients.values()), steps=steps)
+
+
+# --- 스트리밍 모드 노드 ---
+# 진행 중인 전사 스트림은 직렬화할 수 없으므로 상태 밖 레지스트리에 job_id로 보관
+_ACTIVE_STREAMS: Dict[str, TranscriptStream] = {}
+_STREAMS_LOCK = threading.Lock()
+
+
+def _close_stream(job_id: str) -> None:
+    with _STREAMS_LOCK:
+        stream = _ACTIVE_STREAMS.pop(job_id, None)
+    if stream is not None:
+        stream.cancel()
+
+
+def _segments_text(segments: List[dict]) -> str:
+    return " ".join(seg["text"] for seg in segments).strip()
+
+
+def _segments_span(segments: List[dict]) -> float:
+    return segments[-1]["end"] - segments[0]["start"] if segments else 0.0
+
+
+# 전사 스트림에서 다음 묶음을 받아 state에 누적하는 노드
+def stream_transcript_node(state: GraphState) -> GraphState:
+    job_id = state["job_id"]
+    with _STREAMS_LOCK:
+        stream = _ACTIVE_STREAMS.get(job_id)
+
+    if stream is None:
+        logger.info("--- 스트리밍 스크립트 추출 노드 실행 ---")
+        progress.report("transcribing")
+        duration = state.get("video_duration") or get_youtube_duration(state["youtube_url"])
+        limit = max_video_duration(streaming=True)
+        if duration > limit:
+            logger.warning(f"WARN: {limit // 60}분 초과 영상 - 처리 중단")
+            return {"error": f"{limit // 60}분을 초과하는 영상은 처리할 수 없습니다.", "stream_done": True, "error_transient": False}
+        stream = TranscriptStream(state["youtube_url"]).start()
+        with _STREAMS_LOCK:
+            _ACTIVE_STREAMS[job_id] = stream
+
+    batch = stream.next_batch(config.STREAM_BATCH_SECONDS)
+    duration = state.get("video_duration")
+    if batch and duration:
+        progress.report("transcribing", percent=100.0 * batch[-1]["end"] / duration, transcript_source=stream.source)
+    # 체크포인트에서 재개하면 스트림을 처음부터 다시 받으므로 이미 누적된 구간은 건너뜀
+    received = state.get("transcript_segments") or []
+    if received:
+        last_end = received[-1]["end"]
+        batch = [seg for seg in batch if seg["start"] >= last_end - 0.01]
+    if stream.finished:
+        _close_stream(job_id)
+        logger.info(f"INFO: 전사 스트림 종료 (source={stream.source or '-'}, error={stream.error})")
+        return {"transcript_segments": batch, "stream_done": True}
+    return {"transcript_segments": batch}
+
+
+# 처음 N초 분량의 부분 스크립트로 레시피 영상 여부를 판별하는 노드 (아니면 남은 전사를 취소)
+def stream_validator_node(state: GraphState) -> GraphState:
+    logger.info("--- AI 레시피 판별 노드 실행 (스트리밍) ---")
+    progress.report("validating")
+    transcript = _segments_text(state.get("transcript_segments") or [])
+    try:
+        if _is_recipe_video(state.get("video_title", ""), state.get("video_description", ""), transcript):
+            return {"validated": True}
+        _close_stream(state["job_id"])
+        return {"error": "AI가 레시피 영상이 아니라고 판단했습니다.", "error_transient": False}
+    except Exception as e:
+        logger.error(f"❌ AI 판별 중 오류: {e}")
+        _close_stream(state["job_id"])
+        return {"error": f"AI 판별 중 오류 발생: {str(e)}", "error_transient": True}
+
+
+# 아직 추출하지 않은 구간(최대 STREAM_WINDOW_SECONDS)에서 부분 레시피를 추출하는 노드
+def stream_extract_node(state: GraphState) -> GraphState:
+    segments = state.get("transcript_segments") or []
+    start = state.get("extracted_upto", 0)
+    end = start
+    while end < len(segments) and _segments_span(segments[start:end + 1]) <= config.STREAM_WINDOW_SECONDS:
+        end += 1
+    end = max(end, start + 1)
+    logger.info(f"--- 부분 레시피 추출 노드 실행 (세그먼트 {start}~{end - 1}) ---")
+
+    try:
+        window_text = _segments_text(segments[start:end])
+        if config.TRANSCRIPT_COMPRESSION:
+            # 구간 길이는 STREAM_WINDOW_SECONDS로 이미 제한되므로 정리만 수행
+            window_text, _ = compress_transcript(window_text, budget_tokens=0)
+        partial = _extract_recipe(state.get("video_title", ""), window_text, partial=True)
+        return {"partial_recipes": [partial], "extracted_upto": end}
+    except Exception as e:
+        # 한 구간의 실패로 전체를 버리지 않고 다음 구간으로 진행
+        logger.error(f"부분 레시피 추출 오류: {e}")
+        return {"extracted_upto": end}
+
+
+# 부분 레시피들을 최종 레시피로 병합하는 노드
+def stream_merge_node(state: GraphState) -> GraphState:
+    logger.info("--- 부분 레시피 병합 노드 실행 ---")
+    progress.report("merging")
+    partials = state.get("partial_recipes") or []
+    transcript = _segments_text(state.get("transcript_segments") or [])
+    if not partials:
+        return {"transcript": transcript, "error": "레시피 추출 중 오류 발생: 추출된 구간이 없습니다.", "error_transient": True}
+    recipe_object = merge_partial_recipes(partials, state.get("video_title", ""))
+    answer = f"✅ 유튜브 영상에서 '{recipe_object.food_name}' 레시피를 성공적으로 추출했습니다!"
+    return {"transcript": transcript, "recipe": recipe_object, "final_answer": answer}
+
+
+# 스트리밍 루프의 다음 노드 결정: 판별 → 구간 추출 → (전사 계속) → 병합
+def route_streaming(state: GraphState) -> str:
+    if state.get("error"):
+        return END
+    segments = state.get("transcript_segments") or []
+    done = bool(state.get("stream_done"))
+    if not segments:
+        return "video_analyzer" if done else "transcriber"
+    if not state.get("validated"):
+        covered = segments[-1]["end"] - segments[0]["start"]
+        return "validator" if done or covered >= config.STREAM_VALIDATE_SECONDS else "transcriber"
+    pending = segments[state.get("extracted_upto", 0):]
+    if pending and (done or _segments_span(pending) >= config.STREAM_WINDOW_SECONDS):
+        return "extractor"
+    return "merger" if done else "transcriber"
 
 
 def should_continue(state: GraphState) -> str:
@@ -284,23 +801,180 @@ def should_continue(state: GraphState) -> str:
 
 
 # --- 그래프 구성 ---
-def create_recipe_graph():
+# 노드 실행 시간을 단계별 지표로 기록
+def _timed(stage: str, node):
+    def _run(state: GraphState) -> GraphState:
+        with metrics.stage(stage):
+            return node(state)
+    _run.__name__ = getattr(node, "__name__", stage)
+    return _run
+
+
+# --- 그래프 체크포인트 ---
+# 노드가 끝날 때마다 상태를 로컬 SQLite에 저장해, 재시작/재시도 시 마지막으로 완료된 노드 다음부터 이어서 실행
+_checkpointer: Optional[SqliteSaver] = None
+_checkpointer_lock = threading.Lock()
+
+
+def get_checkpointer() -> Optional[SqliteSaver]:
+    global _checkpointer
+    if not config.GRAPH_CHECKPOINT_PATH:
+        return None
+    with _checkpointer_lock:
+        if _checkpointer is None:
+            # 일괄 수집 워커 프로세스들이 같은 파일을 함께 쓰므로 WAL + 잠금 대기 시간으로 "database is locked" 방지
+            conn = sqlite3.connect(config.GRAPH_CHECKPOINT_PATH, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            _checkpointer = SqliteSaver(conn)
+        return _checkpointer
+
+
+def _thread_id(inputs: dict, streaming: bool) -> Optional[str]:
+    # 같은 영상의 재시도가 같은 체크포인트 스레드를 이어 쓰도록 영상 ID를 스레드 ID로 사용
+    # 스트리밍/일반 그래프는 노드 구성이 달라 스레드를 분리
+    try:
+        video_id = local_media_id(inputs["media_path"]) if inputs.get("media_path") else _extract_video_id(inputs["youtube_url"])
+    except (ValueError, OSError):
+        return None
+    return f"{video_id}:{'stream' if streaming else 'batch'}"
+
+
+_thread_leases: Optional[ThreadLeases] = None
+
+
+def get_thread_leases() -> ThreadLeases:
+    global _thread_leases
+    with _checkpointer_lock:
+        if _thread_leases is None:
+            _thread_leases = ThreadLeases(config.GRAPH_CHECKPOINT_PATH)
+        return _thread_leases
+
+
+def _lease_heartbeat(thread_id: str, owner: str, done: threading.Event) -> None:
+    interval = max(1.0, config.GRAPH_THREAD_LEASE_SECONDS / 3)
+    while not done.wait(interval):
+        if not get_thread_leases().renew(thread_id, owner, config.GRAPH_THREAD_LEASE_SECONDS):
+            logger.warning(f"WARN: 그래프 스레드 임대를 잃었습니다. (thread_id={thread_id})")
+            return
+
+
+# 최종 판정(레시피 아님/길이 초과)에 영향을 주는 설정의 버전. 하나라도 바뀌면 저장된 판정을 쓰지 않음
+def _verdict_version(streaming: bool) -> str:
+    parts = [
+        VALIDATE_PROMPT_VERSION,
+        config.VIDEO_EXTRACT_MODE,
+        str(max_video_duration(streaming)),
+        prefilter.MODE,
+        json.dumps(prefilter.WEIGHTS),
+        str(config.PREFILTER_ACCEPT),
+        str(config.PREFILTER_REJECT),
+    ]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+def _verdict_reusable(snapshot, verdict_version: str) -> bool:
+    if snapshot.values.get("verdict_version") != verdict_version:
+        return False
+    try:
+        decided_at = datetime.fromisoformat(snapshot.created_at).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return time.time() - decided_at <= config.GRAPH_VERDICT_TTL_SECONDS
+
+
+def _resume_plan(app, thread_id: str, verdict_version: str) -> Tuple[Optional[dict], Optional[dict]]:
+    """
+    (이어서 실행할 체크포인트 설정, 그대로 돌려줄 최종 상태)를 반환합니다. 둘 다 None이면 처음부터 실행합니다.
+    호출 전에 스레드 임대를 잡아야 합니다 (실행 중인 스레드를 다른 실행이 이어 쓰지 않도록).
+    - 실행 도중 중단된 스레드(임대 만료): 마지막 체크포인트에서 재개
+    - 일시적 오류로 끝난 스레드: 오류가 나기 전 마지막 체크포인트(전사 등 완료된 단계 포함)에서 실패한 노드부터 다시 실행
+    - 최종 판정(레시피 아님, 길이 초과 등)으로 끝난 스레드: 다시 판별/전사하지 않고 저장된 상태를 그대로 반환
+      (판정 설정 버전이 다르거나 GRAPH_VERDICT_TTL_SECONDS가 지났으면 스레드를 지우고 처음부터 실행)
+    - 성공적으로 끝난 스레드: 누적형 상태(세그먼트/부분 레시피)가 섞이지 않도록 스레드를 지우고 처음부터 실행
+      (전사/구간 추출 결과는 세그먼트 저장소에 캐시되어 있으므로 다시 비용이 들지 않음)
+    """
+    thread_config = {"configurable": {"thread_id": thread_id}}
+    snapshot = app.get_state(thread_config)
+    if not snapshot.values:
+        return None, None
+    if snapshot.next:
+        return snapshot.config, None
+    if snapshot.values.get("error"):
+        # error_transient가 없는 이전 체크포인트는 일시적 오류로 간주
+        if snapshot.values.get("error_transient", True) is False:
+            if _verdict_reusable(snapshot, verdict_version):
+                return None, snapshot.values
+            logger.info(f"INFO: 저장된 최종 판정이 만료되었거나 판정 설정이 바뀌어 다시 실행합니다. (thread_id={thread_id})")
+            get_checkpointer().delete_thread(thread_id)
+            return None, None
+        for past in app.get_state_history(thread_config):  # 최신 체크포인트부터
+            if past.next and not past.values.get("error"):
+                return past.config, None
+    get_checkpointer().delete_thread(thread_id)
+    return None, None
+
+
+def create_streaming_recipe_graph():
+    workflow = StateGraph(GraphState)
+    workflow.add_node("title_extractor", _timed("metadata", title_node))
+    workflow.add_node("transcriber", _timed("transcript", stream_transcript_node))
+    workflow.add_node("validator", _timed("validate", stream_validator_node))
+    workflow.add_node("extractor", _timed("extract", stream_extract_node))
+    workflow.add_node("merger", _timed("merge", stream_merge_node))
+    workflow.add_node("video_analyzer", _timed("video_analysis", video_analyzer_node))
+    workflow.add_node("description_extractor", _timed("description", description_node))
+
+    workflow.set_entry_point("title_extractor")
+    workflow.add_edge("title_extractor", "description_extractor")
+    workflow.add_conditional_edges("description_extractor", route_after_description, {
+        "transcriber": "transcriber",
+        END: END,
+    })
+
+    # 전사/판별/구간 추출이 끝날 때마다 같은 규칙으로 다음 단계를 결정 (루프)
+    routes = {name: name for name in ["transcriber", "validator", "extractor", "merger", "video_analyzer"]}
+    routes[END] = END
+    for node in ["transcriber", "validator", "extractor"]:
+        workflow.add_conditional_edges(node, route_streaming, routes)
+
+    workflow.add_edge("merger", END)
+    workflow.add_edge("video_analyzer", END)
+    return workflow.compile(checkpointer=get_checkpointer())
+
+
+def create_recipe_graph(streaming: Optional[bool] = None):
+    if config.VIDEO_STREAMING_MODE if streaming is None else streaming:
+        return create_streaming_recipe_graph()
+
+    # combined 모드는 판별과 추출을 하나의 LLM 호출로 처리 (validator 노드를 거치지 않음)
+    combined = config.VIDEO_EXTRACT_MODE == "combined"
+
     workflow = StateGraph(GraphState)
-    workflow.add_node("title_extractor", title_node)
-    workflow.add_node("transcriber", transcript_node)
-    workflow.add_node("validator", recipe_validator_node)  # 판별 노드 추가
-    workflow.add_node("video_analyzer", video_analyzer_node)  # 비디오 직접 분석 노드 추가
-    workflow.add_node("extractor", recipe_extract_node)
+    workflow.add_node("title_extractor", _timed("metadata", title_node))
+    workflow.add_node("transcriber", _timed("transcript", transcript_node))
+    workflow.add_node("validator", _timed("validate", recipe_validator_node))  # 판별 노드 추가
+    workflow.add_node("video_analyzer", _timed("video_analysis", video_analyzer_node))  # 비디오 직접 분석 노드 추가
+    workflow.add_node("extractor", _timed("extract", validate_and_extract_node if combined else recipe_extract_node))
+    workflow.add_node("description_extractor", _timed("description", description_node))  # 설명란 우선 추출 노드
     
     workflow.set_entry_point("title_extractor")
-    workflow.add_edge("title_extractor", "transcriber")
+    workflow.add_edge("title_extractor", "description_extractor")
+
+    # 설명란에서 레시피를 확보하면 전사/판별/비디오 분석을 모두 건너뜀
+    workflow.add_conditional_edges("description_extractor", route_after_description, {
+        "transcriber": "transcriber",
+        END: END,
+    })
 
     # transcriber 결과에 따라: 스크립트가 있으면 validator로, 없으면 비디오 직접 분석으로
     def route_after_transcriber(state: GraphState) -> str:
-        return "validator" if state.get("transcript") and not state.get("error") else "video_analyzer"
+        if not state.get("transcript") or state.get("error"):
+            return "video_analyzer"
+        return "extractor" if combined else "validator"
 
     workflow.add_conditional_edges("transcriber", route_after_transcriber, {
         "validator": "validator",
+        "extractor": "extractor",
         "video_analyzer": "video_analyzer",
     })
 
@@ -322,42 +996,100 @@ def create_recipe_graph():
     })
     workflow.add_edge("extractor", END)
     
-    return workflow.compile()
+    return workflow.compile(checkpointer=get_checkpointer())
 
 
 # FastAPI 서비스용 함수
 def process_video_url(youtube_url: str) -> dict:
     """FastAPI에서 호출할 메인 함수"""
+    return _run_recipe_graph({"youtube_url": youtube_url})
+
+
+def process_media_file(media_path: str) -> dict:
+    """로컬 미디어 파일에서 레시피 추출 (일괄 수집용, 항상 비스트리밍 그래프 사용)"""
+    return _run_recipe_graph({"youtube_url": "", "media_path": media_path}, streaming=False)
+
+
+def _run_recipe_graph(inputs: dict, streaming: Optional[bool] = None) -> dict:
+    # 작업 단위 지표(단계별 소요 시간, 오디오/스크립트/토큰 지표)를 모아 응답 metadata로 반환
+    with metrics.job_scope() as job:
+        response = _invoke_recipe_graph(inputs, streaming)
+    response["metadata"] = metrics.snapshot(job)
+    logger.info(f"INFO: 작업 지표: {response['metadata']}")
+    return response
+
+
+def _invoke_recipe_graph(inputs: dict, streaming: Optional[bool] = None) -> dict:
     try:
+        streaming = config.VIDEO_STREAMING_MODE if streaming is None else streaming
         # 그래프 객체 생성
-        app = create_recipe_graph()
+        app = create_recipe_graph(streaming)
+
+        # 체크포인트 스레드 ID를 작업 ID로도 사용 (재개 시 스트리밍 레지스트리 키가 상태의 job_id와 일치하도록)
+        thread_id = _thread_id(inputs, streaming) if get_checkpointer() else None
+        # 같은 스레드를 다른 프로세스가 실행 중이면 건드리지 않고, 체크포인트 재개 없이 별도 작업 ID로 실행
+        lease_owner = uuid.uuid4().hex
+        if thread_id and not get_thread_leases().acquire(thread_id, lease_owner, config.GRAPH_THREAD_LEASE_SECONDS):
+            logger.info(f"INFO: 다른 실행이 사용 중인 체크포인트 스레드입니다. 별도로 실행합니다. (thread_id={thread_id})")
+            thread_id = None
+        job_id = thread_id or uuid.uuid4().hex
+        # 스트리밍 모드는 전사 묶음마다 루프를 돌기 때문에 재귀 한도를 넉넉히 설정
+        run_config = {"recursion_limit": 500, "configurable": {"thread_id": job_id}}
+
+        lease_done = threading.Event()
+        if thread_id:
+            threading.Thread(target=_lease_heartbeat, args=(thread_id, lease_owner, lease_done), daemon=True).start()
+        try:
+            verdict_version = _verdict_version(streaming)
+            resume_from, final_state = _resume_plan(app, thread_id, verdict_version) if thread_id else (None, None)
+            if final_state is not None:
+                logger.info(f"INFO: 이전 실행의 최종 판정을 사용합니다. (thread_id={thread_id}, 오류={final_state.get('error')})")
+                result = final_state
+            elif resume_from is not None:
+                logger.info(f"INFO: 체크포인트에서 이어서 실행합니다. (thread_id={thread_id}, 다음 노드={app.get_state(resume_from).next})")
+                result = app.invoke(None, {**resume_from, "recursion_limit": 500})
+            else:
+                result = app.invoke({**inputs, "job_id": job_id, "verdict_version": verdict_version}, run_config)
+        finally:
+            _close_stream(job_id)
+            lease_done.set()
+            if thread_id:
+                get_thread_leases().release(thread_id, lease_owner)
+            elif get_checkpointer():
+                # 재개하지 않을 일회성 스레드의 체크포인트는 남기지 않음
+                get_checkpointer().delete_thread(job_id)
         
-        # 그래프 실행
-        result = app.invoke({"youtube_url": youtube_url})
-        
-        # 결과 처리
+        # 결과 처리 (status: ok | no_recipe(레시피 아님 등 최종 판정) | failed(재시도할 만한 일시적 오류))
         if "error" in result:
             return {
                 "answer": f"영상 처리 중 오류가 발생했습니다: {result['error']}",
                 "food_name": (result.get("recipe").food_name if result.get("recipe") else result.get("video_title", "")),
                 "ingredients": [],
-                "recipe": []
+                "recipe": [],
+                "status": "failed" if result.get("error_transient") else "no_recipe",
             }
         
         if "recipe" in result:
             recipe = result["recipe"]
-            return {
+            response = {
                 "answer": f"✅ {recipe.food_name} 레시피를 성공적으로 추출했습니다!",
                 "food_name": recipe.food_name,
                 "ingredients": recipe.ingredients,
-                "recipe": recipe.steps
+                "recipe": recipe.steps,
+                "status": "ok",
             }
+            # 단계별 영상 시각(초). 시각을 알 수 없는 단계는 None
+            timestamps = getattr(recipe, "step_timestamps", None)
+            if timestamps:
+                response["step_timestamps"] = [parse_timestamp(t) if t else None for t in timestamps]
+            return response
         
         return {
             "answer": "레시피를 추출할 수 없습니다.",
             "food_name": result.get("video_title", ""),
             "ingredients": [],
-            "recipe": []
+            "recipe": [],
+            "status": "no_recipe",
         }
         
     except Exception as e:
@@ -365,7 +1097,8 @@ def process_video_url(youtube_url: str) -> dict:
         return {
             "answer": f"영상 처리 중 오류가 발생했습니다: {str(e)}",
             "ingredients": [],
-            "recipe": []
+            "recipe": [],
+            "status": "failed",
         } 
     
 
@@ -0,0 +1,168 @@
+# 영상 처리 작업 큐 (공유 저장소의 SQLite 파일)
+# /process는 작업을 넣고 결과를 기다리며, 여러 노드의 워커(worker.py)가 작업을 가져가 처리합니다.
+# 워커는 임대(lease) 시간 안에 하트비트를 보내야 하며, 임대가 끝난 작업은 다른 워커가 가져가도록 다시 대기열로 돌아갑니다.
+import json
+import socket
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    dedupe_key TEXT,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,          -- queued | running | done | failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    worker_id TEXT,
+    lease_until REAL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_by_dedupe ON jobs (dedupe_key, status);
+"""
+
+_COLUMNS = "id, dedupe_key, payload, status, attempts, max_attempts, worker_id, lease_until, result, error, created_at, updated_at"
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{uuid.uuid4().hex[:6]}"
+
+
+class JobQueue:
+    def __init__(self, path: str, max_attempts: int = 3) -> None:
+        self.path = path
+        self.max_attempts = max_attempts
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # 여러 프로세스/노드가 같은 파일을 쓰므로 호출마다 연결을 열고 잠금 대기 시간을 넉넉히 둠
+        # (네트워크 파일 시스템에서는 WAL을 쓸 수 없으므로 기본 롤백 저널 사용)
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _row_to_job(row) -> Dict:
+        job = dict(zip([c.strip() for c in _COLUMNS.split(",")], row))
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def enqueue(self, payload: Dict, dedupe_key: Optional[str] = None) -> str:
+        """작업을 넣고 ID를 반환. 같은 dedupe_key의 작업이 대기/처리 중이면 그 작업 ID를 반환"""
+        now = time.time()
+        with self._transaction() as conn:
+            if dedupe_key:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE dedupe_key = ? AND status IN ('queued', 'running') ORDER BY created_at LIMIT 1",
+                    (dedupe_key,),
+                ).fetchone()
+                if row:
+                    return row[0]
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO jobs (id, dedupe_key, payload, status, attempts, max_attempts, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', 0, ?, ?, ?)",
+                (job_id, dedupe_key, json.dumps(payload, ensure_ascii=False), self.max_attempts, now, now),
+            )
+        return job_id
+
+    def _requeue_expired(self, conn, now: float) -> int:
+        # 임대가 끝난 작업: 시도 횟수가 남았으면 대기열로, 아니면 실패 처리
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', error = '임대 만료 (최대 시도 횟수 초과)', worker_id = NULL, updated_at = ? "
+            "WHERE status = 'running' AND lease_until < ? AND attempts >= max_attempts",
+            (now, now),
+        )
+        return conn.execute(
+            "UPDATE jobs SET status = 'queued', worker_id = NULL, lease_until = NULL, updated_at = ? "
+            "WHERE status = 'running' AND lease_until < ?",
+            (now, now),
+        ).rowcount
+
+    def requeue_expired(self) -> int:
+        with self._transaction() as conn:
+            return self._requeue_expired(conn, time.time())
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Dict]:
+        """가장 오래된 대기 작업을 임대. 없으면 None"""
+        now = time.time()
+        with self._transaction() as conn:
+            self._requeue_expired(conn, now)
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker_id = ?, lease_until = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE id = ?",
+                (worker_id, now + lease_seconds, now, row[0]),
+            )
+            job = conn.execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (row[0],)).fetchone()
+        return self._row_to_job(job)
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """임대를 연장. 이미 다른 워커에게 넘어갔으면 False"""
+        now = time.time()
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (now + lease_seconds, now, job_id, worker_id),
+            ).rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result: Dict) -> bool:
+        now = time.time()
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (json.dumps(result, ensure_ascii=False), now, job_id, worker_id),
+            ).rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        """실패 기록. 시도 횟수가 남았으면 다시 대기열로"""
+        now = time.time()
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END, "
+                "error = ?, worker_id = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (error, now, job_id, worker_id),
+            ).rowcount == 1
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def stats(self) -> Dict:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+            oldest = conn.execute("SELECT MIN(created_at) FROM jobs WHERE status = 'queued'").fetchone()[0]
+        stats = {status: count for status, count in rows}
+        stats["oldest_queued_seconds"] = round(time.time() - oldest, 1) if oldest else 0.0
+        return stats
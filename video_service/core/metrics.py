@@ -0,0 +1,179 @@
+# 파이프라인 단계별 지표 (지연 시간 히스토그램, 다운로드 바이트, 오디오 길이, Whisper RTF, 스크립트 문자 수, LLM 토큰)
+# 프로세스 전체 누적 지표는 /metrics로, 작업 하나의 단계별 소요 시간은 응답 metadata로 내보냅니다.
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+# 지연 시간(초) 히스토그램 구간
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600]
+# 비율/크기 지표용 구간
+RTF_BUCKETS = [0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2]
+SIZE_BUCKETS = [1e3, 1e4, 1e5, 1e6, 5e6, 1e7, 5e7, 1e8]
+
+
+class Histogram:
+    def __init__(self, buckets: List[float]) -> None:
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막은 +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """구간 상한으로 근사한 분위수"""
+        if not self.count:
+            return None
+        target = q * self.count
+        running = 0
+        for i, c in enumerate(self.counts):
+            running += c
+            if running >= target:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+
+_lock = threading.Lock()
+_histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+_counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+
+# 현재 작업의 단계별 소요 시간/지표 (작업을 실행하는 스레드에서 설정)
+_current_job: contextvars.ContextVar[Optional[Dict]] = contextvars.ContextVar("current_job_metrics", default=None)
+
+
+def _key(name: str, labels: Optional[Dict[str, str]]) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+    return name, tuple(sorted((labels or {}).items()))
+
+
+def observe(name: str, value: float, labels: Optional[Dict[str, str]] = None,
+            buckets: List[float] = LATENCY_BUCKETS) -> None:
+    with _lock:
+        hist = _histograms.get(_key(name, labels))
+        if hist is None:
+            hist = _histograms[_key(name, labels)] = Histogram(buckets)
+        hist.observe(value)
+
+
+def inc(name: str, value: float = 1.0, labels: Optional[Dict[str, str]] = None) -> None:
+    with _lock:
+        key = _key(name, labels)
+        _counters[key] = _counters.get(key, 0.0) + value
+    job = _current_job.get()
+    if job is not None:
+        with job["lock"]:
+            job["counters"][name] = job["counters"].get(name, 0.0) + value
+
+
+def record(name: str, value: float) -> None:
+    """작업 하나의 단일 값 지표 (오디오 길이, RTF 등)를 작업 metadata에 기록"""
+    job = _current_job.get()
+    if job is not None:
+        with job["lock"]:
+            job["values"][name] = round(value, 4)
+
+
+@contextmanager
+def stage(name: str):
+    """단계 소요 시간을 stage_seconds 히스토그램과 현재 작업의 단계별 소요 시간에 기록"""
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        observe("stage_seconds", elapsed, {"stage": name, "status": status})
+        job = _current_job.get()
+        if job is not None:
+            with job["lock"]:
+                job["timings"][name] = round(job["timings"].get(name, 0.0) + elapsed, 3)
+
+
+@contextmanager
+def job_scope():
+    """작업 하나의 지표 수집 범위. yield한 dict는 끝난 뒤 snapshot()으로 응답 metadata에 넣음"""
+    job = {"lock": threading.Lock(), "timings": {}, "counters": {}, "values": {}, "started": time.perf_counter()}
+    token = _current_job.set(job)
+    try:
+        yield job
+    finally:
+        _current_job.reset(token)
+        job["total_seconds"] = round(time.perf_counter() - job["started"], 3)
+        observe("job_seconds", job["total_seconds"])
+
+
+def snapshot(job: Dict) -> Dict:
+    with job["lock"]:
+        return {
+            "total_seconds": job.get("total_seconds", round(time.perf_counter() - job["started"], 3)),
+            "timings": dict(job["timings"]),
+            "counters": dict(job["counters"]),
+            **dict(job["values"]),
+        }
+
+
+# --- LLM 토큰 집계 ---
+class TokenUsageCallback(BaseCallbackHandler):
+    """LLM 호출이 끝날 때 usage_metadata의 입력/출력 토큰을 llm_tokens 카운터에 더함"""
+
+    def __init__(self, purpose: str) -> None:
+        self.purpose = purpose
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        for generations in response.generations:
+            for gen in generations:
+                usage = getattr(getattr(gen, "message", None), "usage_metadata", None) or {}
+                if usage:
+                    inc("llm_input_tokens", usage.get("input_tokens", 0), {"purpose": self.purpose})
+                    inc("llm_output_tokens", usage.get("output_tokens", 0), {"purpose": self.purpose})
+        inc("llm_calls", 1, {"purpose": self.purpose})
+
+
+# --- 내보내기 ---
+def _labels_text(labels: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}" if items else ""
+
+
+def render_prometheus() -> str:
+    """Prometheus 텍스트 형식"""
+    lines: List[str] = []
+    with _lock:
+        for (name, labels), value in sorted(_counters.items()):
+            lines.append(f"video_{name}_total{_labels_text(labels)} {value}")
+        for (name, labels), hist in sorted(_histograms.items()):
+            running = 0
+            for bound, count in zip(hist.buckets + [float("inf")], hist.counts):
+                running += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"video_{name}_bucket{_labels_text(labels, ('le', le))} {running}")
+            lines.append(f"video_{name}_sum{_labels_text(labels)} {hist.sum}")
+            lines.append(f"video_{name}_count{_labels_text(labels)} {hist.count}")
+    return "\n".join(lines) + "\n"
+
+
+def summary() -> Dict:
+    """사람이 읽기 쉬운 요약 (히스토그램별 건수/평균/p50/p95)"""
+    with _lock:
+        hists = {
+            name + _labels_text(labels): {
+                "count": h.count,
+                "mean": round(h.sum / h.count, 4) if h.count else None,
+                "p50": h.quantile(0.5),
+                "p95": h.quantile(0.95),
+            }
+            for (name, labels), h in sorted(_histograms.items())
+        }
+        counters = {name + _labels_text(labels): v for (name, labels), v in sorted(_counters.items())}
+    return {"histograms": hists, "counters": counters}
@@ -0,0 +1,211 @@
+# 레시피 영상 판별 로컬 사전 필터 (CPU 전용, LLM 호출 없음)
+# 제목/설명/스크립트 앞부분을 어휘 사전 기반 특징 + 작은 선형 모델(로지스틱 회귀)로 점수화하여
+# 확실한 경우는 바로 통과/거절하고, 애매한 경우만 LLM 판별로 넘깁니다.
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from video_service import config
+except ModuleNotFoundError:
+    import config
+
+
+COOKING_VERBS = [
+    "넣", "볶", "끓", "굽", "구워", "썰", "다지", "섞", "버무", "삶", "데치", "튀기", "찌", "졸이",
+    "부치", "재워", "절이", "익히", "불려", "간을", "손질", "예열", "반죽", "양념",
+    "add", "stir", "boil", "fry", "bake", "chop", "mix", "simmer", "grill", "roast", "season",
+]
+INGREDIENT_WORDS = [
+    "소금", "설탕", "간장", "된장", "고추장", "고춧가루", "참기름", "들기름", "식용유", "올리브유", "버터",
+    "마늘", "양파", "대파", "쪽파", "생강", "후추", "계란", "달걀", "두부", "김치", "돼지고기", "소고기",
+    "닭", "새우", "밀가루", "전분", "우유", "치즈", "식초", "물엿", "올리고당", "멸치", "다시마",
+    "salt", "sugar", "garlic", "onion", "butter", "flour", "egg", "oil", "pepper",
+]
+QUANTITY = re.compile(
+    r"\d+([./]\d+)?\s*(g|kg|ml|l|cc|컵|큰술|작은술|스푼|숟가락|개|마리|쪽|톨|꼬집|줌|tbsp|tsp|cup)\b|한\s*(큰술|스푼|꼬집|줌)|반\s*(큰술|컵|개)",
+    re.IGNORECASE,
+)
+RECIPE_TITLE_WORDS = ["레시피", "만들기", "만드는", "황금", "초간단", "집밥", "요리", "recipe", "how to make", "cook"]
+# 레시피 영상에도 흔히 붙는 장르 단어(ASMR, 브이로그 등)는 넣지 않음 ("ASMR 김치찌개 만들기")
+NEGATIVE_WORDS = ["먹방", "리뷰", "맛집", "후기", "방문", "mukbang", "review", "언박싱", "탐방", "웨이팅"]
+
+FEATURE_NAMES = [
+    "bias", "verb_density", "ingredient_density", "quantity_hits", "title_recipe_word",
+    "title_negative", "body_negative", "description_quantity_hits",
+]
+
+# 기본 가중치 (수작업 초기값). PREFILTER_WEIGHTS_PATH에 학습된 가중치가 있으면 그것을 사용
+DEFAULT_WEIGHTS = [-1.2, 6.0, 5.0, 1.5, 1.4, -2.5, -1.8, 1.2]
+
+
+def _count_hits(text: str, words: List[str]) -> int:
+    lower = text.lower()
+    return sum(lower.count(w) for w in words)
+
+
+def extract_features(title: str, description: str, transcript: str) -> List[float]:
+    title = title or ""
+    description = (description or "")[:2000]
+    body = (transcript or "")[:config.PREFILTER_TRANSCRIPT_CHARS]
+    tokens = max(1, len(re.findall(r"\S+", body)))
+    return [
+        1.0,
+        min(1.0, _count_hits(body, COOKING_VERBS) / tokens),
+        min(1.0, _count_hits(body, INGREDIENT_WORDS) / tokens),
+        min(1.0, len(QUANTITY.findall(body)) / 5),
+        1.0 if _count_hits(title, RECIPE_TITLE_WORDS) else 0.0,
+        1.0 if _count_hits(title, NEGATIVE_WORDS) else 0.0,
+        min(1.0, _count_hits(body + " " + description[:300], NEGATIVE_WORDS) / 3),
+        min(1.0, len(QUANTITY.findall(description)) / 5),
+    ]
+
+
+def _sigmoid(z: float) -> float:
+    return 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, z))))
+
+
+def _load_weights() -> Tuple[List[float], bool]:
+    """(가중치, 학습된 가중치 여부)"""
+    path = config.PREFILTER_WEIGHTS_PATH
+    if path and os.path.exists(path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                weights = json.load(f)["weights"]
+            if len(weights) == len(FEATURE_NAMES):
+                return [float(w) for w in weights], True
+        except (OSError, ValueError, KeyError) as e:
+            print(f"WARN: 사전 필터 가중치 로드 실패 ({e}). 기본 가중치를 사용합니다.")
+    return list(DEFAULT_WEIGHTS), False
+
+
+WEIGHTS, TRAINED = _load_weights()
+
+
+def _resolve_mode() -> str:
+    mode = config.PREFILTER_MODE
+    if mode == "auto":
+        # 수작업 가중치로는 LLM 판정을 뒤집지 않음: 학습된 가중치가 있을 때만 결정에 사용
+        return "enforce" if TRAINED else "shadow"
+    if mode not in ("enforce", "shadow"):
+        print(f"WARN: 알 수 없는 PREFILTER_MODE '{mode}' - shadow로 동작합니다.")
+        return "shadow"
+    return mode
+
+
+MODE = _resolve_mode()
+
+
+def enforced() -> bool:
+    """사전 필터의 통과/거절 결정을 실제로 따르는지 (shadow면 항상 LLM 판별을 쓰고 일치율만 기록)"""
+    return MODE == "enforce"
+
+
+def score(title: str, description: str, transcript: str) -> Tuple[float, List[float]]:
+    """레시피 영상일 확률(0~1)과 특징 벡터"""
+    features = extract_features(title, description, transcript)
+    z = sum(w * x for w, x in zip(WEIGHTS, features))
+    return _sigmoid(z), features
+
+
+def decide(title: str, description: str, transcript: str) -> Tuple[Optional[bool], float, List[float]]:
+    """확실하면 True/False, 애매하면 None (LLM 판별 필요)"""
+    p, features = score(title, description, transcript)
+    if p >= config.PREFILTER_ACCEPT:
+        return True, p, features
+    if p <= config.PREFILTER_REJECT:
+        return False, p, features
+    return None, p, features
+
+
+# --- 통계 및 학습 데이터 기록 ---
+_stats = {"accepted": 0, "rejected": 0, "ambiguous": 0, "llm_calls": 0, "shadow_calls": 0, "agree": 0, "compared": 0}
+_stats_lock = threading.Lock()
+
+
+def should_shadow() -> bool:
+    """사전 필터가 결정한 경우에도 일정 비율은 LLM을 함께 호출해 일치율을 측정"""
+    return random.random() < config.PREFILTER_SHADOW_RATE
+
+
+def record_decision(decision: Optional[bool]) -> None:
+    with _stats_lock:
+        key = "ambiguous" if decision is None else ("accepted" if decision else "rejected")
+        _stats[key] += 1
+
+
+def record_llm_label(decision: Optional[bool], p: float, features: List[float], llm_label: bool) -> None:
+    with _stats_lock:
+        _stats["llm_calls"] += 1
+        if decision is not None:
+            _stats["shadow_calls"] += 1
+        # 결정한 경우는 그 결정, 애매한 경우는 0.5 기준 기울기로 일치 여부를 셈
+        lean = decision if decision is not None else p >= 0.5
+        _stats["compared"] += 1
+        _stats["agree"] += int(lean == llm_label)
+
+    if config.PREFILTER_LOG_PATH:
+        try:
+            with _stats_lock, open(config.PREFILTER_LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"features": features, "label": int(llm_label), "p": round(p, 4)}) + "\n")
+        except OSError as e:
+            print(f"WARN: 사전 필터 학습 데이터 기록 실패: {e}")
+
+
+def get_stats() -> Dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    decided = stats["accepted"] + stats["rejected"]
+    total = decided + stats["ambiguous"]
+    stats["total"] = total
+    stats["mode"] = MODE
+    stats["trained_weights"] = TRAINED
+    # 결정한 건 중 섀도 호출을 제외한 나머지가 절약된 LLM 호출 (shadow 모드는 항상 LLM을 호출)
+    stats["saved_calls"] = decided - stats["shadow_calls"] if enforced() else 0
+    stats["saved_ratio"] = round(stats["saved_calls"] / total, 4) if total else 0.0
+    stats["agreement_rate"] = round(stats["agree"] / stats["compared"], 4) if stats["compared"] else None
+    return stats
+
+
+# --- 학습 ---
+def train(samples: List[Tuple[List[float], int]], epochs: int = 500, lr: float = 0.5, l2: float = 1e-3) -> List[float]:
+    """기록된 (특징, LLM 라벨)로 로지스틱 회귀 가중치를 경사하강법으로 학습"""
+    weights = list(DEFAULT_WEIGHTS)
+    n = len(samples)
+    for _ in range(epochs):
+        grad = [0.0] * len(weights)
+        for x, y in samples:
+            err = _sigmoid(sum(w * xi for w, xi in zip(weights, x))) - y
+            for i, xi in enumerate(x):
+                grad[i] += err * xi
+        weights = [w - lr * (g / n + l2 * w) for w, g in zip(weights, grad)]
+    return weights
+
+
+def train_from_log(log_path: str, out_path: str) -> Dict:
+    samples = []
+    with open(log_path, encoding="utf-8") as f:
+        for line in f:
+            rec = json.loads(line)
+            if len(rec.get("features", [])) == len(FEATURE_NAMES):
+                samples.append((rec["features"], int(rec["label"])))
+    if not samples:
+        raise ValueError("학습 데이터가 없습니다.")
+    weights = train(samples)
+    correct = sum(int((_sigmoid(sum(w * x for w, x in zip(weights, xs))) >= 0.5) == bool(y)) for xs, y in samples)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"features": FEATURE_NAMES, "weights": weights}, f, ensure_ascii=False, indent=2)
+    return {"samples": len(samples), "train_accuracy": round(correct / len(samples), 4)}
+
+
+if __name__ == "__main__":
+    # 사용법: python -m core.prefilter <학습 로그 jsonl> <가중치 출력 json>
+    if len(sys.argv) != 3:
+        print("사용법: python -m core.prefilter <학습 로그 jsonl> <가중치 출력 json>")
+        sys.exit(1)
+    print(train_from_log(sys.argv[1], sys.argv[2]))
@@ -0,0 +1,95 @@
+# 영상별 처리 진행 상황 기록 (단계, 전사 진행률, 대기 중인 요청 수)
+# 같은 영상을 기다리는 모든 요청이 같은 기록을 조회합니다.
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# 진행 상황을 보고할 영상 ID (작업을 실행하는 스레드에서 설정)
+_current_video: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_video", default=None)
+
+# 끝난 작업의 기록을 보관하는 시간(초)
+FINISHED_TTL_SECONDS = 600
+
+_records: Dict[str, Dict] = {}
+_lock = threading.Lock()
+
+
+def _cleanup(now: float) -> None:
+    expired = [
+        vid for vid, rec in _records.items()
+        if rec["status"] != "running" and now - rec["updated_at"] > FINISHED_TTL_SECONDS
+    ]
+    for vid in expired:
+        del _records[vid]
+
+
+def start(video_id: str) -> None:
+    now = time.time()
+    with _lock:
+        _cleanup(now)
+        _records[video_id] = {
+            "video_id": video_id,
+            "status": "running",
+            "stage": "queued",
+            "percent": 0.0,
+            "waiters": _records.get(video_id, {}).get("waiters", 0),
+            "started_at": now,
+            "updated_at": now,
+        }
+
+
+def finish(video_id: str, status: str, error: Optional[str] = None) -> None:
+    with _lock:
+        rec = _records.get(video_id)
+        if rec is None:
+            return
+        rec.update(status=status, stage=status, updated_at=time.time())
+        if status == "done":
+            rec["percent"] = 100.0
+        if error:
+            rec["error"] = error
+
+
+def add_waiter(video_id: str, delta: int) -> None:
+    with _lock:
+        rec = _records.setdefault(video_id, {
+            "video_id": video_id, "status": "running", "stage": "queued", "percent": 0.0,
+            "waiters": 0, "started_at": time.time(), "updated_at": time.time(),
+        })
+        rec["waiters"] = max(0, rec["waiters"] + delta)
+
+
+def get(video_id: str) -> Optional[Dict]:
+    with _lock:
+        rec = _records.get(video_id)
+        return dict(rec) if rec else None
+
+
+@contextmanager
+def bind(video_id: str):
+    """이 블록에서 호출되는 report()가 video_id의 기록을 갱신하도록 설정"""
+    token = _current_video.set(video_id)
+    try:
+        yield
+    finally:
+        _current_video.reset(token)
+
+
+def report(stage: Optional[str] = None, percent: Optional[float] = None, **extra) -> None:
+    """현재 작업의 단계/진행률을 갱신 (바인딩된 작업이 없으면 아무것도 하지 않음)"""
+    video_id = _current_video.get()
+    if video_id is None:
+        return
+    with _lock:
+        rec = _records.get(video_id)
+        if rec is None:
+            return
+        if stage is not None and stage != rec["stage"]:
+            rec["stage"] = stage
+            rec["percent"] = 0.0
+        if percent is not None:
+            rec["percent"] = round(max(0.0, min(100.0, percent)), 1)
+        rec.update(extra)
+        rec["updated_at"] = time.time()
@@ -0,0 +1,83 @@
+# 추출된 레시피 로컬 저장소 (SQLite) - 일괄 수집 결과 보관용
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipes (
+    item TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    food_name TEXT,
+    ingredients TEXT,
+    steps TEXT,
+    step_timestamps TEXT,
+    answer TEXT,
+    seconds REAL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class RecipeStore:
+    def __init__(self, path: str) -> None:
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def put(self, item: str, status: str, result: Dict, seconds: float) -> None:
+        """item(URL 또는 파일 경로)별 최신 결과를 저장"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO recipes "
+                "(item, status, food_name, ingredients, steps, step_timestamps, answer, seconds, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    item,
+                    status,
+                    result.get("food_name", ""),
+                    json.dumps(result.get("ingredients", []), ensure_ascii=False),
+                    json.dumps(result.get("recipe", []), ensure_ascii=False),
+                    json.dumps(result.get("step_timestamps"), ensure_ascii=False),
+                    result.get("answer", ""),
+                    round(seconds, 3),
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+
+    def get(self, item: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT item, status, food_name, ingredients, steps, step_timestamps, answer, seconds "
+                "FROM recipes WHERE item = ?",
+                (item,),
+            ).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def all(self, status: Optional[str] = None) -> List[Dict]:
+        query = "SELECT item, status, food_name, ingredients, steps, step_timestamps, answer, seconds FROM recipes"
+        args = ()
+        if status:
+            query += " WHERE status = ?"
+            args = (status,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY updated_at", args).fetchall()
+        return [self._row_to_dict(r) for r in rows]
+
+    @staticmethod
+    def _row_to_dict(row) -> Dict:
+        return {
+            "item": row[0],
+            "status": row[1],
+            "food_name": row[2],
+            "ingredients": json.loads(row[3] or "[]"),
+            "recipe": json.loads(row[4] or "[]"),
+            "step_timestamps": json.loads(row[5] or "null"),
+            "answer": row[6],
+            "seconds": row[7],
+        }
@@ -0,0 +1,242 @@
+# 시각 정보가 있는 스크립트 세그먼트 저장소 (SQLite)
+# 영상별 세그먼트를 챕터/시각으로 색인해 두고, 구간별 추출 결과를 (구간 해시, 프롬프트 버전)으로 캐시합니다.
+# 프롬프트가 바뀌어 다시 추출할 때도 전사를 반복하지 않고, 내용이 바뀐 구간만 다시 LLM에 보냅니다.
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from video_service import config
+except ModuleNotFoundError:
+    import config
+
+from .description import NON_STEP_CHAPTER
+from .tokens import estimate_tokens
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    video_id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    video_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    start REAL NOT NULL,
+    end REAL NOT NULL,
+    chapter INTEGER,
+    text TEXT NOT NULL,
+    PRIMARY KEY (video_id, idx)
+);
+CREATE INDEX IF NOT EXISTS segments_by_time ON segments (video_id, start);
+CREATE INDEX IF NOT EXISTS segments_by_chapter ON segments (video_id, chapter);
+CREATE TABLE IF NOT EXISTS chapters (
+    video_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    start REAL NOT NULL,
+    end REAL NOT NULL,
+    PRIMARY KEY (video_id, idx)
+);
+CREATE TABLE IF NOT EXISTS window_extractions (
+    video_id TEXT NOT NULL,
+    window_hash TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (video_id, window_hash, prompt_version)
+);
+"""
+
+
+def _chapter_of(t: float, chapters: List[Dict]) -> Optional[int]:
+    for i, ch in enumerate(chapters):
+        if ch["start"] <= t < ch["end"]:
+            return i
+    return None
+
+
+class SegmentStore:
+    def __init__(self, path: str) -> None:
+        # 그래프 노드가 여러 스레드에서 호출되므로 연결 하나를 잠금으로 보호해 공유
+        # 여러 프로세스(일괄 수집 워커, 서버)가 같은 파일을 쓸 수 있으므로 WAL + 잠금 대기 시간 설정
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def save_transcript(self, video_id: str, segments: List[Dict], chapters: List[Dict], source: str) -> None:
+        chapters = [
+            {"title": str(ch.get("title", "")), "start": float(ch.get("start_time", ch.get("start", 0.0))),
+             "end": float(ch.get("end_time", ch.get("end", 0.0)))}
+            for ch in chapters or []
+        ]
+        with self._lock:
+            self._conn.execute("DELETE FROM segments WHERE video_id = ?", (video_id,))
+            self._conn.execute("DELETE FROM chapters WHERE video_id = ?", (video_id,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts (video_id, source, created_at) VALUES (?, ?, ?)",
+                (video_id, source, time.time()),
+            )
+            self._conn.executemany(
+                "INSERT INTO chapters (video_id, idx, title, start, end) VALUES (?, ?, ?, ?, ?)",
+                [(video_id, i, ch["title"], ch["start"], ch["end"]) for i, ch in enumerate(chapters)],
+            )
+            self._conn.executemany(
+                "INSERT INTO segments (video_id, idx, start, end, chapter, text) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (video_id, i, float(seg["start"]), float(seg["end"]), _chapter_of(float(seg["start"]), chapters), seg["text"])
+                    for i, seg in enumerate(segments)
+                ],
+            )
+            self._conn.commit()
+
+    def has_transcript(self, video_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM transcripts WHERE video_id = ?", (video_id,)).fetchone()
+        return row is not None
+
+    def _segments(self, where: str, args: Tuple) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT start, end, chapter, text FROM segments WHERE {where} ORDER BY idx", args
+            ).fetchall()
+        return [{"start": r[0], "end": r[1], "chapter": r[2], "text": r[3]} for r in rows]
+
+    def segments(self, video_id: str) -> List[Dict]:
+        return self._segments("video_id = ?", (video_id,))
+
+    def segments_between(self, video_id: str, start: float, end: float) -> List[Dict]:
+        return self._segments("video_id = ? AND end > ? AND start < ?", (video_id, start, end))
+
+    def segments_for_chapter(self, video_id: str, chapter: int) -> List[Dict]:
+        return self._segments("video_id = ? AND chapter = ?", (video_id, chapter))
+
+    def chapters(self, video_id: str) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT title, start, end FROM chapters WHERE video_id = ? ORDER BY idx", (video_id,)
+            ).fetchall()
+        return [{"title": r[0], "start": r[1], "end": r[2]} for r in rows]
+
+    def get_extraction(self, video_id: str, window_hash: str, prompt_version: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM window_extractions WHERE video_id = ? AND window_hash = ? AND prompt_version = ?",
+                (video_id, window_hash, prompt_version),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_extraction(self, video_id: str, window_hash: str, prompt_version: str, result: Dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO window_extractions (video_id, window_hash, prompt_version, result, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (video_id, window_hash, prompt_version, json.dumps(result, ensure_ascii=False), time.time()),
+            )
+            self._conn.commit()
+
+
+_store: Optional[SegmentStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> SegmentStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SegmentStore(config.SEGMENT_STORE_PATH)
+        return _store
+
+
+# --- 추출 구간 구성 ---
+def format_timestamp(seconds: float) -> str:
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
+
+
+def parse_timestamp(text: str) -> Optional[float]:
+    try:
+        parts = [float(p) for p in str(text).strip().strip("[]").split(":")]
+    except ValueError:
+        return None
+    total = 0.0
+    for p in parts:
+        total = total * 60 + p
+    return total
+
+
+def window_text(segments: List[Dict]) -> str:
+    """세그먼트마다 [분:초] 시각을 붙인 구간 텍스트 (조리 단계에 영상 시각을 달 수 있도록)"""
+    return "\n".join(f"[{format_timestamp(seg['start'])}] {seg['text']}" for seg in segments)
+
+
+def window_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _pack(segments: List[Dict], max_tokens: int) -> List[List[Dict]]:
+    groups: List[List[Dict]] = []
+    current: List[Dict] = []
+    used = 0
+    for seg in segments:
+        tokens = estimate_tokens(seg["text"]) + 3
+        if current and used + tokens > max_tokens:
+            groups.append(current)
+            current, used = [], 0
+        current.append(seg)
+        used += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def build_windows(segments: List[Dict], chapters: List[Dict], max_tokens: int) -> List[List[Dict]]:
+    """
+    추출 구간 목록을 만듭니다.
+    챕터가 있으면 인트로/시식 등 조리와 무관한 챕터를 빼고 챕터 경계에서 나누며, 긴 챕터는 토큰 예산으로 다시 나눕니다.
+    챕터가 없으면 시간 순서대로 토큰 예산 단위로 나눕니다.
+    """
+    if not chapters:
+        return _pack(segments, max_tokens)
+
+    skipped = {i for i, ch in enumerate(chapters) if NON_STEP_CHAPTER.search(ch["title"])}
+    relevant = [seg for seg in segments if seg.get("chapter") not in skipped]
+    # 관련 챕터에 내용이 거의 없으면 챕터 제목이 내용과 맞지 않는 것으로 보고 전체를 사용
+    if estimate_tokens(" ".join(seg["text"] for seg in relevant)) < 50:
+        relevant = segments
+
+    windows: List[List[Dict]] = []
+    current: List[Dict] = []
+    used = 0
+    for chapter, group in _group_by_chapter(relevant):
+        tokens = sum(estimate_tokens(seg["text"]) + 3 for seg in group)
+        if current and used + tokens > max_tokens:
+            windows.append(current)
+            current, used = [], 0
+        if tokens > max_tokens:
+            windows.extend(_pack(group, max_tokens))
+            continue
+        current.extend(group)
+        used += tokens
+    if current:
+        windows.append(current)
+    return windows
+
+
+def _group_by_chapter(segments: List[Dict]) -> List[Tuple[Optional[int], List[Dict]]]:
+    groups: List[Tuple[Optional[int], List[Dict]]] = []
+    for seg in segments:
+        if groups and groups[-1][0] == seg.get("chapter"):
+            groups[-1][1].append(seg)
+        else:
+            groups.append((seg.get("chapter"), [seg]))
+    return groups
@@ -0,0 +1,60 @@
+# 같은 키의 동시 작업을 한 번만 실행하는 single-flight
+# 먼저 들어온 요청(리더)이 실행하고, 실행 중에 들어온 같은 키의 요청(팔로워)은 리더의 결과를 함께 받습니다.
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any],
+           on_follow: Optional[Callable[[int], None]] = None) -> Tuple[Any, bool]:
+        """
+        (결과, 공유 여부)를 반환합니다. 리더에서 예외가 나면 팔로워에게도 같은 예외를 전달합니다.
+        on_follow는 팔로워가 붙거나(+1) 떠날 때(-1) 호출됩니다.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.followers += 1
+
+        if not leader:
+            if on_follow:
+                on_follow(1)
+            try:
+                call.done.wait()
+            finally:
+                if on_follow:
+                    on_follow(-1)
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # 결과를 채운 뒤 키를 지워, 이후 요청은 새로 실행
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self, key: str) -> bool:
+        with self._lock:
+            return key in self._calls
@@ -0,0 +1,65 @@
+# 그래프 체크포인트 스레드 임대 (체크포인트 SQLite 파일에 함께 저장)
+# 같은 영상의 thread_id를 서버/큐 워커/일괄 수집 프로세스가 동시에 이어 쓰지 않도록,
+# 실행하는 동안 임대를 잡고 하트비트로 연장합니다. 임대가 끝난 스레드만 다른 실행이 재개할 수 있습니다.
+import sqlite3
+import time
+from contextlib import contextmanager
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS thread_leases (
+    thread_id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    lease_until REAL NOT NULL
+);
+"""
+
+
+class ThreadLeases:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # 여러 프로세스가 같은 파일을 쓰므로 호출마다 연결을 열고 잠금 대기 시간을 넉넉히 둠
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def acquire(self, thread_id: str, owner: str, lease_seconds: float) -> bool:
+        """임대를 잡음. 다른 실행이 유효한 임대를 갖고 있으면 False"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT owner, lease_until FROM thread_leases WHERE thread_id = ?", (thread_id,)
+                ).fetchone()
+                if row and row[0] != owner and row[1] > now:
+                    conn.execute("ROLLBACK")
+                    return False
+                conn.execute(
+                    "INSERT OR REPLACE INTO thread_leases (thread_id, owner, lease_until) VALUES (?, ?, ?)",
+                    (thread_id, owner, now + lease_seconds),
+                )
+                conn.execute("COMMIT")
+                return True
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def renew(self, thread_id: str, owner: str, lease_seconds: float) -> bool:
+        """임대 연장. 이미 다른 실행에게 넘어갔으면 False"""
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE thread_leases SET lease_until = ? WHERE thread_id = ? AND owner = ?",
+                (time.time() + lease_seconds, thread_id, owner),
+            ).rowcount == 1
+
+    def release(self, thread_id: str, owner: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM thread_leases WHERE thread_id = ? AND owner = ?", (thread_id, owner))
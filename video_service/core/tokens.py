@@ -0,0 +1,74 @@
+# 스크립트 토큰 수 추정 및 토큰 예산 단위 구간 분할 (토크나이저 없이 문자 기반 근사)
+import re
+from typing import List
+
+# 한글 등 비ASCII 문자는 대략 문자당 0.7토큰, ASCII는 4문자당 1토큰으로 근사 (Gemini 토크나이저 기준 여유 있게 잡음)
+NON_ASCII_TOKENS_PER_CHAR = 0.7
+ASCII_CHARS_PER_TOKEN = 4.0
+
+# 문장 경계: 마침표/물음표/느낌표/줄바꿈 뒤, 또는 한국어 종결 어미(-세요/-어요/-니다/-죠/-는다 등) 뒤 공백
+# 음절 하나만 보면 "간장 네 스푼", "다 넣고"처럼 문장 중간에서 잘리므로 두 음절 어미로만 판단
+_SENTENCE_SPLIT = re.compile(
+    r"(?<=[.!?。\n])\s+"
+    r"|(?:(?<=[세어아해네에예지까군래]요)|(?<=니다)|(?<=[는었았였했한된겠]다)|(?<=[지고]죠))\s+"
+)
+
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    ascii_chars = len(text) - non_ascii
+    return int(non_ascii * NON_ASCII_TOKENS_PER_CHAR + ascii_chars / ASCII_CHARS_PER_TOKEN) + 1
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_SPLIT.split(text or "") if s and s.strip()]
+
+
+def _split_long(sentence: str, max_tokens: int) -> List[str]:
+    # 문장 부호 없이 길게 이어진 자동 자막은 단어 단위로 자름
+    pieces, current = [], []
+    for word in sentence.split():
+        if current and estimate_tokens(" ".join(current + [word])) > max_tokens:
+            pieces.append(" ".join(current))
+            current = []
+        current.append(word)
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def split_by_tokens(text: str, max_tokens: int, overlap_tokens: int = 0) -> List[str]:
+    """
+    문장 경계를 유지하면서 각 구간이 max_tokens를 넘지 않도록 나눕니다.
+    구간 경계에 걸친 조리 단계를 놓치지 않도록 이전 구간 끝 문장을 overlap_tokens만큼 다음 구간 앞에 붙입니다.
+    """
+    sentences: List[str] = []
+    for sentence in split_sentences(text):
+        if estimate_tokens(sentence) > max_tokens:
+            sentences.extend(_split_long(sentence, max_tokens))
+        else:
+            sentences.append(sentence)
+
+    windows: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for sentence in sentences:
+        tokens = estimate_tokens(sentence)
+        if current and current_tokens + tokens > max_tokens:
+            windows.append(" ".join(current))
+            # 겹침 구간: 직전 구간의 마지막 문장들
+            carry, carry_tokens = [], 0
+            for prev in reversed(current):
+                t = estimate_tokens(prev)
+                if carry_tokens + t > overlap_tokens:
+                    break
+                carry.insert(0, prev)
+                carry_tokens += t
+            current, current_tokens = carry, carry_tokens
+        current.append(sentence)
+        current_tokens += tokens
+    if current:
+        windows.append(" ".join(current))
+    return windows
@@ -1,11 +1,36 @@
 # 스크립트 추출 기능 (API, Whisper 모두)
+import multiprocessing
 import os
+import queue
 import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
 from youtube_transcript_api import YouTubeTranscriptApi
 import whisper
 import yt_dlp
 import torch
 from faster_whisper import WhisperModel
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+# 서버(video_service 디렉토리 실행)와 intent_service(패키지 import) 양쪽에서 불러오므로 두 경로 모두 지원
+try:
+    from video_service import config
+except ModuleNotFoundError:
+    import config
+
+from . import asr_policy, metrics, progress
+
+
+# Whisper 입력 샘플레이트 (16kHz mono)
+SAMPLE_RATE = 16000
 
 
 # 유튜브 영상 URL에서 video_id 추출 함수
@@ -32,63 +57,492 @@ def get_youtube_title(url: str) -> str:
         return "요리명을 추출할 수 없습니다."
 
 
+# 제목/설명/챕터/길이를 yt-dlp 한 번의 조회로 가져오는 함수
+def get_youtube_info(url: str) -> Dict:
+    print("--- 영상 메타데이터 추출 (yt-dlp) ---")
+    ydl_opts = {'quiet': True}
+    with metrics.stage("yt_dlp_metadata"), yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+    return {
+        "title": info.get('title') or '요리명을 추출할 수 없습니다.',
+        "description": info.get('description') or "",
+        "chapters": info.get('chapters') or [],
+        "duration": info.get('duration') or 0,
+    }
+
+
 # youtube-transcript-api으로 자막 가져오기 (한국어 우선 시도, 없으면 영어로 시도)
 def _get_transcript_from_api(video_id: str) -> str:
-    yta = YouTubeTranscriptApi()
-    transcript_list = yta.fetch(video_id, languages=['ko', 'en'])
-    return " ".join([d.text for d in transcript_list])
+    return " ".join(seg["text"] for seg in _get_segments_from_api(video_id))
 
 
-# 자막이 없는 경우 Whisper 사용
-def _get_transcript_from_audio(url: str) -> str:
-    temp_dir = "temp_audio"
-    os.makedirs(temp_dir, exist_ok=True)
-    
+# 자막 스니펫을 시각 정보와 함께 {start, end, text} 세그먼트로 반환
+def _get_segments_from_api(video_id: str) -> List[Dict]:
+    with metrics.stage("caption_api"):
+        segments = list(iter_transcript_from_api(video_id))
+    progress.report(percent=100.0, transcript_source="api")
+    return segments
+
+
+# 최적 오디오 포맷의 스트림 주소와 요청 헤더를 yt-dlp로 조회 (다운로드하지 않음)
+def _resolve_audio_stream(url: str) -> Tuple[str, Dict[str, str]]:
+    ydl_opts = {'format': 'bestaudio/best', 'quiet': True}
+    with metrics.stage("yt_dlp_resolve"), yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+
+    stream_url = info.get('url')
+    headers = info.get('http_headers') or {}
+    size = info.get('filesize') or info.get('filesize_approx')
+    if not stream_url:
+        # 비디오/오디오가 분리된 포맷 조합이 선택된 경우 오디오 쪽 주소를 사용
+        for fmt in info.get('requested_formats') or []:
+            if fmt.get('acodec') not in (None, 'none'):
+                stream_url = fmt.get('url')
+                headers = fmt.get('http_headers') or headers
+                size = fmt.get('filesize') or fmt.get('filesize_approx')
+                break
+    if not stream_url:
+        raise ValueError("오디오 스트림 주소를 찾을 수 없습니다.")
+    # ffmpeg가 스트림을 직접 읽으므로 포맷 정보의 파일 크기를 다운로드 바이트로 기록
+    if size:
+        metrics.inc("audio_download_bytes", size)
+    return stream_url, headers
+
+
+# 오디오 소스(URL 또는 파일 경로)를 ffmpeg로 16kHz mono float32 PCM 버퍼로 디코딩
+def decode_audio_to_pcm(source: str, headers: Optional[Dict[str, str]] = None) -> np.ndarray:
+    cmd = ["ffmpeg", "-nostdin", "-loglevel", "error"]
+    if headers:
+        cmd += ["-headers", "".join(f"{k}: {v}\r\n" for k, v in headers.items())]
+    cmd += ["-i", source, "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le", "-"]
+
+    with metrics.stage("audio_decode"):
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg 디코딩 실패: {proc.stderr.decode(errors='ignore')[-300:]}")
+    metrics.inc("pcm_bytes", len(proc.stdout))
+    return np.frombuffer(proc.stdout, np.int16).astype(np.float32) / 32768.0
+
+
+# 메모리 경로: 디스크를 거치지 않고 스트림을 바로 PCM으로 디코딩
+def _load_audio_in_memory(url: str) -> np.ndarray:
+    stream_url, headers = _resolve_audio_stream(url)
+    return decode_audio_to_pcm(stream_url, headers)
+
+
+# 파일 경로: 작업별 임시 디렉토리에 원본 오디오를 받아 PCM으로 디코딩 (재인코딩 없음)
+def _load_audio_via_file(url: str) -> np.ndarray:
+    work_dir = tempfile.mkdtemp(prefix="audio_", dir=config.AUDIO_SCRATCH_DIR or None)
     ydl_opts = {
         'format': 'bestaudio/best',
-        'outtmpl': os.path.join(temp_dir, '%(id)s.%(ext)s'),
-        'postprocessors': [{
-            'key': 'FFmpegExtractAudio',
-            'preferredcodec': 'm4a',
-        }],
+        'outtmpl': os.path.join(work_dir, '%(id)s.%(ext)s'),
         'quiet': True,
     }
-
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        with metrics.stage("audio_download"), yt_dlp.YoutubeDL(ydl_opts) as ydl:
             info = ydl.extract_info(url, download=True)
-            video_id = info['id']
-            ext = info['ext']
-            audio_file = os.path.join(temp_dir, f"{video_id}.m4a")
-            if not os.path.exists(audio_file):
-                audio_file = os.path.join(temp_dir, f"{video_id}.{ext}")
-                if not os.path.exists(audio_file):
-                    raise FileNotFoundError("다운로드된 오디오 파일을 찾을 수 없습니다.")
-
+            audio_file = ydl.prepare_filename(info)
+        if not os.path.exists(audio_file):
+            raise FileNotFoundError("다운로드된 오디오 파일을 찾을 수 없습니다.")
+        metrics.inc("audio_download_bytes", os.path.getsize(audio_file))
         print(f"✅ 오디오 다운로드 완료: {audio_file}")
+        return decode_audio_to_pcm(audio_file)
+    finally:
+        # 작업마다 전용 디렉토리를 쓰므로 다른 요청과 경합 없이 통째로 정리
+        shutil.rmtree(work_dir, ignore_errors=True)
 
-        # faster-whisper 모델 로드 및 음성 인식
-        print("🎤 Faster-Whisper 음성 인식 시작...")
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        compute_type = "float16" if device == "cuda" else "int8"
-        model_size = "medium"  # 필요에 따라 tiny, base, small, medium, large 등 선택
 
-        model = WhisperModel(model_size, device=device, compute_type=compute_type)
-        print("Faster-Whisper device:", device)
+# 설정된 방식으로 오디오를 PCM 버퍼로 불러오기 (메모리 경로 실패 시 파일 경로로 재시도)
+def load_audio(url: str) -> np.ndarray:
+    if config.WHISPER_AUDIO_MODE == "memory":
+        try:
+            return _load_audio_in_memory(url)
+        except Exception as e:
+            print(f"WARN: 메모리 오디오 디코딩 실패 ({e}). 파일 경로로 재시도합니다.")
+    return _load_audio_via_file(url)
 
-        segments, info = model.transcribe(audio_file, language="ko")
-        transcript_text = " ".join([segment.text for segment in segments])
-        print(f"✅ Faster-Whisper 음성 인식 완료: {transcript_text[:100]}...")
 
-    finally:
-        if 'audio_file' in locals() and os.path.exists(audio_file):
-            os.remove(audio_file)
-        if os.path.exists(temp_dir) and not os.listdir(temp_dir):
-            os.rmdir(temp_dir)
-            
+# --- ASR 전처리 ---
+# decode_audio_to_pcm 단계에서 이미 mono 다운믹스 + 16kHz 리샘플링이 끝난 PCM을 받아
+# 레벨 보정 후 VAD로 음성 구간만 남김 (음악/지글거리는 소리/무음 제거)
+
+# DC 오프셋 제거 및 피크 정규화
+def _normalize_levels(audio: np.ndarray) -> np.ndarray:
+    audio = audio - np.mean(audio) if len(audio) else audio
+    peak = np.max(np.abs(audio)) if len(audio) else 0.0
+    return (audio / peak * 0.95).astype(np.float32) if peak > 1e-4 else audio.astype(np.float32)
+
+
+# VAD(Silero, faster-whisper 내장)로 음성 구간(샘플 단위)을 찾아 가까운 구간끼리 병합
+def _detect_speech_chunks(audio: np.ndarray) -> List[Tuple[int, int]]:
+    options = VadOptions(
+        threshold=config.VAD_THRESHOLD,
+        min_speech_duration_ms=250,
+        min_silence_duration_ms=config.VAD_MIN_SILENCE_MS,
+        speech_pad_ms=config.VAD_SPEECH_PAD_MS,
+    )
+    chunks: List[Tuple[int, int]] = []
+    for ts in get_speech_timestamps(audio, options):
+        if chunks and ts["start"] - chunks[-1][1] < SAMPLE_RATE // 2:
+            chunks[-1] = (chunks[-1][0], ts["end"])
+        else:
+            chunks.append((ts["start"], ts["end"]))
+    return chunks
+
+
+# 전사 전 오디오 전처리: 레벨 보정 + 비음성 구간 제거. (처리된 오디오, 통계) 반환
+def preprocess_audio(audio: np.ndarray) -> Tuple[np.ndarray, Dict]:
+    with metrics.stage("audio_preprocess"):
+        audio = _normalize_levels(audio)
+        original_seconds = len(audio) / SAMPLE_RATE
+        chunks = _detect_speech_chunks(audio) if config.WHISPER_VAD_TRIM else []
+    metrics.inc("audio_seconds", original_seconds)
+    metrics.record("audio_seconds", original_seconds)
+
+    if chunks:
+        trimmed = np.concatenate([audio[s:e] for s, e in chunks])
+    else:
+        # VAD를 끄거나 음성을 못 찾은 경우 원본 그대로 전사 (전부 버리지 않음)
+        trimmed, chunks = audio, [(0, len(audio))]
+
+    kept_seconds = len(trimmed) / SAMPLE_RATE
+    stats = {
+        "original_seconds": round(original_seconds, 2),
+        "kept_seconds": round(kept_seconds, 2),
+        "removed_seconds": round(original_seconds - kept_seconds, 2),
+        "removed_ratio": round(1 - kept_seconds / original_seconds, 4) if original_seconds else 0.0,
+        # Whisper 연산량은 입력 길이에 비례하므로 길이 비율을 기대 속도 향상으로 사용
+        "expected_speedup": round(original_seconds / kept_seconds, 2) if kept_seconds else 1.0,
+        "chunks": chunks,
+    }
+    print(
+        f"✅ 오디오 전처리: {original_seconds:.1f}초 → {kept_seconds:.1f}초 "
+        f"({stats['removed_ratio'] * 100:.1f}% 제거, 예상 속도 향상 {stats['expected_speedup']}x)"
+    )
+    return trimmed, stats
+
+
+# 잘라낸 오디오 기준 시각(초)을 원본 영상 기준 시각으로 되돌림
+def restore_timestamp(t: float, chunks: List[Tuple[int, int]]) -> float:
+    elapsed = 0.0
+    for start, end in chunks:
+        length = (end - start) / SAMPLE_RATE
+        if t <= elapsed + length:
+            return start / SAMPLE_RATE + (t - elapsed)
+        elapsed += length
+    return chunks[-1][1] / SAMPLE_RATE if chunks else t
+
+
+def _restore_segment(seg: Dict, chunks: List[Tuple[int, int]]) -> Dict:
+    return {**seg, "start": restore_timestamp(seg["start"], chunks), "end": restore_timestamp(seg["end"], chunks)}
+
+
+# 전사 소요 시간과 전처리 통계를 함께 기록
+def _report_asr_speed(stats: Dict, elapsed: float) -> None:
+    rtf = elapsed / stats["original_seconds"] if stats["original_seconds"] else 0.0
+    stats["asr_seconds"] = round(elapsed, 2)
+    stats["rtf_vs_original"] = round(rtf, 3)
+    print(f"✅ 전사 소요 {elapsed:.1f}초 (원본 길이 기준 RTF {rtf:.3f}, 제거된 오디오 {stats['removed_seconds']}초)")
+
+
+# 에너지 기반으로 무음 구간의 중앙 지점(샘플 위치) 목록을 찾는 함수
+def find_silence_points(audio: np.ndarray, frame_ms: int = 30, min_silence_ms: int = 300,
+                        threshold_db: float = -40.0) -> List[int]:
+    frame = int(SAMPLE_RATE * frame_ms / 1000)
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return []
+    frames = audio[: n_frames * frame].reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1) + 1e-10)
+    # 영상마다 음량이 달라 최대 음량 대비 상대 dB로 판단
+    db = 20 * np.log10(rms / (rms.max() + 1e-10))
+    silent = db < threshold_db
+
+    points: List[int] = []
+    min_frames = max(1, min_silence_ms // frame_ms)
+    run_start = None
+    for i, is_silent in enumerate(np.append(silent, False)):
+        if is_silent and run_start is None:
+            run_start = i
+        elif not is_silent and run_start is not None:
+            if i - run_start >= min_frames:
+                points.append(((run_start + i) // 2) * frame)
+            run_start = None
+    return points
+
+
+# 오디오를 목표 길이 근처의 무음 지점에서 잘라 (시작, 끝) 샘플 구간 목록으로 반환
+def split_audio_at_silence(audio: np.ndarray, target_seconds: float,
+                           max_seconds: Optional[float] = None) -> List[Tuple[int, int]]:
+    total = len(audio)
+    target = int(target_seconds * SAMPLE_RATE)
+    limit = int((max_seconds or target_seconds * 1.5) * SAMPLE_RATE)
+    if total <= limit:
+        return [(0, total)]
+
+    silences = find_silence_points(audio)
+    bounds: List[Tuple[int, int]] = []
+    start = 0
+    while total - start > limit:
+        # 목표 지점에 가장 가까운 무음 지점을 고르되, 최대 길이를 넘으면 강제로 자름
+        candidates = [p for p in silences if start + target // 2 < p <= start + limit]
+        cut = min(candidates, key=lambda p: abs(p - (start + target))) if candidates else start + target
+        bounds.append((start, cut))
+        start = cut
+    bounds.append((start, total))
+    return bounds
+
+
+# Whisper 실행 장치와 연산 타입
+def _whisper_runtime() -> Tuple[str, str]:
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    return device, asr_policy.compute_type_for(device)
+
+
+# 모델 로드는 수 초~수십 초가 걸리므로 (크기, 장치, 연산 타입)별로 재사용
+@lru_cache(maxsize=3)
+def get_whisper_model(model_size: str, device: str, compute_type: str) -> WhisperModel:
+    print(f"🎤 Faster-Whisper 모델 로드: {model_size} ({device}, {compute_type})")
+    return WhisperModel(model_size, device=device, compute_type=compute_type)
+
+
+# faster-whisper 세그먼트를 신뢰도 지표를 포함한 dict로 변환
+def _segment_dict(seg, offset: float = 0.0) -> Dict:
+    return {
+        "start": offset + seg.start,
+        "end": offset + seg.end,
+        "text": seg.text,
+        "avg_logprob": seg.avg_logprob,
+        "compression_ratio": seg.compression_ratio,
+    }
+
+
+# --- 청크 병렬 전사 (프로세스 풀 워커) ---
+_chunk_model = None
+
+
+def _init_chunk_worker(model_size: str, compute_type: str, cpu_threads: int) -> None:
+    # 워커 프로세스마다 모델을 한 번만 로드해 청크 사이에서 재사용
+    global _chunk_model
+    _chunk_model = WhisperModel(model_size, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+
+
+def _transcribe_chunk(index: int, offset: float, chunk: np.ndarray) -> Tuple[int, List[Dict]]:
+    segments, _ = _chunk_model.transcribe(chunk, language="ko")
+    return index, [_segment_dict(seg, offset) for seg in segments]
+
+
+# 긴 오디오를 무음 지점에서 나눠 프로세스 풀로 동시에 전사한 뒤 순서대로 이어 붙임
+def transcribe_chunked(audio: np.ndarray, model_size: str, compute_type: str, workers: int,
+                       chunk_seconds: float) -> List[Dict]:
+    bounds = split_audio_at_silence(audio, chunk_seconds)
+    workers = max(1, min(workers, len(bounds)))
+    cpu_threads = max(1, (os.cpu_count() or 1) // workers)
+    print(f"🎤 청크 병렬 전사: {len(bounds)}개 청크, 워커 {workers}개 (워커당 스레드 {cpu_threads})")
+
+    # torch/CTranslate2 상태를 fork로 복제하지 않도록 spawn 컨텍스트 사용
+    ctx = multiprocessing.get_context("spawn")
+    results: Dict[int, List[Dict]] = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_chunk_worker,
+                             initargs=(model_size, compute_type, cpu_threads)) as pool:
+        futures = [
+            pool.submit(_transcribe_chunk, i, s / SAMPLE_RATE, audio[s:e])
+            for i, (s, e) in enumerate(bounds)
+        ]
+        for future in as_completed(futures):
+            index, segments = future.result()
+            results[index] = segments
+            progress.report(percent=100.0 * len(results) / len(bounds), transcript_source="whisper", model=model_size)
+
+    return [seg for i in sorted(results) for seg in results[i]]
+
+
+# 신뢰도가 낮은 세그먼트만 한 단계 큰 모델로 다시 전사해 텍스트를 교체
+def _rerun_low_confidence(audio: np.ndarray, segments: List[Dict], model_size: str,
+                          device: str, compute_type: str) -> Dict:
+    larger = asr_policy.next_larger_model(model_size)
+    targets = [i for i, seg in enumerate(segments) if asr_policy.is_low_confidence(seg)]
+    if not larger or not targets or not config.ASR_RERUN_LOW_CONFIDENCE:
+        return {"rerun_model": None, "rerun_segments": 0}
+
+    print(f"🔁 저신뢰 세그먼트 {len(targets)}개를 {larger} 모델로 재전사")
+    model = get_whisper_model(larger, device, compute_type)
+    pad = int(0.2 * SAMPLE_RATE)
+    agreements = []
+    for i in targets:
+        seg = segments[i]
+        s = max(0, int(seg["start"] * SAMPLE_RATE) - pad)
+        e = min(len(audio), int(seg["end"] * SAMPLE_RATE) + pad)
+        rerun, _ = model.transcribe(audio[s:e], language="ko")
+        text = " ".join(r.text for r in rerun).strip()
+        if text:
+            agreements.append(asr_policy.text_agreement(seg["text"], text))
+            segments[i] = {**seg, "text": text, "rerun_model": larger}
+    return {
+        "rerun_model": larger,
+        "rerun_segments": len(targets),
+        # 재전사 결과와의 일치율 = 선택된 모델의 정확도 근사치
+        "rerun_agreement": round(sum(agreements) / len(agreements), 4) if agreements else None,
+    }
+
+
+# 자막이 없는 경우 Whisper 사용
+def _get_transcript_from_audio(url: str) -> str:
+    transcript_text = " ".join(seg["text"] for seg in _get_segments_from_audio(url))
+    print(f"✅ Faster-Whisper 음성 인식 완료: {transcript_text[:100]}...")
     return transcript_text
 
 
+# Whisper 세그먼트를 원본 영상 기준 시각으로 반환 (local=True면 url을 로컬 미디어 파일 경로로 보고 바로 디코딩)
+def _get_segments_from_audio(url: str, local: bool = False) -> List[Dict]:
+    audio, stats = preprocess_audio(decode_audio_to_pcm(url) if local else load_audio(url))
+    duration = len(audio) / SAMPLE_RATE
+
+    with asr_policy.asr_slot(), metrics.stage("whisper"):
+        started = time.perf_counter()
+        device, _ = _whisper_runtime()
+        workers = config.WHISPER_CHUNK_WORKERS or min(4, os.cpu_count() or 1)
+        # CPU에서 긴 영상은 청크로 나눠 병렬 전사 (GPU는 단일 호출이 더 빠름)
+        chunked = device == "cpu" and workers > 1 and duration >= config.WHISPER_CHUNKED_MIN_SECONDS
+
+        # 영상 길이/대기 작업 수/지연 목표로 모델 크기 결정 (자기 자신은 대기 수에서 제외)
+        model_size, compute_type = asr_policy.select_model(
+            duration, device, queue_depth=asr_policy.current_queue_depth() - 1,
+            parallelism=workers if chunked else 1,
+        )
+
+        if chunked:
+            segments = transcribe_chunked(audio, model_size, compute_type, workers, config.WHISPER_CHUNK_SECONDS)
+        else:
+            print("🎤 Faster-Whisper 음성 인식 시작...")
+            model = get_whisper_model(model_size, device, compute_type)
+            # faster-whisper는 16kHz mono float32 배열을 그대로 입력으로 받음
+            raw_segments, info = model.transcribe(audio, language="ko")
+            progress.report(transcript_source="whisper", model=model_size)
+            segments = []
+            # 세그먼트는 지연 생성되므로 디코딩되는 대로 진행률 갱신
+            for seg in raw_segments:
+                segments.append(_segment_dict(seg))
+                progress.report(percent=100.0 * seg.end / duration if duration else None)
+        first_pass = time.perf_counter() - started
+        if duration:
+            metrics.observe("whisper_rtf", first_pass / duration, {"model": model_size}, metrics.RTF_BUCKETS)
+            metrics.record("whisper_rtf", first_pass / duration)
+
+        confidence = asr_policy.confidence_summary(segments)
+        rerun = _rerun_low_confidence(audio, segments, model_size, device, compute_type)
+        _report_asr_speed(stats, time.perf_counter() - started)
+
+    asr_policy.record_asr_run({
+        "model": model_size,
+        "compute_type": compute_type,
+        "device": device,
+        "parallel": workers if chunked else 0,
+        "audio_seconds": round(duration, 2),
+        "queue_depth": asr_policy.current_queue_depth(),
+        "asr_seconds": round(first_pass, 2),
+        "rtf": round(first_pass / duration, 4) if duration else None,
+        "total_seconds": stats["asr_seconds"],
+        **confidence,
+        **rerun,
+    })
+
+    # 비음성 구간을 잘라낸 오디오 기준 시각을 원본 영상 기준으로 되돌림
+    return [_restore_segment(seg, stats["chunks"]) for seg in segments]
+
+
+# --- 스트리밍 전사 ---
+# 자막 스니펫 / Whisper 세그먼트를 {start, end, text} 단위로 순서대로 내보냄
+
+# 자막 API 결과를 세그먼트 단위로 반환
+def iter_transcript_from_api(video_id: str) -> Iterator[Dict]:
+    yta = YouTubeTranscriptApi()
+    transcript_list = yta.fetch(video_id, languages=['ko', 'en'])
+    for d in transcript_list:
+        yield {"start": d.start, "end": d.start + d.duration, "text": d.text}
+
+
+# Whisper 세그먼트를 인식되는 즉시 반환 (cancel_event가 설정되면 남은 전사를 중단)
+def iter_transcript_from_audio(url: str, cancel_event: Optional[threading.Event] = None) -> Iterator[Dict]:
+    audio, stats = preprocess_audio(load_audio(url))
+    # 일괄 전사와 같이 전사 구간 전체를 대기 작업 수에 포함 (생성기가 끝나거나 닫힐 때 해제)
+    with asr_policy.asr_slot():
+        device, _ = _whisper_runtime()
+        model_size, compute_type = asr_policy.select_model(
+            len(audio) / SAMPLE_RATE, device, queue_depth=asr_policy.current_queue_depth() - 1,
+        )
+        model = get_whisper_model(model_size, device, compute_type)
+
+        # faster-whisper의 segments는 지연 생성기라 순회하는 만큼만 디코딩됨
+        # 비음성 구간을 잘라냈으므로 시각은 원본 영상 기준으로 되돌려 내보냄
+        segments, _ = model.transcribe(audio, language="ko")
+        for seg in segments:
+            if cancel_event is not None and cancel_event.is_set():
+                print("INFO: 스트리밍 전사 취소됨")
+                return
+            yield _restore_segment({"start": seg.start, "end": seg.end, "text": seg.text}, stats["chunks"])
+
+
+_STREAM_END = object()
+
+
+class TranscriptStream:
+    """백그라운드 스레드에서 전사를 진행하며 세그먼트를 큐로 흘려보내는 스트림"""
+
+    def __init__(self, url: str, use_whisper_only: bool = False) -> None:
+        self.url = url
+        self.use_whisper_only = use_whisper_only
+        self.source = ""
+        self.error: Optional[Exception] = None
+        self.finished = False
+        self._queue: "queue.Queue" = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "TranscriptStream":
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def _run(self) -> None:
+        try:
+            if not self.use_whisper_only:
+                try:
+                    print("INFO: 1차 시도 - 자막 API를 통해 스트리밍 스크립트 추출을 시작합니다.")
+                    segments = list(iter_transcript_from_api(_extract_video_id(self.url)))
+                    self.source = "api"
+                    for seg in segments:
+                        self._queue.put(seg)
+                    return
+                except Exception as e:
+                    print(f"INFO: 자막 API 사용 불가 ({e}). \n 2차 시도 - Whisper 스트리밍 음성 인식을 시작합니다.")
+            self.source = "whisper"
+            for seg in iter_transcript_from_audio(self.url, self._cancel):
+                self._queue.put(seg)
+        except Exception as e:
+            print(f"ERROR: 스트리밍 스크립트 추출 실패: {e}")
+            self.error = e
+        finally:
+            self._queue.put(_STREAM_END)
+
+    # 최소 min_seconds 분량이 모일 때까지(또는 스트림 종료까지) 기다린 뒤, 그때까지 도착한 세그먼트를 모두 반환
+    def next_batch(self, min_seconds: float) -> List[Dict]:
+        batch: List[Dict] = []
+        while not self.finished:
+            block = not batch or (batch[-1]["end"] - batch[0]["start"]) < min_seconds
+            try:
+                item = self._queue.get(block=block)
+            except queue.Empty:
+                break
+            if item is _STREAM_END:
+                self.finished = True
+                break
+            batch.append(item)
+        return batch
+
+
 # 유튜브 스크립트를 가져오는 메인 함수.
 # API 방식을 먼저 시도하고, 실패 시 Whisper 방식을 사용합니다.
 def get_youtube_transcript(url: str, use_whisper_only: bool = False) -> str:
@@ -109,6 +563,41 @@ def get_youtube_transcript(url: str, use_whisper_only: bool = False) -> str:
         raise
 
 
+# get_youtube_transcript와 같은 순서로 시도하되, 시각 정보가 있는 세그먼트와 출처(api/whisper)를 반환
+def get_youtube_transcript_segments(url: str, use_whisper_only: bool = False) -> Tuple[List[Dict], str]:
+    video_id = _extract_video_id(url)
+
+    if not use_whisper_only:
+        try:
+            print("INFO: 1차 시도 - 자막 API를 통해 스크립트 세그먼트 추출을 시작합니다.")
+            return _get_segments_from_api(video_id), "api"
+        except Exception as e:
+            print(f"INFO: 자막 API 사용 불가 ({e}). \n 2차 시도 - Whisper 음성 인식을 시작합니다.")
+
+    try:
+        return _get_segments_from_audio(url), "whisper"
+    except Exception as e:
+        print(f"ERROR: 모든 스크립트 추출 방법에 실패했습니다: {e}")
+        raise
+
+
+# 로컬 미디어 파일의 전사 세그먼트 (자막이 없으므로 항상 Whisper 사용)
+def get_local_media_segments(path: str) -> List[Dict]:
+    print(f"INFO: 로컬 미디어 Whisper 음성 인식 시작: {path}")
+    return _get_segments_from_audio(path, local=True)
+
+
+# 로컬 미디어 파일 길이(초) (ffprobe 사용)
+def get_media_duration(path: str) -> int:
+    cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "default=nw=1:nk=1", path]
+    try:
+        out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout.strip()
+        return int(float(out))
+    except (subprocess.CalledProcessError, ValueError, OSError) as e:
+        print(f"ERROR: 미디어 길이 추출 실패: {e}")
+        return 0
+
+
 # 영상 길이를 초 단위로 반환하는 함수 (yt-dlp 사용)
 def get_youtube_duration(url: str) -> int:
     try:
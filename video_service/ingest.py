@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+영상 레시피 일괄 수집 CLI
+
+유튜브 URL 목록 파일 또는 로컬 미디어 디렉토리를 받아 워커 프로세스 풀로 레시피를 추출하고,
+결과를 로컬 레시피 저장소(SQLite)에 기록합니다.
+항목마다 체크포인트(JSONL)를 남기므로 중단 후 다시 실행하면 끝난 항목은 건너뛰고 이어서 처리합니다.
+
+사용법:
+    cd video_service
+    python ingest.py --urls urls.txt --workers 4
+    python ingest.py --media-dir ./videos --workers 2 --store recipes.db
+    python ingest.py --urls urls.txt --retry-failed
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Set, Tuple
+
+from core.recipe_store import RecipeStore
+
+
+MEDIA_EXTENSIONS = {".mp4", ".mkv", ".webm", ".mov", ".avi", ".m4a", ".mp3", ".wav", ".aac", ".flac", ".ogg"}
+
+
+def load_items(urls_file: str, media_dir: str) -> List[str]:
+    if urls_file:
+        with open(urls_file, encoding="utf-8") as f:
+            items = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    else:
+        items = [
+            os.path.join(root, name)
+            for root, _, files in os.walk(media_dir)
+            for name in sorted(files)
+            if os.path.splitext(name)[1].lower() in MEDIA_EXTENSIONS
+        ]
+    # 순서를 유지하며 중복 제거
+    return list(dict.fromkeys(items))
+
+
+def load_checkpoint(path: str, retry_failed: bool) -> Set[str]:
+    """이미 끝난 항목 (retry_failed면 성공/레시피 아님만 완료로 간주)"""
+    done: Dict[str, str] = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # 비정상 종료로 잘린 마지막 줄
+                done[rec["item"]] = rec["status"]
+    return {item for item, status in done.items() if not (retry_failed and status == "failed")}
+
+
+def _init_worker(chunk_workers: int) -> None:
+    # 항목 단위로 이미 병렬 처리하므로 워커 안의 Whisper 청크 프로세스 풀은 기본적으로 끔 (CPU 과다 할당 방지)
+    # (--chunk-workers가 환경 변수보다 우선)
+    os.environ["WHISPER_CHUNK_WORKERS"] = str(chunk_workers)
+    # 스트리밍 그래프는 HTTP 응답 지연을 줄이기 위한 것이므로 일괄 처리에서는 사용하지 않음
+    os.environ["VIDEO_STREAMING_MODE"] = "false"
+
+
+def process_item(item: str) -> Tuple[str, str, Dict, float]:
+    # 워커 초기화(환경 변수 설정) 이후에 config가 로드되도록 여기서 import
+    from core.extractor import process_media_file, process_video_url
+
+    started = time.perf_counter()
+    try:
+        result = process_media_file(item) if os.path.isfile(item) else process_video_url(item)
+        # 추출기는 오류도 결과로 돌려주므로 status로 구분 (failed는 --retry-failed로 다시 처리)
+        status = result.get("status") or ("ok" if result.get("recipe") else "no_recipe")
+    except Exception as e:
+        result, status = {"answer": str(e)}, "failed"
+    return item, status, result, time.perf_counter() - started
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct * (len(ordered) - 1))))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="영상 레시피 일괄 수집")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--urls", help="유튜브 URL 목록 파일 (한 줄에 하나, #으로 시작하면 주석)")
+    source.add_argument("--media-dir", help="로컬 미디어 파일 디렉토리 (하위 디렉토리 포함)")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2), help="워커 프로세스 수")
+    parser.add_argument("--chunk-workers", type=int, default=1, help="워커당 Whisper 청크 병렬 프로세스 수")
+    parser.add_argument("--checkpoint", default="ingest_checkpoint.jsonl", help="진행 상황 체크포인트 파일")
+    parser.add_argument("--store", default="ingest_recipes.db", help="결과 레시피 저장소 (SQLite)")
+    parser.add_argument("--retry-failed", action="store_true", help="이전에 실패한 항목도 다시 처리")
+    args = parser.parse_args()
+
+    items = load_items(args.urls, args.media_dir)
+    done = load_checkpoint(args.checkpoint, args.retry_failed)
+    pending = [item for item in items if item not in done]
+    print(f"전체 {len(items)}개 중 완료 {len(items) - len(pending)}개, 처리 대상 {len(pending)}개 (워커 {args.workers}개)")
+    if not pending:
+        return 0
+
+    store = RecipeStore(args.store)
+    counts = {"ok": 0, "no_recipe": 0, "failed": 0}
+    durations: List[float] = []
+    failures: List[Tuple[str, str]] = []
+    started = time.perf_counter()
+
+    # 체크포인트/저장소 쓰기는 메인 프로세스에서만 수행 (항목이 끝날 때마다 바로 기록)
+    with open(args.checkpoint, "a", encoding="utf-8") as checkpoint, ProcessPoolExecutor(
+        max_workers=args.workers, initializer=_init_worker, initargs=(args.chunk_workers,)
+    ) as pool:
+        futures = {pool.submit(process_item, item): item for item in pending}
+        try:
+            for n, future in enumerate(as_completed(futures), 1):
+                try:
+                    item, status, result, seconds = future.result()
+                except Exception as e:
+                    # 워커 프로세스 자체가 죽은 경우
+                    item, status, result, seconds = futures[future], "failed", {"answer": str(e)}, 0.0
+
+                store.put(item, status, result, seconds)
+                checkpoint.write(json.dumps({"item": item, "status": status, "seconds": round(seconds, 2)}, ensure_ascii=False) + "\n")
+                checkpoint.flush()
+
+                counts[status] += 1
+                durations.append(seconds)
+                if status == "failed":
+                    failures.append((item, result.get("answer", "")))
+                print(f"[{n}/{len(pending)}] {status:<9} {seconds:6.1f}s  {item}  {result.get('food_name', '')}")
+        except KeyboardInterrupt:
+            print("\n중단됨 - 다시 실행하면 체크포인트 이후부터 이어서 처리합니다.")
+            pool.shutdown(wait=False, cancel_futures=True)
+            return 130
+
+    elapsed = time.perf_counter() - started
+    processed = sum(counts.values())
+    print("\n=== 일괄 수집 요약 ===")
+    print(f"처리 {processed}개 / {elapsed:.1f}초 → 처리량 {processed / elapsed * 60:.2f}개/분")
+    print(f"성공 {counts['ok']}개, 레시피 아님 {counts['no_recipe']}개, 실패 {counts['failed']}개")
+    if durations:
+        print(
+            f"항목당 소요: 평균 {statistics.mean(durations):.1f}초, "
+            f"p50 {_percentile(durations, 0.5):.1f}초, p95 {_percentile(durations, 0.95):.1f}초"
+        )
+    for item, error in failures[:20]:
+        print(f"  실패: {item} - {error[:120]}")
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,11 @@
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Union, Literal
 from typing import Optional, List
 import uvicorn
+import asyncio
 import logging
 import json
 import os
@@ -14,6 +16,10 @@ import config
 
 # core 모듈에서 함수 import
 from core.extractor import process_video_url
+from core.transcript import _extract_video_id
+from core.singleflight import SingleFlight
+from core.jobqueue import JobQueue
+from core import compress, metrics, prefilter, progress
 
 # .env 파일에서 환경 변수를 로드하고, os.environ에 직접 설정합니다.
 # 이 코드는 서버가 시작될 때 단 한 번만 실행됩니다.
@@ -59,11 +65,81 @@ class RecipeModel(BaseModel):
     food_name: str
     ingredients: List[Union[Ingredient, Product]]
     recipe: List[str]
+    step_timestamps: Optional[List[Optional[float]]] = None  # 단계별 영상 시각(초)
 
 class ChatResponse(BaseModel):
     chatType: Literal["chat", "cart"]
     content: str
     recipes: List[RecipeModel]
+    metadata: Optional[dict] = None  # 작업 단계별 소요 시간과 지표
+
+# 같은 영상의 동시 요청은 한 번만 처리하고 결과를 공유 (키: 정규화된 video id)
+video_flight = SingleFlight()
+
+
+def canonical_video_key(youtube_url: str) -> str:
+    try:
+        return _extract_video_id(youtube_url)
+    except ValueError:
+        return youtube_url.strip()
+
+
+def _run_video_job(video_key: str, youtube_url: str) -> dict:
+    progress.start(video_key)
+    with progress.bind(video_key):
+        try:
+            result = process_video_url(youtube_url)
+        except Exception as e:
+            progress.finish(video_key, "failed", str(e))
+            raise
+    # 추출 결과의 status(ok | no_recipe | failed)를 그대로 반영해, 레시피가 아닌 영상을 실패로 표시하지 않음
+    status = result.get("status") or ("ok" if result.get("recipe") else "failed")
+    progress.finish(video_key, "done" if status == "ok" else status, None if status == "ok" else result.get("answer"))
+    return result
+
+
+def process_video_deduplicated(youtube_url: str) -> dict:
+    video_key = canonical_video_key(youtube_url)
+    result, shared = video_flight.do(
+        video_key,
+        lambda: _run_video_job(video_key, youtube_url),
+        on_follow=lambda delta: progress.add_waiter(video_key, delta),
+    )
+    if shared:
+        logger.info(f"진행 중인 같은 영상 작업의 결과를 공유했습니다: {video_key}")
+    return result
+
+
+# 공유 작업 큐 (VIDEO_QUEUE_MODE). 같은 영상의 대기/처리 중 작업이 있으면 그 작업을 함께 기다림
+job_queue = JobQueue(config.JOB_QUEUE_PATH, max_attempts=config.JOB_MAX_ATTEMPTS) if config.VIDEO_QUEUE_MODE else None
+
+
+# 재시도 끝에 실패한 큐 작업도 큐 밖 경로(process_video_url)와 같은 형태의 오류 결과로 돌려줌 (HTTP 500 대신 오류 내용을 담은 응답)
+_ERROR_ANSWER_PREFIX = "영상 처리 중 오류가 발생했습니다: "
+
+
+def _failed_job_result(error: str) -> dict:
+    # 워커는 추출기의 오류 답변을 그대로 기록하고, 예외면 메시지만 기록함
+    answer = error if error.startswith(_ERROR_ANSWER_PREFIX) else f"{_ERROR_ANSWER_PREFIX}{error}"
+    return {"answer": answer, "ingredients": [], "recipe": [], "status": "failed"}
+
+
+async def process_video_via_queue(youtube_url: str) -> dict:
+    loop = asyncio.get_running_loop()
+    job_id = await loop.run_in_executor(
+        None, lambda: job_queue.enqueue({"youtube_url": youtube_url}, dedupe_key=canonical_video_key(youtube_url))
+    )
+    logger.info(f"작업 큐에 등록: {job_id}")
+    deadline = loop.time() + config.JOB_WAIT_TIMEOUT
+    while loop.time() < deadline:
+        job = await loop.run_in_executor(None, job_queue.get, job_id)
+        if job and job["status"] == "done":
+            return job["result"]
+        if job and job["status"] == "failed":
+            return _failed_job_result(job.get("error") or "알 수 없는 오류")
+        await asyncio.sleep(1.0)
+    raise TimeoutError(f"작업 {job_id} 대기 시간 초과")
+
 
 @app.post("/process", response_model=ChatResponse)
 async def process_video(request: Request):
@@ -83,8 +159,12 @@ async def process_video(request: Request):
         
         logger.info(f"처리할 유튜브 URL: {youtube_url}")
         
-        # VideoAgent로 영상 처리
-        result = process_video_url(youtube_url)
+        # VideoAgent로 영상 처리 (이벤트 루프를 막지 않도록 스레드에서 실행, 같은 영상의 동시 요청은 하나로 합침)
+        if job_queue is not None:
+            result = await process_video_via_queue(youtube_url)
+        else:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, process_video_deduplicated, youtube_url)
         logger.info(f"VideoAgent 처리 결과: {result}")
 
         # content 승격: answer → content
@@ -109,9 +189,11 @@ async def process_video(request: Request):
             "food_name": food_name,
             "ingredients": normalized_ings,
             "recipe": steps if isinstance(steps, list) else [],
+            "step_timestamps": result.get("step_timestamps"),
         }
 
-        return ChatResponse(chatType="chat", content=content or "", recipes=[recipe_obj])
+        return ChatResponse(chatType="chat", content=content or "", recipes=[recipe_obj],
+                            metadata=result.get("metadata"))
         
     except json.JSONDecodeError as e:
         logger.error(f"JSON 파싱 오류: {e}")
@@ -125,6 +207,39 @@ async def health_check():
     """서버 상태 확인"""
     return {"status": "healthy", "service": "VideoAgent Server"}
 
+@app.get("/stats")
+async def stats():
+    """레시피 판별 사전 필터 통계 (절약된 LLM 호출, LLM과의 일치율)와 스크립트 압축 통계"""
+    stats = {"status": "success", "prefilter": prefilter.get_stats(), "compression": compress.get_stats()}
+    if job_queue is not None:
+        stats["job_queue"] = job_queue.stats()
+    return stats
+
+@app.get("/metrics")
+async def get_metrics(format: str = "prometheus"):
+    """단계별 지연 시간 히스토그램과 누적 지표 (기본: Prometheus 텍스트, format=json: 요약)"""
+    if format == "json":
+        return {"status": "success", "metrics": metrics.summary()}
+    return PlainTextResponse(metrics.render_prometheus())
+
+@app.get("/progress/{video_id}")
+async def get_progress(video_id: str):
+    """영상 처리 진행 상황 (단계, 전사 진행률, 대기 중인 요청 수). status: running | done | no_recipe | failed"""
+    record = progress.get(canonical_video_key(video_id))
+    if record is None:
+        raise HTTPException(status_code=404, detail="진행 중이거나 최근에 처리된 작업이 없습니다.")
+    return {"status": "success", "progress": record}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """작업 큐 모드의 작업 상태 (상태, 시도 횟수, 담당 워커, 결과)"""
+    if job_queue is None:
+        raise HTTPException(status_code=404, detail="작업 큐 모드가 아닙니다.")
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"status": "success", "job": job}
+
 @app.get("/")
 async def root():
     """루트 엔드포인트"""
@@ -132,7 +247,11 @@ async def root():
         "message": "VideoAgent Server is running",
         "endpoints": {
             "/process": "POST - 유튜브 영상 레시피 추출",
-            "/health": "GET - 서버 상태 확인"
+            "/health": "GET - 서버 상태 확인",
+            "/stats": "GET - 사전 필터/스크립트 압축 통계",
+            "/metrics": "GET - 단계별 지연 시간/처리량 지표",
+            "/progress/{video_id}": "GET - 영상 처리 진행 상황",
+            "/jobs/{job_id}": "GET - 작업 큐 모드의 작업 상태"
         }
     }
 
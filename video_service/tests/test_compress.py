@@ -0,0 +1,49 @@
+# 스크립트 압축이 레시피 내용(반복되는 분량/단계)을 지우지 않는지 확인
+from video_service.core.compress import clean_segments, compress_transcript
+from video_service.core.tokens import split_sentences
+
+
+def test_split_keeps_numeral_ne_inside_sentence():
+    assert split_sentences("간장 네 스푼 넣어주세요 식초 네 스푼 넣어주세요") == [
+        "간장 네 스푼 넣어주세요",
+        "식초 네 스푼 넣어주세요",
+    ]
+
+
+def test_repeated_quantity_is_kept():
+    text = "간장 네 스푼 넣어주세요 식초 네 스푼 넣어주세요"
+    compressed, stats = compress_transcript(text, budget_tokens=0)
+    assert compressed == text
+    assert stats["duplicates_removed"] == 0
+
+
+def test_same_step_later_in_transcript_is_kept():
+    text = "소금 한 꼬집 넣어주세요. 양파를 볶아요. 소금 한 꼬집 넣어주세요."
+    compressed, _ = compress_transcript(text, budget_tokens=0)
+    assert compressed.count("소금 한 꼬집") == 2
+
+
+def test_consecutive_duplicate_caption_line_is_removed():
+    compressed, _ = compress_transcript("소금 넣어주세요. 소금 넣어주세요. 볶아요.", budget_tokens=0)
+    assert compressed == "소금 넣어주세요. 볶아요."
+
+
+def test_clean_segments_keeps_distant_repeats():
+    segments = [
+        {"start": 10.0, "end": 12.0, "text": "소금 한 꼬집 넣어주세요"},
+        {"start": 12.5, "end": 14.0, "text": "소금 한 꼬집 넣어주세요"},
+        {"start": 60.0, "end": 62.0, "text": "양파를 볶아요"},
+        {"start": 300.0, "end": 302.0, "text": "소금 한 꼬집 넣어주세요"},
+    ]
+    assert [seg["start"] for seg in clean_segments(segments)] == [10.0, 60.0, 300.0]
+
+
+def test_meaningful_words_are_not_fillers():
+    compressed, _ = compress_transcript("음 소금 좀 더 넣어주세요. 자 이제 뒤집어요.", budget_tokens=0)
+    assert compressed == "소금 좀 더 넣어주세요. 자 이제 뒤집어요."
+
+
+def test_good_is_not_a_like_request():
+    compressed, stats = compress_transcript("이렇게 하면 맛이 좋아요. 좋아요 눌러주세요.", budget_tokens=0)
+    assert compressed == "이렇게 하면 맛이 좋아요."
+    assert stats["boilerplate_removed"] == 2
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+영상 처리 워커
+
+공유 작업 큐(JOB_QUEUE_PATH)에서 작업을 가져와 레시피를 추출하고 결과를 큐에 기록합니다.
+상태를 갖지 않으므로 큐 파일에 접근할 수 있는 어느 노드에서든 여러 개를 띄울 수 있습니다.
+처리 중에는 주기적으로 하트비트를 보내며, 워커가 죽으면 임대가 끝난 작업은 다른 워커가 다시 가져갑니다.
+
+사용법:
+    cd video_service
+    python worker.py [--concurrency 2] [--worker-id node1]
+"""
+
+import argparse
+import logging
+import signal
+import threading
+import time
+
+import config
+from core.extractor import process_media_file, process_video_url
+from core.jobqueue import JobQueue, default_worker_id
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("video_worker")
+
+_stop = threading.Event()
+
+
+def _heartbeat_loop(queue: JobQueue, job_id: str, worker_id: str, done: threading.Event) -> None:
+    interval = max(1.0, config.JOB_LEASE_SECONDS / 3)
+    while not done.wait(interval):
+        if not queue.heartbeat(job_id, worker_id, config.JOB_LEASE_SECONDS):
+            logger.warning(f"작업 {job_id}의 임대를 잃었습니다. (다른 워커가 가져갔을 수 있음)")
+            return
+
+
+def run_job(queue: JobQueue, job: dict, worker_id: str) -> None:
+    payload = job["payload"]
+    logger.info(f"[{worker_id}] 작업 {job['id']} 시작 (시도 {job['attempts']}/{job['max_attempts']}): {payload}")
+    done = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat_loop, args=(queue, job["id"], worker_id, done), daemon=True)
+    heartbeat.start()
+    started = time.perf_counter()
+    try:
+        if payload.get("media_path"):
+            result = process_media_file(payload["media_path"])
+        else:
+            result = process_video_url(payload["youtube_url"])
+        # 추출기는 일시적 오류(LLM/네트워크 등)도 결과로 돌려주므로, status로 구분해 재시도 대상으로 돌림
+        if result.get("status") == "failed":
+            logger.warning(f"[{worker_id}] 작업 {job['id']} 처리 오류: {result.get('answer')}")
+            queue.fail(job["id"], worker_id, str(result.get("answer", "")))
+            return
+        queue.complete(job["id"], worker_id, result)
+        logger.info(f"[{worker_id}] 작업 {job['id']} 완료 ({time.perf_counter() - started:.1f}초)")
+    except Exception as e:
+        logger.error(f"[{worker_id}] 작업 {job['id']} 실패: {e}", exc_info=True)
+        queue.fail(job["id"], worker_id, str(e))
+    finally:
+        done.set()
+
+
+def worker_loop(queue: JobQueue, worker_id: str, poll_seconds: float) -> None:
+    while not _stop.is_set():
+        try:
+            job = queue.claim(worker_id, config.JOB_LEASE_SECONDS)
+        except Exception as e:
+            logger.error(f"[{worker_id}] 작업 큐 조회 실패: {e}")
+            job = None
+        if job is None:
+            _stop.wait(poll_seconds)
+            continue
+        run_job(queue, job, worker_id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="영상 처리 워커")
+    parser.add_argument("--queue", default=config.JOB_QUEUE_PATH, help="작업 큐 SQLite 파일 경로")
+    parser.add_argument("--worker-id", default=default_worker_id(), help="워커 식별자 (기본: 호스트명 기반)")
+    parser.add_argument("--concurrency", type=int, default=1, help="이 프로세스에서 동시에 처리할 작업 수")
+    parser.add_argument("--poll", type=float, default=2.0, help="대기 작업이 없을 때 조회 간격(초)")
+    args = parser.parse_args()
+
+    queue = JobQueue(args.queue, max_attempts=config.JOB_MAX_ATTEMPTS)
+
+    # 종료 신호를 받으면 새 작업은 가져오지 않고, 처리 중인 작업만 마무리
+    def _shutdown(signum, frame):
+        logger.info("종료 신호 수신 - 처리 중인 작업을 마친 뒤 종료합니다.")
+        _stop.set()
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
+
+    threads = [
+        threading.Thread(target=worker_loop, args=(queue, f"{args.worker_id}-{i}", args.poll))
+        for i in range(max(1, args.concurrency))
+    ]
+    logger.info(f"워커 시작: {args.worker_id} x{len(threads)} (큐: {args.queue})")
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+if __name__ == "__main__":
+    main()